@@ -3,7 +3,6 @@ NİLÜFER BELEDİYESİ - PROFESYONEL ML ENTEGRELİ API
 Flask Backend with AI-Powered Optimization
 """
 
-import joblib
 import json
 import numpy as np
 from flask import Flask, jsonify, request
@@ -12,28 +11,51 @@ import sqlite3
 from datetime import datetime
 import sys
 sys.path.append('.')
-from route_optimizer import RouteOptimizer
+from model_loader import LazyLoader, health_report
+from model_compaction import serving_metrics
+from model_store import load_compact_model, load_model
+from prediction_cache import PredictionCache, prediction_key
 
 app = Flask(__name__, static_folder='public')
 CORS(app)
 
-# Modelleri yükle
-try:
-    fill_prediction_model = joblib.load('models/fill_prediction_model.pkl')
-    fill_scaler = joblib.load('models/fill_scaler.pkl')
+def load_ai_models():
+    """Model dizileri ve özellik deposu (pandas) - arka planda, sklearn'süz"""
+    from feature_store import FeatureStore
+    
+    # model_compaction.py ile küçültülmüş model varsa onu kullan
+    fill_prediction_model, compact_meta = load_compact_model('models/fill_prediction_model.pkl')
+    if fill_prediction_model is None:
+        fill_prediction_model, _ = load_model('models/fill_prediction_model.pkl', allow_pickle=False)
     
     with open('models/fill_model_metadata.json', 'r', encoding='utf-8') as f:
         model_metadata = json.load(f)
+    # Yanıtlardaki ad / MAE / güven, hizmet veren (küçültülmüş veya tam) modele ait
+    serving = serving_metrics(model_metadata, compact_meta)
     
     print("✅ AI Modelleri başarıyla yüklendi!")
-    print(f"   Model: {model_metadata['metrics']['model_name']}")
-    print(f"   R² Score: {model_metadata['metrics']['r2_score']:.4f}")
-    print(f"   MAE: {model_metadata['metrics']['mae']:.4f}")
-    AI_ENABLED = True
-except Exception as e:
-    print(f"⚠️ AI Modelleri yüklenemedi: {e}")
-    print("   Klasik mod kullanılacak.")
-    AI_ENABLED = False
+    print(f"   Model: {serving['model_name']}")
+    print(f"   R² Score: {serving['r2_score']:.4f}")
+    print(f"   MAE: {serving['mae']:.4f}")
+    
+    # Statik konteyner özellikleri önbellekte tutulur
+    return {
+        'model': fill_prediction_model,
+        'metadata': model_metadata,
+        'serving': serving,
+        'feature_store': FeatureStore('nilufer_waste.db')
+    }
+
+def warmup_ai_models(models):
+    """Özellik önbelleğini doldur ve ilk tahmini yap"""
+    _, X = models['feature_store'].regressor_matrix()
+    if len(X):
+        models['model'].predict(X[:1])
+
+# Modeller arka planda yüklenir; yüklenemezse klasik mod kullanılır
+ai_models = LazyLoader('ai_models', load_ai_models, warmup_ai_models)
+ai_models.start()
+prediction_cache = PredictionCache()
 
 def get_db_connection():
     conn = sqlite3.connect('nilufer_waste.db')
@@ -124,60 +146,42 @@ def get_containers():
 @app.route('/api/predict_fill/<int:container_id>')
 def predict_fill_level(container_id):
     """Bir konteyner için doluluk tahmini yap"""
-    if not AI_ENABLED:
-        return jsonify({'error': 'AI model not loaded'}), 500
-    
-    conn = get_db_connection()
-    container = conn.execute('''
-        SELECT c.*, n.population
-        FROM containers c
-        JOIN neighborhoods n ON c.neighborhood_id = n.neighborhood_id
-        WHERE c.container_id = ?
-    ''', (container_id,)).fetchone()
-    conn.close()
+    models = ai_models.get()
+    if not models:
+        if ai_models.state == 'failed':
+            return jsonify({'error': 'AI model not loaded'}), 500
+        return jsonify({'error': 'AI model loading', 'health': ai_models.status()}), 503
+    serving = models['serving']
     
-    if not container:
+    # Eğitimle aynı özellik tanımı (feature_store.py)
+    static, X = models['feature_store'].regressor_matrix([container_id])
+    if static.empty:
         return jsonify({'error': 'Container not found'}), 404
     
-    # Feature extraction (data_preparation.py ile aynı)
-    last_collection = datetime.strptime(container['last_collection_date'], '%Y-%m-%d')
-    days_since = (datetime.now() - last_collection).days
-    
-    # Özellikleri hazırla
-    features = {
-        'days_since_collection': days_since,
-        'day_of_week': datetime.now().weekday(),
-        'month': datetime.now().month,
-        'is_weekend': 1 if datetime.now().weekday() >= 5 else 0,
-        'collection_days_per_week': 3,  # Varsayılan
-        'type_encoded': 1 if '400' in container['container_type'] else 2,
-        'capacity_category': 2,  # medium
-        'population_density': 5.0,  # Varsayılan
-        'current_fill_level': container['current_fill_level']
-    }
-    
-    # Tahmin yap
-    X = np.array([[
-        features['days_since_collection'],
-        features['day_of_week'],
-        features['month'],
-        features['is_weekend'],
-        features['collection_days_per_week'],
-        features['type_encoded'],
-        features['capacity_category'],
-        features['population_density'],
-        features['current_fill_level']
-    ]])
-    
-    prediction = fill_prediction_model.predict(X)[0]
-    prediction = np.clip(prediction, 0, 0.95)
+    row = static.iloc[0]
+    cache_key = prediction_key(container_id, row['last_collection_date'],
+                               row['current_fill_level'], serving['timestamp'])
+    cached = prediction_cache.get(cache_key)
+    if cached is None:
+        # GradientBoosting: test RMSE'li aralık; orman modelinde ağaç yayılımı
+        interval = models['model'].predict_interval(X, residual_std=serving['rmse'])
+        cached = (float(np.clip(interval['prediction'][0], 0, 0.95)), {
+            'std': float(interval['std'][0]),
+            'lower': float(np.clip(interval['lower'][0], 0, 1)),
+            'upper': float(np.clip(interval['upper'][0], 0, 1)),
+            'method': interval['method']
+        })
+        prediction_cache.put(cache_key, cached)
+    prediction, uncertainty = cached
     
     return jsonify({
         'container_id': container_id,
-        'current_fill': float(container['current_fill_level']),
+        'current_fill': float(row['current_fill_level']),
         'predicted_fill': float(prediction),
-        'model': model_metadata['metrics']['model_name'],
-        'confidence': float(1 - model_metadata['metrics']['mae'])
+        'model': serving['model_name'],
+        'model_variant': serving['variant'],
+        'confidence': float(1 - serving['mae']),
+        'uncertainty': uncertainty
     })
 
 @app.route('/api/optimize-routes', methods=['POST'])
@@ -186,27 +190,41 @@ def optimize_routes():
     """AI ile rotaları optimize et"""
     try:
         # Parametreler - GET ve POST için farklı
-        if request.method == 'GET':
-            min_priority = float(request.args.get('min_priority', 0.6))
-        else:
-            data = request.get_json() or {}
-            min_priority = data.get('min_priority', 0.6)
-        
-        print(f"\n🚀 Rota optimizasyonu başlıyor (min_priority={min_priority})...")
+        # mode: 'current' (mevcut doluluk) veya 'forecast' (toplama anındaki tahmini doluluk)
+        params = request.args if request.method == 'GET' else (request.get_json() or {})
+        min_priority = float(params.get('min_priority', 0.6))
+        mode = params.get('mode', 'current')
+        collection_time = params.get('collection_time')
+        collection_time = datetime.fromisoformat(collection_time) if collection_time else datetime.now()
+        refine = str(params.get('refine', 'true')).lower() not in ('0', 'false')
         
-        # Route Optimizer oluştur
-        optimizer = RouteOptimizer()
+        print(f"\n🚀 Rota optimizasyonu başlıyor (min_priority={min_priority}, mod={mode})...")
         
-        # Yüksek öncelikli konteynerleri al
-        containers = optimizer.get_high_priority_containers(min_priority=min_priority)
-        print(f"   ✓ {len(containers)} konteyner bulundu")
+        models = ai_models.get()
+        if mode == 'forecast' and not models:
+            return jsonify({'success': False, 'error': 'AI model loading', 'health': ai_models.status()}), 503
         
-        # Araçları al
-        vehicles = optimizer.get_available_vehicles()
-        print(f"   ✓ {len(vehicles)} araç bulundu")
+        # Route Optimizer oluştur (pandas ilk istekte yüklenir)
+        from route_optimizer import RouteOptimizer
         
-        # Rotaları optimize et
-        routes = optimizer.optimize_routes_by_priority(containers, vehicles)
+        if mode == 'forecast':
+            optimizer = RouteOptimizer(fill_model=models['model'], feature_store=models['feature_store'])
+            vehicles = optimizer.get_available_vehicles()
+            print(f"   ✓ {len(vehicles)} araç bulundu")
+            routes = optimizer.optimize_routes_forecast(vehicles, collection_time, min_priority, refine)
+        else:
+            optimizer = RouteOptimizer()
+            
+            # Yüksek öncelikli konteynerleri al
+            containers = optimizer.get_high_priority_containers(min_priority=min_priority)
+            print(f"   ✓ {len(containers)} konteyner bulundu")
+            
+            # Araçları al
+            vehicles = optimizer.get_available_vehicles()
+            print(f"   ✓ {len(vehicles)} araç bulundu")
+            
+            # Rotaları optimize et
+            routes = optimizer.optimize_routes_by_priority(containers, vehicles)
         print(f"   ✓ {len(routes)} rota oluşturuldu")
         
         # İstatistikleri hesapla
@@ -225,8 +243,10 @@ def optimize_routes():
                 'total_time_hours': round(total_time, 2),
                 'avg_capacity_usage': round(avg_capacity, 2)
             },
-            'ai_enabled': AI_ENABLED,
-            'model_info': model_metadata['metrics'] if AI_ENABLED else None
+            'mode': mode,
+            'collection_time': collection_time.isoformat(),
+            'ai_enabled': models is not None,
+            'model_info': models['serving'] if models else None
         })
     
     except Exception as e:
@@ -238,19 +258,34 @@ def optimize_routes():
 @app.route('/api/model_info')
 def model_info():
     """Model bilgilerini getir"""
-    if not AI_ENABLED:
-        return jsonify({'ai_enabled': False})
+    models = ai_models.get()
+    if not models:
+        return jsonify({'ai_enabled': False, 'health': ai_models.status()})
+    model_metadata = models['metadata']
+    serving = models['serving']
     
     return jsonify({
         'ai_enabled': True,
-        'model_name': model_metadata['metrics']['model_name'],
-        'r2_score': model_metadata['metrics']['r2_score'],
-        'mae': model_metadata['metrics']['mae'],
-        'rmse': model_metadata['metrics']['rmse'],
+        'model_name': serving['model_name'],
+        'model_variant': serving['variant'],
+        'metrics_from': serving['metrics_from'],
+        'r2_score': serving['r2_score'],
+        'mae': serving['mae'],
+        'rmse': serving['rmse'],
         'train_date': model_metadata['metrics']['timestamp'],
-        'feature_importance': model_metadata['feature_importance']
+        'feature_importance': model_metadata['feature_importance'],
+        'prediction_cache': prediction_cache.stats()
     })
 
+@app.route('/api/health')
+def health():
+    """Hazır olma durumu (modeller yüklenene kadar 503)"""
+    report, status_code = health_report([ai_models])
+    models = ai_models.get()
+    if models:
+        report['serving_model'] = models['serving']
+    return jsonify(report), status_code
+
 @app.route('/api/neighborhoods')
 def get_neighborhoods():
     """Tüm mahalleleri getir"""
@@ -313,10 +348,7 @@ if __name__ == '__main__':
     print("="*80)
     print("🚀 NİLÜFER BELEDİYESİ - AI-POWERED ATIK YÖNETİM SİSTEMİ")
     print("="*80)
-    print(f"\n📊 AI Durum: {'✅ Aktif' if AI_ENABLED else '⚠️ Devre Dışı'}")
-    if AI_ENABLED:
-        print(f"   Model: {model_metadata['metrics']['model_name']}")
-        print(f"   Performans: R²={model_metadata['metrics']['r2_score']:.4f}")
+    print(f"\n📊 AI Durum: arka planda yükleniyor (durum: /api/health)")
     print("\n🌐 Sunucu Başlatılıyor...")
     print("   Admin Panel: http://localhost:5000/admin")
     print("   Ana Sayfa: http://localhost:5000/")
@@ -9,6 +9,14 @@ from datetime import datetime, timedelta
 import sqlite3
 import json
 
+from feature_store import (
+    CAPACITY_BINS, CAPACITY_CATEGORY_CODES, TYPE_ENCODING,
+    parse_collection_dates, rotation_day_map
+)
+from fill_forecast import DEFAULT_DAILY_RATE, build_forecast
+from gps_cache import load_gps_frame
+from gps_features import duration_minutes
+
 class DataProcessor:
     def __init__(self):
         self.db_conn = sqlite3.connect('nilufer_waste.db')
@@ -32,8 +40,8 @@ class DataProcessor:
         rotations_raw['MAHALLE'] = rotations_raw['MAHALLE'].str.strip()
         print(f"✓ Rotasyon verileri: {len(rotations_raw)} mahalle")
         
-        # 4. Araç GPS verileri (634,297 kayıt!)
-        vehicle_logs = pd.read_csv('data/all_merged_data.csv', encoding='utf-8', on_bad_lines='skip')
+        # 4. Araç GPS verileri (634,297 kayıt!) - kolon önbelleğinden (ilk çalıştırmada oluşturulur)
+        vehicle_logs = load_gps_frame('data/all_merged_data.csv')
         print(f"✓ GPS verileri: {len(vehicle_logs):,} kayıt")
         
         # 5. Mahalle nüfus verileri
@@ -52,40 +60,33 @@ class DataProcessor:
         """GPS verilerinden konteyner konumlarını çıkar"""
         print("\n🗺️ Konteyner konumları çıkarılıyor...")
         
-        # Duraklama süresini dakikaya çevir (HH:MM:SS formatından)
-        def parse_duration(duration_str):
-            try:
-                if pd.isna(duration_str) or duration_str == '00:00:00':
-                    return 0
-                parts = str(duration_str).split(':')
-                hours = int(parts[0])
-                minutes = int(parts[1])
-                seconds = int(parts[2])
-                return hours * 60 + minutes + seconds / 60
-            except:
-                return 0
-        
-        vehicle_logs['duration_minutes'] = vehicle_logs['Duraklama Süresi'].apply(parse_duration)
+        # Duraklama süresini dakikaya çevir (HH:MM:SS formatından, bozuk = NaN; önbellekte zaten dakika)
+        vehicle_logs['duration_minutes'] = duration_minutes(vehicle_logs['Duraklama Süresi'])
         
         # Duraklamalar (konteyner toplama noktaları olabilir) - 5 dakikadan uzun duraklamalar
         stops = vehicle_logs[vehicle_logs['duration_minutes'] > 5].copy()
         
         # Mahalle bazlı gruplama
-        location_clusters = stops.groupby('Mahalle').agg({
-            'Enlem': 'mean',
-            'Boylam': 'mean',
-            'duration_minutes': 'mean',
-            '#': 'count'
-        }).reset_index()
+        location_clusters = stops.groupby('Mahalle', observed=True).agg(
+            Enlem=('Enlem', 'mean'),
+            Boylam=('Boylam', 'mean'),
+            duration_minutes=('duration_minutes', 'mean'),
+            count=('Enlem', 'size')
+        ).reset_index()
         
         location_clusters.columns = ['Mahalle', 'Lat', 'Lng', 'Avg_Stop_Duration', 'Stop_Count']
         
         print(f"✓ {len(location_clusters)} mahallede konum bilgisi bulundu")
         return location_clusters
     
-    def create_container_features(self, raw_data):
-        """Konteynerler için zengin özellikler oluştur"""
+    def create_container_features(self, raw_data, now=None):
+        """
+        Konteynerler için zengin özellikler oluştur
+        
+        Tüm özellikler kolon bazında, tek bir referans zamana (now) göre hesaplanır.
+        """
         print("\n🔧 Feature Engineering başlıyor...")
+        now = pd.Timestamp(now or datetime.now())
         
         # Database'den mevcut konteynerleri al
         containers = pd.read_sql_query("""
@@ -99,53 +100,39 @@ class DataProcessor:
         print(f"✓ Database'den {len(containers)} konteyner alındı")
         
         # 1. Zaman özellikleri
-        containers['last_collection_date'] = pd.to_datetime(containers['last_collection_date'], format='%Y-%m-%d', errors='coerce')
-        containers['days_since_collection'] = (datetime.now() - containers['last_collection_date']).dt.days
+        containers['last_collection_date'] = parse_collection_dates(containers['last_collection_date'])
+        containers['days_since_collection'] = (now - containers['last_collection_date']).dt.days
         containers['day_of_week'] = containers['last_collection_date'].dt.dayofweek
         containers['month'] = containers['last_collection_date'].dt.month
         containers['is_weekend'] = containers['day_of_week'].isin([5, 6]).astype(int)
         
         # 2. Mahalle özellikleri ekle
         # Rotasyon bilgileri
-        rotations = raw_data['rotations']
-        rot_dict = {}
-        for _, row in rotations.iterrows():
-            mahalle = row['MAHALLE'].upper().strip()
-            try:
-                days = int(row['DAYS_PER_WEEK']) if pd.notna(row['DAYS_PER_WEEK']) else 3
-            except:
-                days = 3
-            rot_dict[mahalle] = days
-        
-        containers['collection_days_per_week'] = containers['neighborhood_name'].str.upper().map(rot_dict).fillna(3)
+        rot_days = rotation_day_map(raw_data['rotations'], 'MAHALLE', 'DAYS_PER_WEEK')
+        containers['collection_days_per_week'] = containers['neighborhood_name'].str.upper().str.strip().map(rot_days).fillna(3)
         
         # Tonaj ortalamaları (son aylar)
         tonnages = raw_data['tonnages']
         avg_daily_tonnage = tonnages['Ortalama Günlük Tonaj (TON)'].mean()
         
         # 3. Konteyner tipi özellikleri
-        type_encoding = {
-            'plastic': 1,
-            '400lt': 2,
-            '770lt': 3,
-            'underground': 4,
-            '5000lt': 5
-        }
-        containers['type_encoded'] = containers['container_type'].map(type_encoding).fillna(1)
+        containers['type_encoded'] = containers['container_type'].map(TYPE_ENCODING).fillna(1)
         
         # 4. Kapasite özellikleri
         containers['capacity_category'] = pd.cut(containers['capacity_liters'], 
-                                                   bins=[0, 300, 500, 1000, 6000],
-                                                   labels=['small', 'medium', 'large', 'xlarge'])
+                                                   bins=CAPACITY_BINS,
+                                                   labels=list(CAPACITY_CATEGORY_CODES))
         
         # 5. Nüfus yoğunluğu (proxy)
         containers['population_density'] = containers['population'] / 1000  # normalize
         
-        # 6. Beklenen doluluk oranı (günlük artış modeli)
-        daily_fill_rate = 0.08  # Ortalama %8 günlük doluluk artışı
+        # 6. Beklenen doluluk oranı (toplama geçmişinden konteyner bazlı günlük artış)
+        forecast, _ = build_forecast(self.db_conn, now=now)
+        daily_fill_rate = containers['id'].map(forecast.set_index('container_id')['daily_rate'])
+        containers['daily_fill_rate'] = daily_fill_rate.fillna(DEFAULT_DAILY_RATE)
         containers['expected_fill_level'] = np.minimum(
             0.95,
-            containers['current_fill_level'] + (containers['days_since_collection'] * daily_fill_rate)
+            containers['current_fill_level'] + (containers['days_since_collection'] * containers['daily_fill_rate'])
         )
         
         # 7. Toplama önceliği
@@ -159,6 +146,7 @@ class DataProcessor:
         print(f"  - Zaman: days_since_collection, day_of_week, month, is_weekend")
         print(f"  - Mahalle: collection_days_per_week, population_density")
         print(f"  - Konteyner: type_encoded, capacity_category")
+        print(f"  - Dolum: daily_fill_rate (toplama geçmişinden)")
         print(f"  - Hedef: expected_fill_level, collection_priority")
         
         return containers
@@ -0,0 +1,289 @@
+"""
+NİLÜFER BELEDİYESİ - TAHMİN KALİTESİ VE KAYMA İZLEME
+Her tahmin ve doğrulanmış bildirimde O(1) güncellenen akan istatistikler:
+    - Doğrulanmış bildirimlere karşı hareketli MAE
+    - Özellik ve skor dağılımı histogramları (referans kantil kovaları)
+    - Population Stability Index (PSI)
+İki akış tutulur: 'served' (API'den istenen tek tahminler) ve 'population'
+(yenileyicinin tüm konteynerleri skorladığı toplu geçişler). İstek trafiği
+belirli konteynerlere yığıldığından PSI kararı yalnızca 'population'
+akışından verilir; eşik aşılınca yeniden eğitim tetiklenir
+Saat / takvim özellikleri (son toplamadan geçen süre, haftanın günü, ay...)
+zaman ilerledikçe kendiliğinden kaydığından PSI'ye katılmaz
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+N_BINS = 10
+WINDOW_SECONDS = 3600          # Bir kova = 1 saat
+N_WINDOWS = 24                 # Son 24 saat tutulur
+PSI_THRESHOLD = 0.25           # > 0.25: belirgin dağılım kayması
+MAE_THRESHOLD = 0.30           # Olasılık ile gerçekleşen dolu/boş arasındaki MAE
+MIN_OBSERVATIONS = 30          # Karar için minimum tahmin / bildirim sayısı
+COOLDOWN_SECONDS = 6 * 3600    # İki tetikleme arasındaki minimum süre
+PSI_EPSILON = 1e-4
+SOURCES = ('served', 'population')
+TRIGGER_SOURCE = 'population'
+# Duvar saatinden türeyen özellikler: gün / hafta / ay dönümünde ve toplama
+# olmadan geçen her saatte dağılımları değişir, gerçek kayma göstermez
+TIME_FEATURES = frozenset({
+    'hours_since', 'days_since', 'hours_since_collection', 'days_since_collection',
+    'day_of_week', 'is_weekend', 'month', 'season'
+})
+
+
+def quantile_edges(values, n_bins=N_BINS):
+    """Referans kantillerinden iç kova sınırları (tekrar edenler atılır)"""
+    inner = np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])
+    return np.unique(inner)
+
+
+def population_stability_index(expected, actual, epsilon=PSI_EPSILON):
+    """PSI = Σ (a - e) · ln(a / e); sayımlar oranlara çevrilir"""
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    if expected.sum() == 0 or actual.sum() == 0:
+        return 0.0
+    e = np.maximum(expected / expected.sum(), epsilon)
+    a = np.maximum(actual / actual.sum(), epsilon)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+class _Window:
+    """Tek zaman kovası: sabit boyutlu sayaçlar"""
+
+    __slots__ = ('index', 'predictions', 'feature_counts', 'score_counts',
+                 'outcomes', 'abs_error', 'sq_error')
+
+    def __init__(self, index, n_features, n_bins):
+        self.index = index
+        self.predictions = dict.fromkeys(SOURCES, 0)
+        self.feature_counts = {source: np.zeros((n_features, n_bins), dtype=np.int64) for source in SOURCES}
+        self.score_counts = {source: np.zeros(n_bins, dtype=np.int64) for source in SOURCES}
+        self.outcomes = 0
+        self.abs_error = 0.0
+        self.sq_error = 0.0
+
+
+class DriftMonitor:
+    """
+    Zaman kovalı akan tahmin izleyici
+
+    Bellek kova başına sabittir (özellik × kova sayısı); kovalar bir
+    halka tamponda tutulur. Referans dağılım (eğitim anındaki konteyner
+    özellikleri) set_reference ile verilir; TIME_FEATURES sütunları
+    izlenmez, observe aynı matrisi alıp yalnızca izlenen sütunları sayar.
+    """
+
+    def __init__(self, feature_names=None, n_bins=N_BINS, window_seconds=WINDOW_SECONDS,
+                 n_windows=N_WINDOWS, psi_threshold=PSI_THRESHOLD, mae_threshold=MAE_THRESHOLD,
+                 min_observations=MIN_OBSERVATIONS, cooldown_seconds=COOLDOWN_SECONDS,
+                 on_drift=None, clock=time.time):
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.n_bins = n_bins
+        self.window_seconds = window_seconds
+        self.psi_threshold = psi_threshold
+        self.mae_threshold = mae_threshold
+        self.min_observations = min_observations
+        self.cooldown_seconds = cooldown_seconds
+        self.on_drift = on_drift
+        self.clock = clock
+
+        self.n_windows = n_windows
+        self._windows = deque(maxlen=n_windows)
+        self._lock = threading.Lock()
+        self._feature_edges = None
+        self._columns = None
+        self.excluded_features = []
+        self._padded_edges = None
+        self._flat_offsets = None
+        self._score_edges = None
+        self._reference_counts = None
+        self._reference_score_counts = None
+        self.reference_size = 0
+        self.reference_set_at = None
+
+        # Toplam (ömür boyu) hata istatistikleri
+        self.total_outcomes = 0
+        self.total_abs_error = 0.0
+        self.total_sq_error = 0.0
+        self.last_triggered_at = None
+        self.trigger_count = 0
+        self.last_trigger_reasons = []
+
+    def _bin_counts(self, values, edges):
+        counts = np.zeros(self.n_bins, dtype=np.int64)
+        np.add.at(counts, np.searchsorted(edges, values, side='right'), 1)
+        return counts
+
+    def _feature_bins(self, X):
+        """Tüm özellikler için kova indeksleri tek karşılaştırmada (satır × özellik)"""
+        return (X[:, :, None] >= self._padded_edges[None]).sum(axis=2)
+
+    def set_reference(self, X, scores=None, feature_names=None):
+        """Referans dağılımı: kova sınırları ve referans sayımları"""
+        X = np.asarray(X, dtype=float)
+        with self._lock:
+            if feature_names is None:
+                feature_names = self.feature_names or [f'f{j}' for j in range(X.shape[1])]
+            self._columns = [j for j, name in enumerate(feature_names) if name not in TIME_FEATURES]
+            self.feature_names = [feature_names[j] for j in self._columns]
+            self.excluded_features = [name for name in feature_names if name in TIME_FEATURES]
+            X = X[:, self._columns]
+            self._feature_edges = [quantile_edges(X[:, j], self.n_bins) for j in range(X.shape[1])]
+            self._reference_counts = np.stack([
+                self._bin_counts(X[:, j], edges) for j, edges in enumerate(self._feature_edges)
+            ])
+            # Kısa sınır listeleri +inf ile doldurulur: kova indeksi = x'ten küçük-eşit sınır sayısı
+            self._padded_edges = np.full((X.shape[1], self.n_bins - 1), np.inf)
+            for j, edges in enumerate(self._feature_edges):
+                self._padded_edges[j, :len(edges)] = edges
+            self._flat_offsets = np.arange(X.shape[1]) * self.n_bins
+            if scores is not None:
+                self._score_edges = quantile_edges(scores, self.n_bins)
+                self._reference_score_counts = self._bin_counts(scores, self._score_edges)
+            self._windows.clear()
+            self.reference_size = len(X)
+            self.reference_set_at = self.clock()
+
+    def _current_window(self):
+        index = int(self.clock() // self.window_seconds)
+        if not self._windows or self._windows[-1].index != index:
+            self._windows.append(_Window(index, len(self.feature_names or []), self.n_bins))
+        return self._windows[-1]
+
+    def observe(self, X, scores=None, source='served'):
+        """Tahmin(ler)in özellik ve skorlarını kaydet ('served' / 'population')"""
+        if self._feature_edges is None:
+            return
+        X = np.atleast_2d(np.asarray(X, dtype=float))[:, self._columns]
+        with self._lock:
+            window = self._current_window()
+            window.predictions[source] += len(X)
+            flat = (self._feature_bins(X) + self._flat_offsets).ravel()
+            window.feature_counts[source] += np.bincount(
+                flat, minlength=window.feature_counts[source].size
+            ).reshape(window.feature_counts[source].shape)
+            if scores is not None and self._score_edges is not None:
+                np.add.at(window.score_counts[source],
+                          np.searchsorted(self._score_edges, np.atleast_1d(scores), side='right'), 1)
+        if source == TRIGGER_SOURCE:
+            self.check_drift()
+
+    def record_outcome(self, predicted, actual):
+        """Doğrulanmış bildirim: tahmin ile gerçekleşen değer arasındaki hata"""
+        error = abs(float(predicted) - float(actual))
+        with self._lock:
+            window = self._current_window()
+            window.outcomes += 1
+            window.abs_error += error
+            window.sq_error += error * error
+            self.total_outcomes += 1
+            self.total_abs_error += error
+            self.total_sq_error += error * error
+        self.check_drift()
+        return error
+
+    def _recent_windows(self):
+        # Halkada kalsa bile n_windows kovadan eski olanlar sayılmaz
+        oldest = int(self.clock() // self.window_seconds) - self.n_windows
+        return [w for w in self._windows if w.index > oldest]
+
+    def _recent_totals(self):
+        windows = self._recent_windows()
+        predictions = {source: sum(w.predictions[source] for w in windows) for source in SOURCES}
+        outcomes = sum(w.outcomes for w in windows)
+        abs_error = sum(w.abs_error for w in windows)
+        sq_error = sum(w.sq_error for w in windows)
+        return predictions, outcomes, abs_error, sq_error
+
+    def psi(self, source=TRIGGER_SOURCE):
+        """Son kovalar ile referans arasındaki özellik ve skor PSI değerleri"""
+        with self._lock:
+            windows = self._recent_windows()
+            if self._reference_counts is None or not windows:
+                return {}
+            counts = sum(w.feature_counts[source] for w in windows)
+            if not counts.any():
+                return {}
+            result = {
+                name: population_stability_index(self._reference_counts[j], counts[j])
+                for j, name in enumerate(self.feature_names)
+            }
+            if self._reference_score_counts is not None:
+                result['score'] = population_stability_index(
+                    self._reference_score_counts, sum(w.score_counts[source] for w in windows)
+                )
+            return result
+
+    def drift_reasons(self):
+        """Eşik aşan metrikler (yeterli gözlem yoksa boş)"""
+        with self._lock:
+            predictions, outcomes, abs_error, _ = self._recent_totals()
+
+        reasons = []
+        if predictions[TRIGGER_SOURCE] >= self.min_observations:
+            reasons += [f"psi:{name}={value:.3f}" for name, value in self.psi().items()
+                        if value > self.psi_threshold]
+        if outcomes >= self.min_observations and abs_error / outcomes > self.mae_threshold:
+            reasons.append(f"mae={abs_error / outcomes:.3f}")
+        return reasons
+
+    def check_drift(self):
+        """Kayma varsa (bekleme süresi dışında) on_drift(nedenler) çağır"""
+        now = self.clock()
+        if self.last_triggered_at is not None and now - self.last_triggered_at < self.cooldown_seconds:
+            return []
+        reasons = self.drift_reasons()
+        if reasons:
+            self.last_triggered_at = now
+            self.trigger_count += 1
+            self.last_trigger_reasons = reasons
+            if self.on_drift:
+                self.on_drift(reasons)
+        return reasons
+
+    def report(self):
+        """Endpoint için özet"""
+        with self._lock:
+            predictions, outcomes, abs_error, sq_error = self._recent_totals()
+            windows = [
+                {
+                    'start': w.index * self.window_seconds,
+                    'predictions': dict(w.predictions),
+                    'outcomes': w.outcomes,
+                    'mae': w.abs_error / w.outcomes if w.outcomes else None
+                }
+                for w in self._recent_windows()
+            ]
+        psi = {source: self.psi(source) for source in SOURCES}
+        population_psi = psi[TRIGGER_SOURCE]
+        return {
+            'reference_size': self.reference_size,
+            'window_seconds': self.window_seconds,
+            'recent': {
+                'predictions': predictions,
+                'outcomes': outcomes,
+                'mae': abs_error / outcomes if outcomes else None,
+                'rmse': float(np.sqrt(sq_error / outcomes)) if outcomes else None
+            },
+            'lifetime': {
+                'outcomes': self.total_outcomes,
+                'mae': self.total_abs_error / self.total_outcomes if self.total_outcomes else None
+            },
+            'psi': psi,
+            'psi_excluded_features': self.excluded_features,
+            'max_psi': max(population_psi.values()) if population_psi else None,
+            'thresholds': {'psi': self.psi_threshold, 'mae': self.mae_threshold,
+                           'min_observations': self.min_observations},
+            'drift': {
+                'trigger_count': self.trigger_count,
+                'last_triggered_at': self.last_triggered_at,
+                'last_reasons': self.last_trigger_reasons
+            },
+            'windows': windows
+        }
@@ -0,0 +1,315 @@
+"""
+NİLÜFER BELEDİYESİ - ÖZELLİK DEPOSU
+Eğitim ve servis tarafının ortak kullandığı konteyner özellikleri
+
+- Statik özellikler (kapasite, tip, mahalle, toplama geçmişi) tek sorguda
+  kolon bazında hesaplanır ve konteyner bazında önbelleğe alınır
+- Zamana bağlı özellikler istek anında ucuz şekilde eklenir
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DB_PATH = 'nilufer_waste.db'
+ROTATIONS_PATH = 'data/neighbor_days_rotations.csv'
+CACHE_TTL_SECONDS = 300
+
+# Doluluk sınıflandırıcısı (train_sqlite.py, models/fill_predictor.pkl)
+CLASSIFIER_FEATURES = [
+    'hours_since', 'days_since', 'day_of_week', 'is_weekend', 'month', 'season',
+    'capacity', 'container_type_encoded', 'population', 'pop_density', 'area',
+    'avg_tonnage', 'avg_fill', 'collection_count', 'capacity_usage'
+]
+
+# Doluluk regresyon modeli (train_fill_prediction.py, models/fill_prediction_model.pkl)
+REGRESSOR_FEATURES = [
+    'days_since_collection', 'day_of_week', 'month', 'is_weekend',
+    'collection_days_per_week', 'type_encoded', 'capacity_category',
+    'population_density', 'current_fill_level'
+]
+
+CONTAINER_TYPE_MAP = {'underground': 4, '770lt': 3, '400lt': 2, 'plastic': 1}
+TYPE_ENCODING = {'plastic': 1, '400lt': 2, '770lt': 3, 'underground': 4, '5000lt': 5}
+CAPACITY_BINS = [0, 300, 500, 1000, 6000]
+CAPACITY_CATEGORY_CODES = {'small': 1, 'medium': 2, 'large': 3, 'xlarge': 4}
+
+# Eksik değerler için eğitimdeki varsayılanlar
+DEFAULT_HOURS_SINCE = 168
+DEFAULT_DAYS_PER_WEEK = 3
+
+STATIC_QUERY = """
+SELECT
+    c.container_id,
+    c.neighborhood_id,
+    c.container_type,
+    c.capacity_liters,
+    c.latitude,
+    c.longitude,
+    c.last_collection_date,
+    c.current_fill_level,
+    n.neighborhood_name,
+    n.population,
+    n.population_density,
+    n.area_km2,
+    COUNT(DISTINCT ce.event_id) as collection_count,
+    AVG(ce.tonnage_collected) as avg_tonnage,
+    AVG(ce.fill_level_before) as avg_fill_before
+FROM containers c
+LEFT JOIN neighborhoods n ON c.neighborhood_id = n.neighborhood_id
+LEFT JOIN collection_events ce ON c.container_id = ce.container_id
+{where}
+GROUP BY c.container_id
+ORDER BY c.container_id
+"""
+
+
+def rotation_day_map(rotations, name_column=0, days_column=2):
+    """
+    Rotasyon tablosundan mahalle adı (büyük harf) -> haftalık toplama günü
+
+    Sayısal olmayan/boş değerler için varsayılan 3 gün; aynı mahalle
+    birden fazla satırda varsa son satır geçerlidir.
+    """
+    names = rotations[name_column] if name_column in rotations else rotations.iloc[:, name_column]
+    days = rotations[days_column] if days_column in rotations else rotations.iloc[:, days_column]
+    names = names.astype(str).str.upper().str.strip()
+    days = pd.to_numeric(days, errors='coerce').fillna(DEFAULT_DAYS_PER_WEEK).astype(int)
+    return pd.Series(days.values, index=names.values).groupby(level=0).last()
+
+
+def load_rotation_days(path=ROTATIONS_PATH):
+    """Rotasyon CSV'sinden mahalle -> haftalık toplama günü"""
+    try:
+        rotations = pd.read_csv(path, sep=';', encoding='utf-8-sig')
+    except FileNotFoundError:
+        return pd.Series(dtype=float)
+    return rotation_day_map(rotations)
+
+
+def encode_capacity_category(capacity_liters):
+    """Kapasiteyi data_preparation.py'deki kategorilere (1-4) çevir"""
+    categories = pd.cut(capacity_liters, bins=CAPACITY_BINS, labels=list(CAPACITY_CATEGORY_CODES))
+    return categories.map(CAPACITY_CATEGORY_CODES).astype(float)
+
+
+def parse_collection_dates(values):
+    """'2025-12-20' ve '2025-12-28T01:03:00.498339' biçimlerini birlikte çöz"""
+    return pd.to_datetime(values, format='ISO8601', errors='coerce')
+
+
+def _positive_or(series, default):
+    return series.fillna(default).replace(0, default)
+
+
+def derive_static_features(raw, rotation_days=None):
+    """
+    Sorgu çıktısından zamandan bağımsız türetilmiş kolonları hesapla
+
+    Parametreler:
+        raw: STATIC_QUERY çıktısı
+        rotation_days: load_rotation_days() çıktısı
+    """
+    df = raw.set_index('container_id', drop=False)
+    if rotation_days is None:
+        rotation_days = load_rotation_days()
+
+    df['last_collection'] = parse_collection_dates(df['last_collection_date'])
+    df['capacity'] = df['capacity_liters'].astype(float)
+    df['container_type_encoded'] = df['container_type'].map(CONTAINER_TYPE_MAP).fillna(2)
+    df['type_encoded'] = df['container_type'].map(TYPE_ENCODING).fillna(1)
+    df['capacity_category'] = encode_capacity_category(df['capacity_liters'])
+
+    # Mahalle adı normalizasyonu satır başına değil, benzersiz ad başına
+    names = df['neighborhood_name'].fillna('').astype('category')
+    days_by_name = (names.cat.categories.str.upper().str.strip()
+                    .map(rotation_days).fillna(DEFAULT_DAYS_PER_WEEK).to_numpy())
+    df['collection_days_per_week'] = days_by_name[names.cat.codes.to_numpy()]
+
+    # Nüfus özellikleri (eksik/sıfır değerler için eğitimdeki varsayılanlar)
+    df['population'] = _positive_or(df['population'], 10000).astype(float)
+    df['pop_density'] = _positive_or(df['population_density'], 5000).astype(float)
+    df['area'] = _positive_or(df['area_km2'], 2.0).astype(float)
+
+    # Regresyon modeli: nüfus / 1000 (data_preparation.py)
+    df['population_density'] = df['population'] / 1000
+
+    df['avg_tonnage'] = _positive_or(df['avg_tonnage'], 0.5).astype(float)
+    df['avg_fill'] = _positive_or(df['avg_fill_before'], 0.5).astype(float)
+    df['collection_count'] = df['collection_count'].fillna(0).astype(float)
+    df['capacity_usage'] = np.divide(
+        df['avg_tonnage'].to_numpy(), df['capacity'].to_numpy() / 1000,
+        out=np.full(len(df), 0.5), where=df['capacity'].to_numpy() > 0
+    )
+    return df
+
+
+def load_static_features(conn, container_ids=None, active_only=True, rotation_days=None):
+    """Konteynerlerin statik özelliklerini tek sorguda yükle"""
+    conditions, params = [], []
+    if active_only:
+        conditions.append("c.status = 'active'")
+    if container_ids is not None:
+        container_ids = [int(cid) for cid in container_ids]
+        if not container_ids:
+            conditions.append("0")
+        else:
+            conditions.append(f"c.container_id IN ({','.join('?' * len(container_ids))})")
+            params.extend(container_ids)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    raw = pd.read_sql_query(STATIC_QUERY.format(where=where), conn, params=params)
+    return derive_static_features(raw, rotation_days)
+
+
+def season_of(month):
+    """0=Kış, 1=İlkbahar, 2=Yaz, 3=Sonbahar"""
+    return (month % 12) // 3
+
+
+def classifier_features(static, now=None):
+    """Sınıflandırıcı özellik matrisi (n, 15) - zaman özellikleri `now` anına göre"""
+    now = now or datetime.now()
+    n = len(static)
+
+    hours_since = ((pd.Timestamp(now) - static['last_collection']).dt.total_seconds() / 3600)
+    hours_since = hours_since.fillna(DEFAULT_HOURS_SINCE).to_numpy()
+
+    return np.column_stack([
+        hours_since,
+        hours_since / 24,
+        np.full(n, now.weekday()),
+        np.full(n, int(now.weekday() >= 5)),
+        np.full(n, now.month),
+        np.full(n, season_of(now.month)),
+        static['capacity'].to_numpy(),
+        static['container_type_encoded'].to_numpy(),
+        static['population'].to_numpy(),
+        static['pop_density'].to_numpy(),
+        static['area'].to_numpy(),
+        static['avg_tonnage'].to_numpy(),
+        static['avg_fill'].to_numpy(),
+        static['collection_count'].to_numpy(),
+        static['capacity_usage'].to_numpy()
+    ]).astype(float)
+
+
+def regressor_features(static, now=None):
+    """
+    Regresyon modeli özellik matrisi (n, 9)
+
+    Eğitim verisindeki (data_preparation.py) tanım: gün sayısı `now` anına
+    göre, haftanın günü/ay son toplama tarihine göre. `now` satır başına
+    bir zaman dizisi de olabilir (ör. rotadaki tahmini varış zamanları).
+    """
+    if now is None:
+        now = datetime.now()
+    if np.ndim(now):
+        reference = pd.Series(pd.to_datetime(np.asarray(now)), index=static.index)
+    else:
+        reference = pd.Timestamp(now)
+    last = static['last_collection']
+    fallback = reference - pd.Timedelta(hours=DEFAULT_HOURS_SINCE)
+    last = last.fillna(fallback)
+
+    days_since = (reference - last).dt.days.to_numpy()
+    day_of_week = last.dt.dayofweek.to_numpy()
+
+    return np.column_stack([
+        days_since,
+        day_of_week,
+        last.dt.month.to_numpy(),
+        (day_of_week >= 5).astype(int),
+        static['collection_days_per_week'].to_numpy(),
+        static['type_encoded'].to_numpy(),
+        static['capacity_category'].fillna(CAPACITY_CATEGORY_CODES['medium']).to_numpy(),
+        static['population_density'].to_numpy(),
+        static['current_fill_level'].to_numpy()
+    ]).astype(float)
+
+
+class FeatureStore:
+    """
+    Servis tarafı için önbellekli özellik deposu
+
+    Statik özellikler konteyner bazında tutulur; bildirim veya toplama
+    sonrası invalidate(container_id) ile yalnızca o konteyner yenilenir.
+    Tüm önbellek CACHE_TTL_SECONDS sonra yeniden yüklenir.
+    """
+
+    def __init__(self, db_path=DB_PATH, rotations_path=ROTATIONS_PATH, ttl_seconds=CACHE_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.rotation_days = load_rotation_days(rotations_path)
+        self._lock = threading.Lock()
+        self._static = None
+        self._active_ids = None
+        self._loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _expired(self):
+        return self._static is None or time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def _query(self, container_ids=None, active_only=True):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return load_static_features(conn, container_ids, active_only, self.rotation_days)
+        finally:
+            conn.close()
+
+    def static_frame(self, container_ids=None):
+        """
+        Statik özellikler (container_id indeksli)
+
+        container_ids=None tüm aktif konteynerleri döndürür; bilinmeyen
+        kimlikler tek sorguda yüklenip önbelleğe eklenir.
+        """
+        with self._lock:
+            if self._expired():
+                self._static = self._query()
+                self._active_ids = self._static.index.copy()
+                self._loaded_at = time.monotonic()
+
+            wanted = self._active_ids if container_ids is None else pd.Index(
+                [int(cid) for cid in container_ids])
+            missing = wanted.difference(self._static.index)
+            if len(missing):
+                self.misses += len(missing)
+                loaded = self._query(missing, active_only=False)
+                self._static = pd.concat([self._static, loaded])
+            self.hits += len(wanted) - len(missing)
+
+            return self._static.loc[self._static.index.intersection(wanted, sort=False)]
+
+    def invalidate(self, container_id=None):
+        """Bir konteynerin (veya tümünün) statik özelliklerini geçersiz kıl"""
+        with self._lock:
+            if container_id is None or self._static is None:
+                self._static = None
+            else:
+                self._static = self._static.drop(index=int(container_id), errors='ignore')
+
+    def classifier_matrix(self, container_ids=None, now=None):
+        """(statik_df, X) - sınıflandırıcı için"""
+        static = self.static_frame(container_ids)
+        return static, classifier_features(static, now)
+
+    def regressor_matrix(self, container_ids=None, now=None):
+        """(statik_df, X) - regresyon modeli için"""
+        static = self.static_frame(container_ids)
+        return static, regressor_features(static, now)
+
+    def stats(self):
+        cached = 0 if self._static is None else len(self._static)
+        total = self.hits + self.misses
+        return {
+            'cached_containers': cached,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
@@ -0,0 +1,258 @@
+"""
+NİLÜFER BELEDİYESİ - DOLUM HIZI TAHMİNİ
+collection_events geçmişinden konteyner bazlı günlük dolum hızı, haftanın
+günü mevsimselliği ve "konteyner ne zaman %75'e ulaşır?" tahmini
+
+Tüm konteynerler için tek bir gruplanmış, vektörel geçişte hesaplanır:
+    - Ardışık iki toplama arası: fill_level_before / (haftanın günü ağırlıklı gün)
+    - Az geçmişi olan konteynerler mahalle hızına, mahalleler genel hıza çekilir
+
+Kullanım:
+    python fill_forecast.py [eşik]
+"""
+
+import sqlite3
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from feature_store import parse_collection_dates
+
+DB_PATH = 'nilufer_waste.db'
+
+FULL_THRESHOLD = 0.75
+DEFAULT_DAILY_RATE = 0.08       # Geçmiş hiç yoksa (data_preparation.py'deki varsayım)
+CONTAINER_PRIOR_DAYS = 14.0     # Konteyner hızını mahalleye çeken önsel (efektif gün)
+NEIGHBORHOOD_PRIOR_DAYS = 28.0  # Mahalle hızını genel hıza çeken önsel
+SEASONALITY_RIDGE = 1000.0      # Gün ağırlıklarını düz profile çeken ridge (counts.T @ counts birimi)
+MIN_WEEKDAY_FACTOR = 0.2
+SEASONALITY_ITERATIONS = 5
+
+EVENTS_QUERY = """
+    SELECT e.container_id, c.neighborhood_id, e.collection_date, e.fill_level_before
+    FROM collection_events e
+    JOIN containers c ON e.container_id = c.container_id
+    WHERE e.fill_level_before IS NOT NULL
+"""
+
+CONTAINERS_QUERY = """
+    SELECT container_id, neighborhood_id, current_fill_level, last_collection_date
+    FROM containers
+    WHERE status = 'active'
+"""
+
+
+def collection_intervals(events):
+    """
+    Ardışık toplamalar arası aralıklar
+
+    Her aralık bir önceki toplamanın ertesi günü başlar, toplama günü dahil
+    biter; dolum = bu toplamadaki fill_level_before. İlk toplama ve aynı
+    gün tekrarlanan toplamalar atlanır.
+    """
+    events = events.assign(collection_date=parse_collection_dates(events['collection_date']).dt.normalize())
+    events = events.sort_values(['container_id', 'collection_date'], kind='mergesort')
+
+    previous = events.groupby('container_id')['collection_date'].shift()
+    n_days = (events['collection_date'] - previous).dt.days
+    valid = n_days > 0
+
+    return pd.DataFrame({
+        'container_id': events['container_id'][valid].to_numpy(),
+        'neighborhood_id': events['neighborhood_id'][valid].to_numpy(),
+        'start_dow': ((previous[valid].dt.dayofweek + 1) % 7).to_numpy(),
+        'n_days': n_days[valid].to_numpy(dtype=np.int64),
+        'fill': events['fill_level_before'][valid].to_numpy(dtype=float)
+    })
+
+
+def weekday_counts(start_dow, n_days):
+    """Her aralıktaki pazartesi..pazar sayıları (n x 7)"""
+    start_dow = np.asarray(start_dow, dtype=np.int64)[:, None]
+    n_days = np.asarray(n_days, dtype=np.int64)[:, None]
+    offset = (np.arange(7) - start_dow) % 7
+    return n_days // 7 + (offset < n_days % 7)
+
+
+def fit_weekday_factors(counts, fills, container_ids, ridge=SEASONALITY_RIDGE,
+                        iterations=SEASONALITY_ITERATIONS):
+    """
+    Haftanın günü dolum çarpanları (ortalaması 1)
+
+    Model: dolum = konteyner hızı × (counts @ çarpanlar). Konteyner hızları
+    ve çarpanlar birkaç tur dönüşümlü en küçük kareler ile bulunur;
+    çarpanlar düz profile (hepsi 1) doğru ridge ile çekilir, böylece veri
+    azken 1'e yakın kalır.
+    """
+    counts = np.asarray(counts, dtype=float)
+    fills = np.asarray(fills, dtype=float)
+    if not len(fills):
+        return np.ones(7)
+
+    groups = pd.factorize(np.asarray(container_ids))[0]
+    fill_sums = np.bincount(groups, weights=fills)
+    factors = np.ones(7)
+    for _ in range(iterations):
+        day_sums = np.bincount(groups, weights=counts @ factors)
+        container_rate = (fill_sums / np.maximum(day_sums, 1e-9))[groups]
+        valid = container_rate > 0
+        scaled = counts[valid] * container_rate[valid, None]
+
+        lhs = scaled.T @ scaled + ridge * np.eye(7) * np.mean(container_rate) ** 2
+        rhs = scaled.T @ fills[valid] + ridge * np.mean(container_rate) ** 2
+        factors = np.maximum(np.linalg.solve(lhs, rhs), MIN_WEEKDAY_FACTOR)
+        factors = factors / factors.mean()
+    return factors
+
+
+def estimate_fill_rates(intervals, containers, weekday_factors,
+                        container_prior=CONTAINER_PRIOR_DAYS,
+                        neighborhood_prior=NEIGHBORHOOD_PRIOR_DAYS):
+    """
+    Konteyner başına günlük dolum hızı (ortalama gün = çarpan 1)
+
+    Hız = toplam dolum / toplam efektif gün. Küçültme önselleri sayesinde
+    geçmişi olmayan konteyner mahalle hızını, geçmişi olmayan mahalle genel
+    hızı alır.
+
+    Döndürür:
+        container_id indeksli DataFrame: neighborhood_id, intervals,
+        observed_days, daily_rate, rate_source
+    """
+    effective_days = weekday_counts(intervals['start_dow'], intervals['n_days']) @ weekday_factors
+    intervals = intervals.assign(effective_days=effective_days)
+
+    total_days = intervals['effective_days'].sum()
+    global_rate = intervals['fill'].sum() / total_days if total_days > 0 else DEFAULT_DAILY_RATE
+
+    by_neighborhood = intervals.groupby('neighborhood_id')[['fill', 'effective_days']].sum()
+    neighborhood_rate = (
+        (by_neighborhood['fill'] + neighborhood_prior * global_rate)
+        / (by_neighborhood['effective_days'] + neighborhood_prior)
+    )
+
+    by_container = intervals.groupby('container_id').agg(
+        fill=('fill', 'sum'),
+        effective_days=('effective_days', 'sum'),
+        intervals=('fill', 'size')
+    )
+
+    rates = containers[['container_id', 'neighborhood_id']].set_index('container_id')
+    rates = rates.join(by_container)
+    rates['intervals'] = rates['intervals'].fillna(0).astype(int)
+    fill = rates['fill'].fillna(0.0)
+    days = rates['effective_days'].fillna(0.0)
+
+    prior_rate = rates['neighborhood_id'].map(neighborhood_rate).fillna(global_rate)
+    rates['observed_days'] = days
+    rates['daily_rate'] = (fill + container_prior * prior_rate) / (days + container_prior)
+    rates['rate_source'] = np.select(
+        [rates['intervals'] > 0, rates['neighborhood_id'].isin(neighborhood_rate.index)],
+        ['container', 'neighborhood'],
+        default='global'
+    )
+    return rates.drop(columns=['fill', 'effective_days'])
+
+
+def days_to_threshold(current_fill, daily_rate, weekday_factors, start_dow, threshold=FULL_THRESHOLD):
+    """
+    Eşiğe kalan gün sayısı (kesirli), haftanın günü çarpanlarıyla
+
+    Tam haftalar kapalı formda atlanır; kalan kısım başlangıç gününden
+    itibaren kümülatif çarpan tablosunda aranır.
+    """
+    current_fill = np.asarray(current_fill, dtype=float)
+    daily_rate = np.maximum(np.asarray(daily_rate, dtype=float), 1e-9)
+
+    needed = np.maximum(threshold - current_fill, 0.0) / daily_rate   # efektif gün
+    week_total = weekday_factors.sum()
+    weeks = np.floor(needed / week_total)
+    remainder = needed - weeks * week_total
+
+    week_factors = np.roll(weekday_factors, -start_dow)
+    cumulative = np.concatenate([[0.0], np.cumsum(week_factors)])
+    full_days = np.minimum((cumulative[1:] <= remainder[:, None]).sum(axis=1), 6)
+    partial = (remainder - cumulative[full_days]) / week_factors[full_days]
+
+    return weeks * 7 + full_days + partial
+
+
+def elapsed_effective_days(last_collection, now, weekday_factors):
+    """
+    Son toplamadan now'a kadar geçen efektif gün (haftanın günü ağırlıklı)
+
+    collection_intervals gibi toplamanın ertesi günü başlar; bugün geçen
+    kesirli kısmıyla sayılır. Tarihsiz ya da bugünkü toplamalarda 0.
+    """
+    now = pd.Timestamp(now)
+    today = now.normalize()
+    last = pd.Series(last_collection).dt.normalize()
+    started = (last < today).to_numpy()
+
+    whole_days = np.where(started, (today - last).dt.days.fillna(0).to_numpy() - 1, 0).astype(np.int64)
+    start_dow = ((last.dt.dayofweek.fillna(0).astype(int) + 1) % 7).to_numpy()
+    elapsed = weekday_counts(start_dow, whole_days) @ weekday_factors
+    today_fraction = (now - today) / pd.Timedelta(days=1)
+    return elapsed + started * today_fraction * weekday_factors[now.dayofweek]
+
+
+def build_forecast(conn, now=None, threshold=FULL_THRESHOLD):
+    """
+    Tüm aktif konteynerler için dolum hızı ve eşiğe ulaşma tahmini
+
+    current_fill_level son toplamadaki (last_collection_date) seviyedir
+    (data_preparation / feature_store ile aynı); önce hız × geçen efektif
+    gün ile now'a taşınır, eşiği geçmiş konteynerlerde kalan gün 0 olur.
+
+    Döndürür:
+        (forecast DataFrame, haftanın günü çarpanları)
+    """
+    now = pd.Timestamp(now or datetime.now())
+    intervals = collection_intervals(pd.read_sql_query(EVENTS_QUERY, conn))
+    containers = pd.read_sql_query(CONTAINERS_QUERY, conn)
+
+    counts = weekday_counts(intervals['start_dow'], intervals['n_days'])
+    factors = fit_weekday_factors(counts, intervals['fill'], intervals['container_id'])
+    forecast = estimate_fill_rates(intervals, containers, factors)
+
+    containers = containers.set_index('container_id').reindex(forecast.index)
+    current_fill = containers['current_fill_level'].fillna(0.0).to_numpy()
+    elapsed = elapsed_effective_days(parse_collection_dates(containers['last_collection_date']), now, factors)
+    projected = current_fill + forecast['daily_rate'].to_numpy() * elapsed
+
+    forecast['current_fill_level'] = current_fill
+    forecast['projected_fill_level'] = np.minimum(projected, 1.0)
+    forecast['days_to_threshold'] = days_to_threshold(
+        projected, forecast['daily_rate'].to_numpy(), factors, now.dayofweek, threshold
+    )
+    forecast['reach_date'] = now + pd.to_timedelta(forecast['days_to_threshold'], unit='D')
+    return forecast.reset_index(), factors
+
+
+def main():
+    threshold = float(sys.argv[1]) if len(sys.argv) > 1 else FULL_THRESHOLD
+
+    print("=" * 80)
+    print("📈 DOLUM HIZI TAHMİNİ - TOPLAMA GEÇMİŞİNDEN")
+    print("=" * 80)
+
+    conn = sqlite3.connect(DB_PATH)
+    forecast, factors = build_forecast(conn, threshold=threshold)
+    conn.close()
+
+    day_names = ['Pzt', 'Sal', 'Çar', 'Per', 'Cum', 'Cmt', 'Paz']
+    print("\n📅 Haftanın günü çarpanları: " + ", ".join(f"{d} {f:.2f}" for d, f in zip(day_names, factors)))
+    print(f"\n🗑️ {len(forecast)} konteyner - hız kaynağı:")
+    for source, count in forecast['rate_source'].value_counts().items():
+        print(f"   {source}: {count}")
+    print(f"   Ortalama günlük dolum: {forecast['daily_rate'].mean():.1%}")
+
+    for days in (1, 3, 7):
+        count = int((forecast['days_to_threshold'] <= days).sum())
+        print(f"⏱️ {days} gün içinde %{threshold * 100:.0f}'e ulaşacak: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+NİLÜFER BELEDİYESİ - GPS KOLON ÖNBELLEĞİ
+data/all_merged_data.csv dosyasını bir kez tipli kolon dizilerine (.npy)
+çevirir; sonraki çalıştırmalar metni yeniden çözmek yerine yalnızca istenen
+kolonları mmap ile açar.
+
+    - Süre kolonları önceden dakikaya çevrilir (gps_features.duration_minutes)
+    - Plaka / Mahalle / Açıklama sözlük kodlanır (int32 kod + kategori dizisi)
+    - Tarih datetime64[ns], sayısal kolonlar float64 olarak saklanır
+    - CSV'nin boyutu/mtime'ı değişirse SHA-1 karşılaştırılır; içerik
+      değişmişse önbellek yeniden üretilir
+
+Kullanım:
+    python gps_cache.py [gps.csv]
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from gps_features import duration_minutes, parse_gps_times
+from model_store import META_FILE, array_schema, file_sha1, save_model_arrays
+
+GPS_PATH = 'data/all_merged_data.csv'
+CACHE_FORMAT = 2  # 2: Tarih açık biçimlerle (gps_features.TIME_FORMATS) çözülür
+BUILD_CHUNK_SIZE = 100000
+
+DURATION_COLUMNS = ('Duraklama Süresi', 'Rölanti Süresi')
+CATEGORY_COLUMNS = ('Plaka', 'Mahalle', 'Açıklama')
+NUMERIC_COLUMNS = ('Hız(km/sa)', 'Mesafe(km)', 'Enlem', 'Boylam')
+DATETIME_COLUMNS = ('Tarih',)
+
+
+def cache_dir_for(csv_path):
+    """data/all_merged_data.csv -> data/all_merged_data_columns"""
+    return os.path.splitext(csv_path)[0] + '_columns'
+
+
+def cached_columns():
+    """Önbelleğe alınan kolonlar ve türleri"""
+    kinds = {}
+    for names, kind in ((DURATION_COLUMNS, 'duration'), (CATEGORY_COLUMNS, 'category'),
+                        (NUMERIC_COLUMNS, 'numeric'), (DATETIME_COLUMNS, 'datetime')):
+        kinds.update(dict.fromkeys(names, kind))
+    return kinds
+
+
+class _CategoryEncoder:
+    """Parçalar boyunca ortak sözlük: değer -> kod (NaN = -1)"""
+
+    def __init__(self):
+        self.codes = {}
+
+    def encode(self, values):
+        local, uniques = pd.factorize(values)
+        lookup = [self.codes.setdefault(value, len(self.codes)) for value in uniques]
+        # Sona eklenen -1: factorize'ın NaN kodu (-1) doğrudan ona düşer
+        return np.array(lookup + [-1], dtype=np.int32)[local]
+
+    def categories(self):
+        return np.array(list(self.codes), dtype=str)
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'source_size': stat.st_size, 'source_mtime': stat.st_mtime}
+
+
+def build_gps_cache(csv_path=GPS_PATH, cache_dir=None, chunk_size=BUILD_CHUNK_SIZE):
+    """
+    CSV'yi parça parça okuyup tipli kolon dizilerine yaz (ham metin
+    bellekte birikmez, yalnızca çözülmüş diziler)
+
+    Döndürür:
+        meta sözlüğü
+    """
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    started = time.perf_counter()
+    header = pd.read_csv(csv_path, nrows=0, encoding='utf-8').columns
+    kinds = {name: kind for name, kind in cached_columns().items() if name in header}
+
+    parts = {name: [] for name in kinds}
+    encoders = {name: _CategoryEncoder() for name, kind in kinds.items() if kind == 'category'}
+    rows = 0
+    reader = pd.read_csv(csv_path, usecols=list(kinds), chunksize=chunk_size, encoding='utf-8',
+                         on_bad_lines='skip', dtype={name: str for name in kinds if kinds[name] != 'numeric'})
+    for chunk in reader:
+        rows += len(chunk)
+        for name, kind in kinds.items():
+            values = chunk[name]
+            if kind == 'duration':
+                parts[name].append(duration_minutes(values))
+            elif kind == 'category':
+                parts[name].append(encoders[name].encode(values))
+            elif kind == 'numeric':
+                parts[name].append(pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64))
+            else:
+                parts[name].append(parse_gps_times(values))
+
+    # Dosya adları kolon sırasıdır (kolon adlarında '/' ve Türkçe karakter var)
+    arrays, columns = {}, []
+    for i, (name, kind) in enumerate(kinds.items()):
+        key = f'c{i}'
+        arrays[key] = np.concatenate(parts.pop(name)) if rows else np.array([])
+        if kind == 'category':
+            arrays[f'{key}_categories'] = encoders[name].categories()
+        columns.append({'name': name, 'kind': kind, 'key': key})
+
+    meta = {
+        'format': CACHE_FORMAT,
+        'source': os.path.abspath(csv_path),
+        'source_sha1': file_sha1(csv_path),
+        **_source_signature(csv_path),
+        'rows': rows,
+        'columns': columns,
+        'built_at': pd.Timestamp.now().isoformat(),
+        'arrays': array_schema(arrays)
+    }
+    save_model_arrays(arrays, meta, cache_dir)
+    print(f"✓ GPS önbelleği oluşturuldu: {rows:,} kayıt, {len(columns)} kolon "
+          f"({time.perf_counter() - started:.1f} sn) -> {cache_dir}")
+    return meta
+
+
+def _read_meta(cache_dir):
+    meta_path = os.path.join(cache_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def cache_is_fresh(csv_path=GPS_PATH, cache_dir=None):
+    """
+    Önbellek CSV ile güncel mi? Boyut ve mtime aynıysa dosya okunmaz;
+    farklıysa SHA-1 karşılaştırılır (içerik aynıysa imza güncellenir)
+    """
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    meta = _read_meta(cache_dir)
+    if meta is None or meta.get('format') != CACHE_FORMAT:
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    signature = _source_signature(csv_path)
+    if all(meta.get(key) == value for key, value in signature.items()):
+        return True
+    if meta.get('source_sha1') != file_sha1(csv_path):
+        return False
+
+    # Dokunulmuş ama değişmemiş dosya: bir sonraki kontrol yine hızlı yoldan geçsin
+    meta.update(signature)
+    with open(os.path.join(cache_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    return True
+
+
+def ensure_gps_cache(csv_path=GPS_PATH, cache_dir=None):
+    """Önbellek güncel değilse oluştur; meta sözlüğünü döndür"""
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    if cache_is_fresh(csv_path, cache_dir):
+        return _read_meta(cache_dir)
+    return build_gps_cache(csv_path, cache_dir)
+
+
+class GpsColumns:
+    """mmap ile açılmış kolon dizileri; istenen satır aralığından DataFrame üretir"""
+
+    def __init__(self, cache_dir, meta, columns=None, mmap_mode='r'):
+        self.meta = meta
+        self.rows = meta['rows']
+        available = {column['name']: column for column in meta['columns']}
+        names = list(available) if columns is None else [name for name in columns if name in available]
+        self.columns = [available[name] for name in names]
+
+        schema = meta['arrays']
+        self.arrays, self.categories = {}, {}
+        for column in self.columns:
+            key = column['key']
+            self.arrays[key] = np.load(os.path.join(cache_dir, f'{key}.npy'), mmap_mode=mmap_mode)
+            if column['kind'] == 'category':
+                self.categories[key] = pd.Index(np.load(os.path.join(cache_dir, f'{key}_categories.npy')))
+        if array_schema(self.arrays) != {key: schema[key] for key in self.arrays}:
+            raise ValueError(f"{cache_dir}: diziler meta.json şemasıyla uyuşmuyor")
+
+    def frame(self, start=0, stop=None):
+        """[start, stop) satırları (indeks = dosyadaki satır sırası); kategoriler Categorical"""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        data = {}
+        for column in self.columns:
+            values = np.asarray(self.arrays[column['key']][start:stop])
+            if column['kind'] == 'category':
+                values = pd.Categorical.from_codes(values, self.categories[column['key']], validate=False)
+            data[column['name']] = values
+        return pd.DataFrame(data, index=pd.RangeIndex(start, stop))
+
+    def iter_frames(self, chunk_size):
+        for start in range(0, self.rows, chunk_size):
+            yield self.frame(start, start + chunk_size)
+
+
+def open_gps_columns(csv_path=GPS_PATH, columns=None, cache_dir=None):
+    """Önbelleği (gerekirse oluşturarak) aç; yalnızca istenen kolonlar eşlenir"""
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    meta = ensure_gps_cache(csv_path, cache_dir)
+    return GpsColumns(cache_dir, meta, columns)
+
+
+def load_gps_frame(csv_path=GPS_PATH, columns=None, cache_dir=None):
+    """
+    GPS kayıtlarını önbellekten DataFrame olarak yükle
+
+    Süre kolonları dakika (float), Plaka/Mahalle/Açıklama kategoriktir.
+    Önbellekte olmayan kolonlar (ör. '#') döndürülmez.
+    """
+    return open_gps_columns(csv_path, columns, cache_dir).frame()
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else GPS_PATH
+    if not os.path.exists(csv_path):
+        print(f"❌ GPS dosyası bulunamadı: {csv_path}")
+        return
+
+    if cache_is_fresh(csv_path):
+        print(f"✓ GPS önbelleği güncel: {cache_dir_for(csv_path)}")
+    else:
+        build_gps_cache(csv_path)
+
+    started = time.perf_counter()
+    frame = load_gps_frame(csv_path)
+    print(f"✓ {len(frame):,} kayıt önbellekten yüklendi ({time.perf_counter() - started:.3f} sn)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+NİLÜFER BELEDİYESİ - GPS KAYIT ÖZELLİKLERİ
+Araç takip dışa aktarımındaki (data/all_merged_data.csv) ham kolonları
+bütün kolon üzerinde, satır döngüsü olmadan sayısal değerlere çevirir.
+
+Süre kolonları ('Duraklama Süresi', 'Rölanti Süresi') 'SS:DD:ss' biçimindedir.
+Bu biçimdeki değerler sabit genişlikli bayt dizisine çevrilip rakamlar tek
+NumPy işlemiyle okunur; standart dışı uzunluktaki değerler ('123:04:05',
+'1:02:03') düzenli ifadeyle çözülür, bozuk değerler NaN olur.
+
+Zaman damgaları ('Tarih') açık biçim listesiyle çözülür; biçim her parçanın
+ilk değerinden tahmin edilmez (Türkçe 'gg.aa.yyyy' dışa aktarımında
+'05.01.2025' 1 Mayıs olarak okunup sonraki '13.01.2025' NaT olabiliyordu).
+
+Olay açıklamaları ('Açıklama': Duran, Rölanti Alarmı, Kontak Kapandı...) az
+sayıda farklı metinden oluşur. Metinler sözlük kodlanır, her farklı metin
+bir kez sınıflandırılır ve satır bayrakları tamsayı tablo okumasıyla gelir.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+DURATION_WIDTH = 8                     # 'SS:DD:ss'
+DURATION_DIGITS = [0, 1, 3, 4, 6, 7]   # Rakam konumları (2 ve 5 ':')
+DURATION_PATTERN = r'^\s*(\d+):(\d{1,2}):(\d{1,2})\s*$'
+
+# Araç takip dışa aktarımlarındaki zaman biçimleri (sırayla denenir; gün önce)
+TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M', '%d/%m/%Y %H:%M:%S')
+
+# Olay kategorileri: küçük harfli açıklamada geçen anahtar kelimeler
+# (yeni kategori eklemek satırlar üzerinde yeni tarama gerektirmez)
+EVENT_CATEGORIES = {
+    'duran': ('duran', 'duraklama'),
+    'rolanti': ('rölanti',),
+    'alarm': ('alarm',),
+    'trafik': ('hız', 'kırmızı', 'trafik', 'kaza', 'ihlal'),  # Negatif göstergeler
+    'kontak': ('kontak',),
+}
+
+
+def _fixed_width_chars(values):
+    """Değerleri (n, DURATION_WIDTH + 1) karakter kodu matrisine çevir"""
+    width = DURATION_WIDTH + 1  # Fazladan bir karakter: daha uzun değerleri yakalar
+    try:
+        raw, code = values.astype(f'S{width}'), np.uint8
+    except UnicodeEncodeError:
+        raw, code = values.astype(f'U{width}'), np.uint32
+    return raw.view(code).reshape(len(values), width)
+
+
+def duration_minutes(values):
+    """
+    'SS:DD:ss' süre kolonunu dakikaya çevir (vektörel)
+
+    Parametreler:
+        values: Süre dizisi/Series (str, NaN veya karışık); sayısal dizi
+            zaten dakikadır (gps_cache önbelleği) ve olduğu gibi döner
+
+    Döndürür:
+        float64 dizi; boş ve bozuk değerler NaN
+    """
+    if np.asarray(values).dtype.kind in 'fiu':
+        return np.asarray(values, dtype=np.float64)
+    values = np.asarray(values, dtype=object)
+    minutes = np.full(len(values), np.nan)
+    if len(values) == 0:
+        return minutes
+
+    chars = _fixed_width_chars(values)
+    digits = chars[:, DURATION_DIGITS].astype(np.int16) - ord('0')
+    fixed = ((chars[:, 2] == ord(':')) & (chars[:, 5] == ord(':'))
+             & (chars[:, DURATION_WIDTH] == 0)
+             & ((digits >= 0) & (digits <= 9)).all(axis=1))
+
+    d = digits[fixed]
+    minutes[fixed] = ((d[:, 0] * 10 + d[:, 1]) * 60.0 + (d[:, 2] * 10 + d[:, 3])
+                      + (d[:, 4] * 10 + d[:, 5]) / 60.0)
+
+    # Sabit genişliğe uymayan metinler (az sayıda): düzenli ifadeyle
+    rest = np.flatnonzero(~fixed)
+    if len(rest):
+        parts = (pd.Series(values[rest], dtype=object).astype(str)
+                 .str.extract(DURATION_PATTERN)
+                 .astype(float)
+                 .to_numpy())
+        minutes[rest] = parts[:, 0] * 60 + parts[:, 1] + parts[:, 2] / 60
+
+    return minutes
+
+
+def parse_gps_times(values, formats=TIME_FORMATS):
+    """
+    'Tarih' kolonunu datetime64[ns] diziye çevir (biçimler açık, çıkarım yok)
+
+    Her değer listedeki ilk uyan biçimle çözülür; hiçbirine uymayan NaT olur.
+    Zaten datetime olan kolon olduğu gibi döner.
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype='datetime64[ns]')
+    times = pd.to_datetime(values, format=formats[0], errors='coerce')
+    # Kalan değerler sırayla diğer biçimlerle, en son baştaki/sondaki boşluk atılarak
+    passes = [(time_format, False) for time_format in formats[1:]] + [(time_format, True) for time_format in formats]
+    for time_format, strip in passes:
+        missing = times.isna() & values.notna()
+        if not missing.any():
+            break
+        text = values[missing].astype(str).str.strip() if strip else values[missing]
+        times[missing] = pd.to_datetime(text, format=time_format, errors='coerce')
+    return times.to_numpy(dtype='datetime64[ns]')
+
+
+class EventClassifier:
+    """
+    Açıklama metinlerini olay kategorilerine ayırır
+
+    Her farklı metin bir kez sınıflandırılıp bit maskesi olarak saklanır
+    (parçalar arasında da); satırlar yalnızca kod -> maske tablosundan okunur.
+    """
+
+    def __init__(self, categories=EVENT_CATEGORIES):
+        self.names = list(categories)
+        self.patterns = [re.compile('|'.join(map(re.escape, keywords))) for keywords in categories.values()]
+        self._masks = {}
+
+    def _mask(self, text):
+        mask = self._masks.get(text)
+        if mask is None:
+            mask = 0
+            if isinstance(text, str):
+                lowered = text.lower()
+                for bit, pattern in enumerate(self.patterns):
+                    if pattern.search(lowered):
+                        mask |= 1 << bit
+            self._masks[text] = mask
+        return mask
+
+    def masks(self, values):
+        """Satır başına kategori bit maskesi (boş/metin dışı değer = 0)"""
+        if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories  # gps_cache: zaten kodlu
+        else:
+            codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        # Son eleman boş değerler içindir (kod -1)
+        lookup = np.array([self._mask(text) for text in uniques] + [0], dtype=np.uint32)
+        return lookup[codes]
+
+    def flags(self, values):
+        """
+        Kategori bayrakları
+
+        Döndürür:
+            {'is_<kategori>': int dizi (0/1)} kategori sırasıyla
+        """
+        masks = self.masks(values)
+        return {f'is_{name}': ((masks >> bit) & 1).astype(np.int64) for bit, name in enumerate(self.names)}
@@ -0,0 +1,238 @@
+"""
+NİLÜFER BELEDİYESİ - HİPERPARAMETRE ARAMASI
+Doluluk regresyon modeli için paralel, süre sınırlı çapraz doğrulama araması
+
+- Adaylar çekirdekler arasında paralel çalışır (ProcessPoolExecutor)
+- Fold bölmeleri ve özellik matrisi bir kez .npy olarak önbelleğe alınır,
+  worker'lar mmap ile okur
+- Süre bütçesi dolunca bekleyen adaylar iptal edilir, çalışanlar sonraki
+  fold'dan önce durur
+- Her denemenin metrikleri ve süreleri fill_model_search.json'a yazılır
+- Hız ölçütü, API'nin ödediği maliyet: dışa aktarılmış dizilerle (ForestArrays)
+  tek satır tahmin süresi
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from datetime import datetime
+from itertools import product
+
+import numpy as np
+
+CACHE_DIR = 'models/search_cache'
+TRIALS_PATH = 'models/fill_model_search.json'
+
+N_SPLITS = 5
+RANDOM_STATE = 42
+SEARCH_BUDGET_SECONDS = 120
+MAE_TOLERANCE = 0.05   # En iyi CV MAE'ye göre izin verilen göreli artış
+SERVING_LATENCY_ROWS = 200  # Tek satır gecikmesi için ölçülen satır sayısı
+
+SEARCH_SPACE = {
+    'RandomForest': {
+        'n_estimators': [100, 200],
+        'max_depth': [8, 15],
+        'min_samples_leaf': [1, 4]
+    },
+    'GradientBoosting': {
+        'n_estimators': [50, 150, 300],
+        'learning_rate': [0.05, 0.1],
+        'max_depth': [3, 5]
+    }
+}
+
+
+def build_estimator(model_name, params):
+    """Aday adından sklearn modeli oluştur"""
+    from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+
+    if model_name == 'RandomForest':
+        return RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=1, **params)
+    return GradientBoostingRegressor(random_state=RANDOM_STATE, **params)
+
+
+def candidate_grid(search_space=SEARCH_SPACE):
+    """
+    [(model_adı, parametreler)] listesi, tahmini maliyete göre artan
+
+    Ucuz adaylar önce çalışır; bütçe dar olsa da her iki model ailesi denenir.
+    """
+    candidates = []
+    for model_name, grid in search_space.items():
+        names = sorted(grid)
+        for values in product(*(grid[name] for name in names)):
+            candidates.append((model_name, dict(zip(names, values))))
+    return sorted(candidates, key=lambda c: c[1].get('n_estimators', 100) * c[1].get('max_depth', 10))
+
+
+def cache_folds(X, y, n_splits=N_SPLITS, cache_dir=CACHE_DIR):
+    """
+    X, y ve fold ataması .npy olarak önbelleğe alınır
+
+    Anahtar verinin özetidir; aynı veriyle tekrar çağrılınca dosyalar
+    yeniden yazılmaz.
+
+    Döndürür:
+        Önbellek klasörü
+    """
+    from sklearn.model_selection import KFold
+
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    digest = hashlib.sha1(X.tobytes() + y.tobytes() + f'{n_splits}:{RANDOM_STATE}'.encode()).hexdigest()[:12]
+    path = os.path.join(cache_dir, digest)
+    if os.path.exists(os.path.join(path, 'folds.npy')):
+        return path
+
+    folds = np.empty(len(y), dtype=np.int8)
+    splitter = KFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE)
+    for fold, (_, test_idx) in enumerate(splitter.split(X)):
+        folds[test_idx] = fold
+
+    # Süreç başına geçici klasör: aynı veriyle eşzamanlı çağrılar birbirinin dosyasına yazmaz
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    os.makedirs(tmp_path, exist_ok=True)
+    np.save(os.path.join(tmp_path, 'X.npy'), X)
+    np.save(os.path.join(tmp_path, 'y.npy'), y)
+    np.save(os.path.join(tmp_path, 'folds.npy'), folds)
+    try:
+        if not os.path.exists(path):
+            os.replace(tmp_path, path)
+    except OSError:
+        pass  # Başka süreç aynı içeriği önce yazdı
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    return path
+
+
+def load_cached(path):
+    """Önbellekteki X, y, fold dizileri (mmap)"""
+    return tuple(np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in ('X', 'y', 'folds'))
+
+
+def serving_latency_us(model, X, n_rows=SERVING_LATENCY_ROWS):
+    """
+    API'deki yol: dışa aktarılmış dizilerle (ForestArrays) tek satır tahmin
+    süresi, satır başına ortanca (µs)
+    """
+    from model_store import ForestArrays, model_arrays
+
+    forest = ForestArrays(*model_arrays(model))
+    rows = np.asarray(X[:n_rows], dtype=np.float64)
+    forest.predict(rows[:1])  # Isınma
+    timings = []
+    for row in rows:
+        started = time.perf_counter()
+        forest.predict(row[None, :])
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings) * 1e6)
+
+
+def run_trial(cache_path, model_name, params, deadline):
+    """
+    Bir adayı tüm fold'larda değerlendir (worker süreçte çalışır)
+
+    Süre dolarsa kalan fold'lar atlanır ve deneme 'timeout' olarak döner.
+    """
+    X, y, folds = load_cached(cache_path)
+    n_splits = int(folds.max()) + 1
+    maes, fit_seconds, predict_us = [], 0.0, []
+
+    for fold in range(n_splits):
+        if time.time() > deadline:
+            break
+        train, test = folds != fold, folds == fold
+        model = build_estimator(model_name, params)
+
+        started = time.perf_counter()
+        model.fit(X[train], y[train])
+        fit_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        y_pred = np.clip(model.predict(X[test]), 0, 0.95)
+        predict_us.append((time.perf_counter() - started) * 1e6 / test.sum())
+        maes.append(float(np.abs(y[test] - y_pred).mean()))
+
+    trial = {
+        'model_name': model_name,
+        'params': params,
+        'status': 'ok' if len(maes) == n_splits else ('timeout' if maes else 'skipped'),
+        'folds_done': len(maes),
+        'fit_seconds': round(fit_seconds, 4),
+        'predict_us_per_row': float(np.mean(predict_us)) if predict_us else None
+    }
+    if maes:
+        trial['cv_mae'] = float(np.mean(maes))
+        trial['cv_mae_std'] = float(np.std(maes))
+        trial['n_nodes'] = int(sum(est.tree_.node_count for est in np.ravel(model.estimators_)))
+    if trial['status'] == 'ok':
+        trial['serving_us_per_row'] = serving_latency_us(model, X[test])
+    return trial
+
+
+def search(X, y, candidates=None, budget_seconds=SEARCH_BUDGET_SECONDS, n_jobs=None,
+           cache_dir=CACHE_DIR):
+    """
+    Adayları paralel ve süre sınırlı değerlendir
+
+    Döndürür:
+        Deneme listesi (status: 'ok', yarıda kalan 'timeout', başlamayan 'skipped')
+    """
+    candidates = candidates if candidates is not None else candidate_grid()
+    cache_path = cache_folds(X, y, cache_dir=cache_dir)
+    deadline = time.time() + budget_seconds
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    trials, results = [], {}
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = {pool.submit(run_trial, cache_path, name, params, deadline): (name, params)
+                   for name, params in candidates}
+        try:
+            for future in as_completed(futures, timeout=max(deadline - time.time(), 0)):
+                results[future] = future.result()
+        except FuturesTimeout:
+            pass
+
+        # Önce bekleyenleri iptal et; çalışanlar bir sonraki fold'dan önce duracak
+        cancelled = {future for future in futures if future not in results and future.cancel()}
+        for future, (name, params) in futures.items():
+            if future in cancelled:
+                trials.append({'model_name': name, 'params': params, 'status': 'skipped', 'folds_done': 0})
+            else:
+                trials.append(results.get(future) or future.result())
+    return trials
+
+
+def select_trial(trials, tolerance=MAE_TOLERANCE):
+    """
+    En iyi CV MAE'nin (1 + tolerance) katı içindeki, API'de en hızlı
+    (tek satır, ForestArrays) tahmin eden deneme
+
+    Yalnızca tüm fold'ları biten denemeler dikkate alınır.
+    """
+    finished = [trial for trial in trials if trial['status'] == 'ok']
+    if not finished:
+        return None
+    best_mae = min(trial['cv_mae'] for trial in finished)
+    eligible = [trial for trial in finished if trial['cv_mae'] <= best_mae * (1 + tolerance)]
+    return min(eligible, key=lambda trial: (trial['serving_us_per_row'], trial['cv_mae']))
+
+
+def save_trials(trials, selected, budget_seconds, elapsed_seconds, path=TRIALS_PATH):
+    """Deneme sonuçlarını fill_model_metadata.json'ın yanına yaz"""
+    payload = {
+        'timestamp': datetime.now().isoformat(),
+        'budget_seconds': budget_seconds,
+        'elapsed_seconds': round(elapsed_seconds, 2),
+        'n_splits': N_SPLITS,
+        'mae_tolerance': MAE_TOLERANCE,
+        'selected': selected,
+        'trials': sorted(trials, key=lambda trial: trial.get('cv_mae', float('inf')))
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    return path
@@ -161,6 +161,7 @@ def create_tables():
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_user ON citizen_reports(user_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_container ON citizen_reports(container_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_trust ON users(trust_score)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_predictions_container_time ON predictions(container_id, predicted_at)")
     
     conn.commit()
     print("✓ Tablolar oluşturuldu")
@@ -0,0 +1,245 @@
+"""
+NİLÜFER BELEDİYESİ - MODEL KÜÇÜLTME ARACI
+Doluluk regresyon modelinin ağaç alt kümeleri ve derinlik kısaltmalarını
+doğruluk / gecikme / bellek açısından karşılaştırır; MAE toleransı içindeki
+en küçük modeli kaydeder
+
+Kullanım:
+    python model_compaction.py [mae_toleransı]
+
+    mae_toleransı: fill_model_metadata.json'daki MAE'ye göre izin verilen
+    göreli artış (varsayılan 0.10 = %10)
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from model_store import (
+    ARRAY_FIELDS, ForestArrays, compact_dir_for, load_model, save_model_arrays
+)
+
+MODEL_PATH = 'models/fill_prediction_model.pkl'
+METADATA_PATH = 'models/fill_model_metadata.json'
+DATA_PATH = 'data/processed_containers.csv'
+
+MAE_TOLERANCE = 0.10
+TREE_FRACTIONS = (0.1, 0.25, 0.5, 0.75, 1.0)
+LATENCY_REPEATS = 300
+UNDEFINED_THRESHOLD = -2.0
+
+
+def truncate_forest(forest, n_trees, max_depth):
+    """
+    İlk n_trees ağacı max_depth derinliğinde kesilmiş yeni bir ForestArrays
+
+    Kesilen iç düğümler yaprak olur ve kendi value değerini (o düğüme
+    düşen eğitim örneklerinin ortalaması) döndürür.
+    """
+    left, right = forest._left, forest._right
+    frontier = forest._roots[:n_trees]
+    levels = [frontier]
+    for _ in range(max_depth):
+        internal = frontier[left[frontier] != frontier]
+        if not internal.size:
+            break
+        frontier = np.concatenate([left[internal], right[internal]])
+        levels.append(frontier)
+
+    kept = np.concatenate(levels)
+    new_id = np.full(len(left), -1, dtype=np.int64)
+    new_id[kept] = np.arange(len(kept))
+
+    node_ids = np.arange(len(kept), dtype=np.int64)
+    new_left = new_id[left[kept]]
+    new_right = new_id[right[kept]]
+    is_cut = new_left < 0
+
+    arrays = {
+        'feature': np.where(is_cut, 0, forest._feature[kept]),
+        'threshold': np.where(is_cut, UNDEFINED_THRESHOLD, forest._threshold[kept]),
+        'left': np.where(is_cut, node_ids, new_left),
+        'right': np.where(is_cut, node_ids, new_right),
+        'value': forest._value[kept],
+        'roots': new_id[forest._roots[:n_trees]]
+    }
+    meta = dict(forest.meta, n_trees=int(n_trees), n_nodes=int(len(kept)),
+                max_depth=len(levels) - 1)
+    return ForestArrays(arrays, meta)
+
+
+def model_nbytes(forest):
+    """Dizilerin toplam boyutu (bayt)"""
+    return int(sum(getattr(forest, name).nbytes for name in ARRAY_FIELDS))
+
+
+def single_row_latency_us(forest, x, repeats=LATENCY_REPEATS):
+    """Tek satır tahmin süresinin medyanı (µs)"""
+    forest.predict(x)
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        forest.predict(x)
+        samples.append(time.perf_counter() - started)
+    return float(np.median(samples)) * 1e6
+
+
+def regression_metrics(y_true, y_pred):
+    """train_fill_prediction.py ile aynı metrikler (tahminler 0-0.95 arası)"""
+    y_pred = np.clip(y_pred, 0, 0.95)
+    errors = y_true - y_pred
+    ss_tot = ((y_true - y_true.mean()) ** 2).sum()
+    return {
+        'mae': float(np.abs(errors).mean()),
+        'rmse': float(np.sqrt((errors ** 2).mean())),
+        'r2_score': float(1 - (errors ** 2).sum() / ss_tot) if ss_tot else 0.0
+    }
+
+
+def evaluate_candidates(forest, X_test, y_test, tree_fractions=TREE_FRACTIONS, depths=None):
+    """Tüm (ağaç sayısı, derinlik) adaylarını değerlendir"""
+    tree_counts = sorted({max(1, int(round(forest.n_estimators * f))) for f in tree_fractions})
+    depths = depths or range(1, forest.max_depth + 1)
+
+    rows = []
+    for n_trees in tree_counts:
+        for depth in depths:
+            candidate = truncate_forest(forest, n_trees, depth)
+            row = {
+                'n_trees': n_trees,
+                'max_depth': depth,
+                'n_nodes': candidate.meta['n_nodes'],
+                'bytes': model_nbytes(candidate),
+                'latency_us': single_row_latency_us(candidate, X_test[:1])
+            }
+            row.update(regression_metrics(y_test, candidate.predict(X_test)))
+            rows.append(row)
+    return rows
+
+
+def mark_pareto(rows):
+    """MAE, gecikme ve boyutta başka bir aday tarafından domine edilmeyenleri işaretle"""
+    keys = ('mae', 'latency_us', 'bytes')
+    for row in rows:
+        row['pareto'] = not any(
+            all(other[k] <= row[k] for k in keys) and any(other[k] < row[k] for k in keys)
+            for other in rows
+        )
+    return rows
+
+
+def select_smallest(rows, max_mae):
+    """MAE sınırı içindeki en küçük (bayt) aday; eşitlikte daha düşük MAE"""
+    eligible = [row for row in rows if row['mae'] <= max_mae]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda row: (row['bytes'], row['mae']))
+
+
+def serving_metrics(metadata, compact_meta=None):
+    """
+    Hizmet veren modelin adı ve kendi test metrikleri
+
+    Küçültülmüş model yüklendiyse MAE / RMSE / R² onun seçim sırasındaki
+    test sonuçlarıdır (meta['metrics']; eski kayıtlarda
+    metadata['compaction']['selected']). Bunlar bulunamazsa tam modelin
+    metrikleri 'metrics_from': 'full' ile açıkça işaretlenir.
+    """
+    metrics = metadata['metrics']
+    served = {
+        'variant': 'full',
+        'model_name': metrics['model_name'],
+        'metrics_from': 'full',
+        'timestamp': metrics['timestamp']
+    }
+    own = metrics
+    if compact_meta is not None:
+        served.update(variant='compact', timestamp=compact_meta.get('compacted_at', metrics['timestamp']),
+                      model_name=f"{metrics['model_name']} (küçültülmüş: {compact_meta['n_trees']} ağaç, "
+                                 f"derinlik {compact_meta['max_depth']})")
+        compact = compact_meta.get('metrics') or metadata.get('compaction', {}).get('selected')
+        if compact:
+            own = compact
+            served['metrics_from'] = 'compact'
+    served.update({key: own[key] for key in ('mae', 'rmse', 'r2_score')})
+    return served
+
+
+def load_test_set():
+    """train_fill_prediction.py'deki aynı test bölümü"""
+    from sklearn.model_selection import train_test_split
+    from train_fill_prediction import FillLevelPredictor
+
+    df = pd.read_csv(DATA_PATH)
+    X, y, _ = FillLevelPredictor().prepare_features(df)
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return np.asarray(X_test, dtype=float), np.asarray(y_test, dtype=float)
+
+
+def print_table(rows):
+    print(f"\n{'Ağaç':>5} {'Derinlik':>8} {'Düğüm':>7} {'Boyut':>9} {'Gecikme':>10} {'MAE':>10} {'R²':>8}  Pareto")
+    for row in rows:
+        print(f"{row['n_trees']:>5} {row['max_depth']:>8} {row['n_nodes']:>7} "
+              f"{row['bytes'] / 1024:>7.1f}KB {row['latency_us']:>8.1f}µs "
+              f"{row['mae']:>10.6f} {row['r2_score']:>8.4f}  {'★' if row['pareto'] else ''}")
+
+
+def main():
+    tolerance = float(sys.argv[1]) if len(sys.argv) > 1 else MAE_TOLERANCE
+
+    print("=" * 80)
+    print("🌲 MODEL KÜÇÜLTME - DOĞRULUK / GECİKME / BELLEK")
+    print("=" * 80)
+
+    with open(METADATA_PATH, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    baseline_mae = metadata['metrics']['mae']
+    max_mae = baseline_mae * (1 + tolerance)
+
+    forest, meta = load_model(MODEL_PATH)
+    X_test, y_test = load_test_set()
+    print(f"\n📂 Model: {meta['kind']} ({forest.n_estimators} ağaç, derinlik {forest.max_depth})")
+    print(f"📐 Kayıtlı MAE: {baseline_mae:.6f} -> izin verilen: {max_mae:.6f} (+%{tolerance * 100:.0f})")
+
+    rows = mark_pareto(evaluate_candidates(forest, X_test, y_test))
+    print_table([row for row in rows if row['pareto']])
+
+    selected = select_smallest(rows, max_mae)
+    if not selected:
+        print("\n⚠️ Tolerans içinde aday yok, model değiştirilmedi")
+        return None
+
+    full = max(rows, key=lambda row: (row['n_trees'], row['max_depth']))
+    compact = truncate_forest(forest, selected['n_trees'], selected['max_depth'])
+    compact.meta['compacted_from'] = {'n_trees': forest.n_estimators, 'max_depth': forest.max_depth}
+    compact.meta['compacted_at'] = datetime.now().isoformat()
+    compact.meta['metrics'] = {key: selected[key] for key in ('mae', 'rmse', 'r2_score')}
+    save_model_arrays({name: getattr(compact, name) for name in ARRAY_FIELDS},
+                      compact.meta, compact_dir_for(MODEL_PATH))
+
+    metadata['compaction'] = {
+        'tolerance': tolerance,
+        'baseline_mae': baseline_mae,
+        'max_mae': max_mae,
+        'selected': selected,
+        'full_model': full,
+        'pareto': [row for row in rows if row['pareto']],
+        'timestamp': datetime.now().isoformat()
+    }
+    with open(METADATA_PATH, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✅ Seçilen: {selected['n_trees']} ağaç, derinlik {selected['max_depth']}")
+    print(f"   Boyut: {full['bytes'] / 1024:.1f}KB -> {selected['bytes'] / 1024:.1f}KB")
+    print(f"   Gecikme: {full['latency_us']:.1f}µs -> {selected['latency_us']:.1f}µs")
+    print(f"   MAE: {full['mae']:.6f} -> {selected['mae']:.6f}")
+    print(f"💾 Kaydedildi: {compact_dir_for(MODEL_PATH)}")
+    return selected
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+NİLÜFER BELEDİYESİ - TEMBEL MODEL YÜKLEYİCİ
+Modeller ve ağır kütüphaneler (pandas, sklearn) arka planda yüklenir;
+API bu sırada yalnızca veritabanı kullanan endpoint'lere hemen yanıt verir
+"""
+
+import threading
+import time
+import traceback
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class LazyLoader:
+    """
+    Arka plan thread'inde yüklenip ısındırılan nesne
+
+    load_fn() nesneyi üretir, warmup_fn(nesne) ilk tahmini yaparak önbellekleri
+    doldurur, on_ready(nesne) nesneyi uygulamaya bağlar. get() beklemez:
+    nesne hazır değilse None döner.
+    """
+
+    def __init__(self, name, load_fn, warmup_fn=None, on_ready=None):
+        self.name = name
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        self.on_ready = on_ready
+        self.state = PENDING
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.created_at = time.perf_counter()
+        self.ready_after_seconds = None
+        self._value = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def load(self):
+        """Yükle, ısındır ve devreye al (çağıran thread'de)"""
+        self.state = LOADING
+        try:
+            started = time.perf_counter()
+            value = self.load_fn()
+            self.load_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            if self.warmup_fn:
+                self.warmup_fn(value)
+            self.warmup_seconds = time.perf_counter() - started
+
+            if self.on_ready:
+                self.on_ready(value)
+            self._value = value
+            self.state = READY
+            self.ready_after_seconds = time.perf_counter() - self.created_at
+            print(f"✅ {self.name} hazır (yükleme {self.load_seconds:.2f} sn, ısınma {self.warmup_seconds:.3f} sn)")
+        except Exception as e:
+            self.error = str(e)
+            self.state = FAILED
+            print(f"⚠️ {self.name} yüklenemedi: {e}")
+            traceback.print_exc()
+        finally:
+            self._ready.set()
+        return self._value
+
+    def start(self):
+        """Arka plan yüklemesini başlat (tekrar çağrılırsa bir şey yapmaz)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.load, name=f'lazy-{self.name}', daemon=True)
+            self._thread.start()
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def get(self, timeout=0):
+        """Hazırsa nesne; değilse timeout saniye bekler, yine hazır değilse None"""
+        if timeout and not self._ready.is_set():
+            self._ready.wait(timeout)
+        return self._value if self.state == READY else None
+
+    def wait(self, timeout=None):
+        """Yükleme bitene kadar bekle (başarılıysa True)"""
+        self._ready.wait(timeout)
+        return self.ready
+
+    def status(self):
+        return {
+            'state': self.state,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'ready_after_seconds': self.ready_after_seconds,
+            'error': self.error
+        }
+
+
+def health_report(loaders):
+    """
+    /api/health yanıtı ve HTTP kodu
+
+    Tüm yükleyiciler hazırsa 200 'ready'; biri hâlâ yükleniyorsa 503
+    'loading'; biri başarısızsa 200 'degraded' (veritabanı endpoint'leri
+    ve klasik mod çalışmaya devam eder).
+    """
+    states = {loader.name: loader.state for loader in loaders}
+    if any(state in (PENDING, LOADING) for state in states.values()):
+        status, code = 'loading', 503
+    elif any(state == FAILED for state in states.values()):
+        status, code = 'degraded', 200
+    else:
+        status, code = 'ready', 200
+
+    return {
+        'status': status,
+        'ready': status == 'ready',
+        'components': {loader.name: loader.status() for loader in loaders}
+    }, code
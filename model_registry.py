@@ -0,0 +1,202 @@
+"""
+NİLÜFER BELEDİYESİ - MODEL KAYIT DEFTERİ VE ARKA PLAN EĞİTİMİ
+Aktif modeli sürümlü bir referansla tutar; yeniden eğitim HTTP isteği
+dışında, kuyruklu bir worker thread'de yapılır
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from model_store import export_for_serving, load_model
+
+DB_PATH = 'nilufer_waste.db'
+MODEL_PATH = 'models/fill_predictor.pkl'
+
+# Okuyucular her zaman tutarlı bir (sürüm, model) çifti görür
+ModelSnapshot = namedtuple('ModelSnapshot', ['version', 'model_data', 'activated_at'])
+
+
+class ModelRegistry:
+    """
+    Aktif modele sürümlü referans
+
+    Yeni model tek bir atama ile devreye alınır; current() ile alınan
+    snapshot istek boyunca değişmez.
+    """
+
+    def __init__(self, model_data=None):
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._snapshot = ModelSnapshot(1 if model_data else 0, model_data, datetime.now())
+
+    def current(self):
+        """Aktif snapshot (kilitsiz okuma - referans ataması atomik)"""
+        return self._snapshot
+
+    @property
+    def model_data(self):
+        return self._snapshot.model_data
+
+    def subscribe(self, callback):
+        """Model değiştiğinde callback(snapshot) çağrılır"""
+        self._listeners.append(callback)
+
+    def swap(self, model_data):
+        """Yeni modeli devreye al ve yeni snapshot'ı döndür"""
+        with self._lock:
+            snapshot = ModelSnapshot(self._snapshot.version + 1, model_data, datetime.now())
+            self._snapshot = snapshot
+        for callback in self._listeners:
+            callback(snapshot)
+        return snapshot
+
+
+def train_fill_classifier(db_path=DB_PATH, model_path=MODEL_PATH):
+    """
+    Doluluk sınıflandırıcısını güncel verilerle eğit ve kaydet
+
+    Servis tarafıyla aynı 15 özellik kullanılır; kaydedilen model
+    model_store üzerinden yüklenerek döndürülür.
+
+    Döndürür:
+        model_data sözlüğü veya yeterli veri yoksa None
+    """
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import train_test_split
+
+    from feature_store import CLASSIFIER_FEATURES, classifier_features, load_static_features
+
+    conn = sqlite3.connect(db_path)
+    try:
+        df = load_static_features(conn)
+    finally:
+        conn.close()
+
+    if len(df) < 50:  # Minimum veri kontrolü
+        return None
+
+    now = datetime.now()
+    X = classifier_features(df, now)
+    y = (df['current_fill_level'] >= 0.75).astype(int).values
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    model = RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10)
+    model.fit(X_train, y_train)
+
+    train_accuracy = model.score(X_train, y_train)
+    test_accuracy = model.score(X_test, y_test)
+
+    version = f"retrain-{now.strftime('%Y%m%d%H%M%S')}"
+    joblib.dump({
+        'model': model,
+        'version': version,
+        'train_accuracy': train_accuracy,
+        'test_accuracy': test_accuracy,
+        'trained_at': now.isoformat()
+    }, model_path)
+
+    export_for_serving(model_path, X_check=X_test, feature_names=CLASSIFIER_FEATURES)
+    forest, meta = load_model(model_path, allow_pickle=False)
+    return {
+        'model': forest,
+        'version': meta.get('version', version),
+        'trained_at': meta.get('trained_at'),
+        'train_accuracy': train_accuracy,
+        'test_accuracy': test_accuracy
+    }
+
+
+class RetrainWorker:
+    """
+    Kuyruklu arka plan eğitim worker'ı
+
+    Bekleyen istekler tek bir eğitimde birleştirilir; başarılı eğitim
+    sonunda model kayıt defterinde atomik olarak değiştirilir.
+    """
+
+    def __init__(self, registry, train_fn=None, db_path=DB_PATH, model_path=MODEL_PATH):
+        self.registry = registry
+        self.train_fn = train_fn or train_fill_classifier
+        self.db_path = db_path
+        self.model_path = model_path
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._busy = threading.Event()
+        self.retrain_count = 0
+        self.failure_count = 0
+        self.last_duration_seconds = None
+        self.last_finished_at = None
+        self.last_error = None
+
+    def start(self):
+        """Worker thread'ini başlat (idempotent)"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='retrain-worker', daemon=True)
+            self._thread.start()
+
+    def submit(self, reason='verified_reports'):
+        """Yeniden eğitim isteğini kuyruğa ekle (bloklamaz)"""
+        self.start()
+        self._queue.put({'reason': reason, 'requested_at': datetime.now().isoformat()})
+
+    def _run(self):
+        while True:
+            self._queue.get()
+            # Eğitim sürerken biriken istekler tek eğitimle karşılanır
+            drained = 0
+            while True:
+                try:
+                    self._queue.get_nowait()
+                    drained += 1
+                except queue.Empty:
+                    break
+
+            self._busy.set()
+            started = time.perf_counter()
+            try:
+                model_data = self.train_fn(db_path=self.db_path, model_path=self.model_path)
+                if model_data:
+                    snapshot = self.registry.swap(model_data)
+                    self.retrain_count += 1
+                    self.last_error = None
+                    print(f"✅ Model arka planda yeniden eğitildi (sürüm #{snapshot.version}: {model_data['version']})")
+            except Exception as e:
+                self.failure_count += 1
+                self.last_error = str(e)
+                print(f"❌ Model eğitim hatası: {e}")
+            finally:
+                self.last_duration_seconds = time.perf_counter() - started
+                self.last_finished_at = datetime.now()
+                self._busy.clear()
+                for _ in range(drained + 1):
+                    self._queue.task_done()
+
+    def join(self):
+        """Kuyruktaki tüm eğitimler bitene kadar bekle"""
+        self._queue.join()
+
+    def metrics(self):
+        """Eğitim süresi, kuyruk derinliği ve aktif model sürümü"""
+        snapshot = self.registry.current()
+        model_data = snapshot.model_data or {}
+        return {
+            'active_model_version': model_data.get('version'),
+            'registry_version': snapshot.version,
+            'activated_at': snapshot.activated_at.isoformat(),
+            'queue_depth': self._queue.qsize(),
+            'retrain_in_progress': self._busy.is_set(),
+            'retrain_count': self.retrain_count,
+            'failure_count': self.failure_count,
+            'last_retrain_seconds': self.last_duration_seconds,
+            'last_retrain_finished_at': self.last_finished_at.isoformat() if self.last_finished_at else None,
+            'last_error': self.last_error
+        }
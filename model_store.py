@@ -0,0 +1,493 @@
+"""
+NİLÜFER BELEDİYESİ - PAYLAŞIMLI MODEL YÜKLEME
+Ağaç modellerini düz .npy dizileri ve JSON şema olarak saklar; API süreçleri
+yalnızca NumPy ile tahmin yapar ve dizileri mmap ile paylaşır (sklearn ve
+pickle yalnızca eğitim tarafında gerekir)
+
+Kullanım (pickle'lardan yeniden dışa aktarım):
+    python model_store.py [model.pkl ...]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from statistics import NormalDist
+
+import numpy as np
+
+ARRAY_FIELDS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+META_FILE = 'meta.json'
+
+# 2: yapraklar kendine döner (left = right = kendi indeksi), indeksler int64
+ARRAY_FORMAT = 2
+
+SERVING_MODELS = ['models/fill_predictor.pkl', 'models/fill_prediction_model.pkl']
+VERIFY_ROWS = 2000
+
+
+def arrays_dir_for(model_path):
+    """models/fill_predictor.pkl -> models/fill_predictor_arrays"""
+    return os.path.splitext(model_path)[0] + '_arrays'
+
+
+def compact_dir_for(model_path):
+    """models/fill_prediction_model.pkl -> models/fill_prediction_model_compact_arrays"""
+    return os.path.splitext(model_path)[0] + '_compact_arrays'
+
+
+def _model_kind(model):
+    """Desteklenen topluluk modelinin türünü belirle"""
+    name = type(model).__name__
+    if name in ('RandomForestClassifier', 'ExtraTreesClassifier'):
+        return 'forest_classifier'
+    if name in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+        return 'forest_regressor'
+    if name == 'GradientBoostingRegressor':
+        return 'boosting_regressor'
+    raise ValueError(f"Desteklenmeyen model türü: {name}")
+
+
+def _boosting_init_value(model):
+    """GradientBoosting başlangıç tahmini (sabit init destekleniyor)"""
+    init = model.init_
+    if init == 'zero':
+        return 0.0
+    if hasattr(init, 'constant_'):
+        return float(np.ravel(init.constant_)[0])
+    raise ValueError("Sabit olmayan init tahmincisi desteklenmiyor")
+
+
+def file_sha1(path):
+    """Pickle özeti: diziler hangi modelden üretildi (mtime'dan bağımsız)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_arrays(model, extra_meta=None):
+    """
+    Eğitilmiş ağaç topluluğunu bellekte düz dizilere çevir
+
+    Tüm ağaçların düğümleri tek dizide birleştirilir; left/right global
+    düğüm indeksidir. Yaprak düğümler kendine döner, böylece gezinme her
+    ağaç için sabit max_depth adımda biter. Sınıflandırıcılarda value her
+    düğüm için normalize edilmiş sınıf olasılıklarıdır.
+
+    Parametreler:
+        model: RandomForest / GradientBoostingRegressor
+        extra_meta: meta'ya eklenecek ek alanlar (sürüm vb.)
+
+    Döndürür:
+        (diziler, meta); ForestArrays(diziler, meta) ile doğrudan kullanılabilir
+    """
+    kind = _model_kind(model)
+    if kind == 'boosting_regressor':
+        trees = [est.tree_ for est in model.estimators_[:, 0]]
+    else:
+        trees = [est.tree_ for est in model.estimators_]
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        is_leaf = left == -1
+        node_ids = np.arange(tree.node_count, dtype=np.int64) + offset
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(is_leaf, node_ids, left + offset))
+        rights.append(np.where(is_leaf, node_ids, right + offset))
+
+        if kind == 'forest_classifier':
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+        else:
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+
+        roots.append(offset)
+        offset += tree.node_count
+
+    arrays = {
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'value': np.concatenate(values),
+        'roots': np.asarray(roots, dtype=np.int64)
+    }
+
+    meta = {
+        'format': ARRAY_FORMAT,
+        'kind': kind,
+        'n_trees': len(trees),
+        'n_features': int(model.n_features_in_),
+        'n_nodes': int(offset),
+        'max_depth': int(max(tree.max_depth for tree in trees)),
+        'exported_at': datetime.now().isoformat()
+    }
+    if hasattr(model, 'feature_names_in_'):
+        meta['feature_names'] = [str(name) for name in model.feature_names_in_]
+    if kind == 'forest_classifier':
+        meta['classes'] = [int(c) for c in model.classes_]
+    if kind == 'boosting_regressor':
+        meta['learning_rate'] = float(model.learning_rate)
+        meta['init_value'] = _boosting_init_value(model)
+    if extra_meta:
+        meta.update(extra_meta)
+    return arrays, meta
+
+
+def export_model_arrays(model, out_dir, extra_meta=None):
+    """Ağaç topluluğunu düz dizilere aktar ve klasöre yaz (atomik olarak değiştirilir)"""
+    arrays, meta = model_arrays(model, extra_meta)
+    save_model_arrays(arrays, meta, out_dir)
+    return meta
+
+
+def array_schema(arrays):
+    """meta.json'daki dizi şeması: {ad: {dtype, shape}}"""
+    return {name: {'dtype': str(array.dtype), 'shape': list(array.shape)} for name, array in arrays.items()}
+
+
+def save_model_arrays(arrays, meta, out_dir):
+    """Dizileri ve meta.json'ı (şema dahil) klasöre yaz"""
+    meta = dict(meta, arrays=array_schema(arrays))
+    # Önce geçici klasöre yaz, sonra yer değiştir (okuyucular yarım dosya görmez)
+    tmp_dir = out_dir.rstrip('/\\') + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), np.ascontiguousarray(array))
+    with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+
+    old_dir = out_dir.rstrip('/\\') + '.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _row_quantiles(values, probs):
+    """Satır bazında kantiller (np.percentile 'linear' ile aynı; sıralama ile daha hızlı)"""
+    ordered = np.sort(values, axis=1)
+    positions = np.asarray(probs) * (values.shape[1] - 1)
+    below = np.floor(positions).astype(np.int64)
+    above = np.minimum(below + 1, values.shape[1] - 1)
+    fraction = positions - below
+    return (ordered[:, below] * (1 - fraction) + ordered[:, above] * fraction).T
+
+
+class ForestArrays:
+    """
+    Düz dizilerden ağaç topluluğu tahmini
+
+    sklearn ile aynı sonuçları üretir: girdi float32'ye çevrilir, ağaç
+    çıktıları sklearn'deki sırayla toplanır. Tüm ağaçlar aynı anda, sabit
+    max_depth adımda gezilir (yapraklar kendine döner).
+    """
+
+    def __init__(self, arrays, meta):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.meta = meta
+        self.kind = meta['kind']
+        self.n_features_in_ = meta['n_features']
+        self.n_estimators = meta['n_trees']
+        self.max_depth = meta['max_depth']
+        if 'feature_names' in meta:
+            self.feature_names_in_ = np.asarray(meta['feature_names'], dtype=object)
+        if 'classes' in meta:
+            self.classes_ = np.asarray(meta['classes'])
+
+        # Aynı belleğe düz ndarray görünümleri (memmap alt sınıfı indekslemede yavaş)
+        self._feature = np.asarray(self.feature)
+        self._threshold = np.asarray(self.threshold)
+        self._left = np.asarray(self.left)
+        self._right = np.asarray(self.right)
+        self._value = np.asarray(self.value)
+        self._roots = np.asarray(self.roots)
+
+    def _check_input(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X {X.shape[1]} özellik içeriyor, model {self.n_features_in_} bekliyor"
+            )
+        return X
+
+    def _apply_row(self, x):
+        """Tek satır: tüm düğümlerin sonraki düğümü bir kerede, gezinme yalnızca indeksleme"""
+        next_node = np.where(x[self._feature] <= self._threshold, self._left, self._right)
+        nodes = self._roots
+        for _ in range(self.max_depth):
+            nodes = next_node[nodes]
+        return nodes
+
+    def _apply_batch(self, X):
+        """Batch: seviye seviye, tüm satır ve ağaçlar birlikte (düz indeksle take)"""
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[:, None]
+        nodes = np.broadcast_to(self._roots, (n_rows, self.n_estimators))
+        for _ in range(self.max_depth):
+            go_left = flat_X.take(row_offsets + self._feature.take(nodes)) <= self._threshold.take(nodes)
+            nodes = np.where(go_left, self._left.take(nodes), self._right.take(nodes))
+        return nodes
+
+    def apply(self, X):
+        """Her satır ve ağaç için ulaşılan yaprağın global indeksi (n_satır, n_ağaç)"""
+        X = self._check_input(X)
+        if X.shape[0] == 1:
+            return self._apply_row(X[0])[None, :]
+        return self._apply_batch(X)
+
+    def tree_outputs(self, X):
+        """Her ağacın ham çıktısı: (n_satır, n_ağaç) veya (n_satır, n_ağaç, n_sınıf)"""
+        return self._value.take(self.apply(X), axis=0)
+
+    def _sequential_sum(self, outputs):
+        # sklearn ağaç çıktılarını sırayla topladığı için cumsum (pairwise sum değil)
+        return np.cumsum(outputs, axis=1)[:, -1]
+
+    def predict_proba(self, X):
+        if self.kind != 'forest_classifier':
+            raise AttributeError("predict_proba sadece sınıflandırıcılar için geçerli")
+        return self._sequential_sum(self.tree_outputs(X)) / self.n_estimators
+
+    def predict_interval(self, X, coverage=0.8, residual_std=None):
+        """
+        Tahmin başına belirsizlik: tüm ağaçların çıktıları tek geçişte
+
+        Orman regresöründe aralık ağaç çıktılarının kantilleri, std ağaçlar
+        arası yayılımdır. Sınıflandırıcıda ağaç oyları çoğunlukla 0/1
+        olduğundan kantiller tahmini dışarıda bırakabilir (p=0.95 için
+        [1, 1]); aralık n_ağaç oyla Wilson skor aralığıdır.
+        GradientBoosting ağaçları ardışık düzeltmeler olduğundan yayılımları
+        belirsizlik değildir; aralık residual_std (ör. test RMSE) ile
+        normal varsayımıyla kurulur. Her yöntemde lower <= tahmin <= upper.
+
+        Döndürür: {'prediction', 'std', 'lower', 'upper'} (n_satır,) diziler
+        ve 'method' ('tree_spread' / 'wilson' / 'residual')
+        """
+        outputs = self.tree_outputs(X)
+        tail = (1 - coverage) / 2 * 100
+
+        if self.kind == 'boosting_regressor':
+            if residual_std is None:
+                raise ValueError("GradientBoosting aralığı için residual_std gerekli")
+            init = np.full((outputs.shape[0], 1), self.meta['init_value'])
+            prediction = self._sequential_sum(np.hstack([init, self.meta['learning_rate'] * outputs]))
+            z = NormalDist().inv_cdf(1 - tail / 100)
+            std = np.full_like(prediction, residual_std)
+            return {'prediction': prediction, 'std': std, 'lower': prediction - z * std,
+                    'upper': prediction + z * std, 'method': 'residual'}
+
+        if self.kind == 'forest_classifier':
+            outputs = outputs[:, :, 1]
+            prediction = self._sequential_sum(outputs) / self.n_estimators
+            z = NormalDist().inv_cdf(1 - tail / 100)
+            z2n = z * z / self.n_estimators
+            center = (prediction + z2n / 2) / (1 + z2n)
+            half = z * np.sqrt(prediction * (1 - prediction) / self.n_estimators
+                               + z2n / (4 * self.n_estimators)) / (1 + z2n)
+            # Wilson aralığı p'yi zaten içerir; kayan nokta yuvarlaması için kırpılır
+            return {'prediction': prediction, 'std': outputs.std(axis=1),
+                    'lower': np.minimum(center - half, prediction),
+                    'upper': np.maximum(center + half, prediction), 'method': 'wilson'}
+
+        prediction = self._sequential_sum(outputs) / self.n_estimators
+        lower, upper = _row_quantiles(outputs, [tail / 100, 1 - tail / 100])
+        # Çarpık ağaç dağılımında ortalama kantil aralığının dışına düşebilir
+        return {'prediction': prediction, 'std': outputs.std(axis=1), 'lower': np.minimum(lower, prediction),
+                'upper': np.maximum(upper, prediction), 'method': 'tree_spread'}
+
+    def predict(self, X):
+        if self.kind == 'forest_classifier':
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+        outputs = self.tree_outputs(X)
+        if self.kind == 'forest_regressor':
+            return self._sequential_sum(outputs) / self.n_estimators
+
+        # GradientBoosting: init + lr * ağaç_1 + lr * ağaç_2 + ...
+        init = np.full((outputs.shape[0], 1), self.meta['init_value'])
+        return self._sequential_sum(np.hstack([init, self.meta['learning_rate'] * outputs]))
+
+
+def load_model_arrays(directory, mmap_mode='r'):
+    """Dışa aktarılmış dizileri yükle (varsayılan: salt okunur mmap, sayfalar paylaşılır)"""
+    with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    arrays = {
+        name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+        for name in ARRAY_FIELDS
+    }
+    expected = meta.get('arrays')
+    if expected and array_schema(arrays) != {name: expected[name] for name in ARRAY_FIELDS}:
+        raise ValueError(f"{directory}: diziler meta.json şemasıyla uyuşmuyor")
+    return ForestArrays(arrays, meta)
+
+
+def _arrays_up_to_date(directory, model_path):
+    meta_path = os.path.join(directory, META_FILE)
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != ARRAY_FORMAT:
+        return False
+    if not os.path.exists(model_path):
+        return True
+    if 'source_sha1' in meta:
+        return meta['source_sha1'] == file_sha1(model_path)
+    return os.path.getmtime(meta_path) >= os.path.getmtime(model_path)
+
+
+def verification_rows(forest, n_rows=VERIFY_ROWS, seed=0):
+    """
+    Karşılaştırma girdisi: her özellik için eşik değerleri ve aralarından
+    rastgele seçilmiş satırlar (eşiğin tam üstü/altı dahil)
+    """
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n_rows, forest.n_features_in_), dtype=np.float32)
+    is_split = forest._left != np.arange(len(forest._left))
+    for j in range(forest.n_features_in_):
+        thresholds = forest._threshold[is_split & (forest._feature == j)].astype(np.float32)
+        if not thresholds.size:
+            continue
+        picked = rng.choice(thresholds, n_rows)
+        X[:, j] = np.where(rng.random(n_rows) < 0.5, picked,
+                           np.nextafter(picked, np.float32(np.inf)))
+    return X
+
+
+def verify_export(model, forest, X):
+    """Dizilerle tahmin sklearn ile bit düzeyinde aynı mı? (değilse ValueError)"""
+    import warnings
+
+    X = np.asarray(X, dtype=np.float32)
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        if forest.kind == 'forest_classifier':
+            same = np.array_equal(model.predict_proba(X), forest.predict_proba(X))
+        else:
+            same = np.array_equal(model.predict(X), forest.predict(X))
+    if not same:
+        raise ValueError("Dışa aktarılan diziler sklearn modeliyle aynı sonucu vermiyor")
+    return len(X)
+
+
+def export_for_serving(model_path, X_check=None, feature_names=None):
+    """
+    Eğitim sonrası: pickle'ı diziler + JSON şema olarak dışa aktar ve doğrula
+
+    meta.json'a pickle özeti (source_sha1) ve doğrulanan satır sayısı yazılır;
+    API süreçleri pickle'ı hiç açmadan bu dizileri kullanır.
+
+    Parametreler:
+        X_check: Karşılaştırma için gerçek özellik satırları (isteğe bağlı);
+                 her durumda eşiklerden üretilen satırlar da kontrol edilir
+        feature_names: Model isimsiz dizilerle eğitildiyse özellik sırası
+    """
+    import joblib
+
+    loaded = joblib.load(model_path)
+    extra_meta = {'source': os.path.basename(model_path), 'source_sha1': file_sha1(model_path)}
+    if feature_names is not None:
+        extra_meta['feature_names'] = [str(name) for name in feature_names]
+    if isinstance(loaded, dict):
+        model = loaded['model']
+        extra_meta.update({k: v for k, v in loaded.items()
+                           if k in ('version', 'trained_at') and v is not None})
+    else:
+        model = loaded
+
+    directory = arrays_dir_for(model_path)
+    previous_meta = os.path.join(directory, META_FILE)
+    if feature_names is None and not hasattr(model, 'feature_names_in_') and os.path.exists(previous_meta):
+        # Önceki dışa aktarımdaki özellik sırasını koru
+        with open(previous_meta, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get('feature_names')
+        if previous and len(previous) == model.n_features_in_:
+            extra_meta['feature_names'] = previous
+
+    meta = export_model_arrays(model, directory, extra_meta)
+    forest = load_model_arrays(directory)
+
+    verified = verify_export(model, forest, verification_rows(forest))
+    if X_check is not None:
+        verified += verify_export(model, forest, X_check)
+
+    meta = dict(forest.meta, verified_rows=verified)
+    meta_path = os.path.join(directory, META_FILE)
+    with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(meta_path + '.tmp', meta_path)
+    return meta
+
+
+def load_model(model_path, mmap_mode='r', allow_pickle=True):
+    """
+    Modeli paylaşımlı dizilerden yükle
+
+    Diziler yoksa veya başka bir pickle'dan üretilmişse: allow_pickle=True
+    ise pickle bir kez açılıp dışa aktarılır (sklearn gerekir); API'ler
+    allow_pickle=False ile yalnızca NumPy kullanır ve eksik dizide hata verir.
+
+    Döndürür:
+        (ForestArrays, meta) - meta içinde pickle'daki sürüm bilgisi de bulunur
+    """
+    directory = arrays_dir_for(model_path)
+    if not _arrays_up_to_date(directory, model_path):
+        if not allow_pickle:
+            raise FileNotFoundError(
+                f"{directory} yok veya {model_path} ile uyuşmuyor; "
+                f"eğitim betiğini çalıştırın ya da: python model_store.py {model_path}"
+            )
+        export_for_serving(model_path)
+
+    forest = load_model_arrays(directory, mmap_mode=mmap_mode)
+    return forest, forest.meta
+
+
+def load_compact_model(model_path, mmap_mode='r'):
+    """
+    model_compaction.py ile kaydedilmiş küçültülmüş modeli yükle
+
+    Döndürür:
+        (ForestArrays, meta) veya küçültülmüş model yoksa / pickle daha
+        yeniyse (None, None)
+    """
+    directory = compact_dir_for(model_path)
+    if not _arrays_up_to_date(directory, model_path):
+        return None, None
+    forest = load_model_arrays(directory, mmap_mode=mmap_mode)
+    return forest, forest.meta
+
+
+def main():
+    paths = sys.argv[1:] or SERVING_MODELS
+    for path in paths:
+        meta = export_for_serving(path)
+        print(f"✓ {path} -> {arrays_dir_for(path)} "
+              f"({meta['kind']}, {meta['n_trees']} ağaç, {meta['verified_rows']} satır birebir doğrulandı)")
+
+
+if __name__ == "__main__":
+    main()
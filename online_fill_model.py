@@ -0,0 +1,190 @@
+"""
+NİLÜFER BELEDİYESİ - ÇEVRİMİÇİ DOLULUK MODELİ
+Her vatandaş bildirimiyle O(1) güncellenen konteyner bazlı Bayesçi dolum hızı tahmini
+"""
+
+import json
+import math
+import os
+import threading
+from datetime import datetime
+
+STATE_PATH = 'models/online_fill_state.json'
+
+# Önsel: data_preparation.py'deki ortalama %8 günlük doluluk artışı
+PRIOR_RATE_PER_HOUR = 0.08 / 24
+PRIOR_STRENGTH = 2.0          # Önselin eşdeğer gözlem ağırlığı
+OBSERVATION_STD = 0.004       # Tek gözlemin saatlik hız gürültüsü (~%10/gün)
+MIN_INTERVAL_HOURS = 0.5      # Daha kısa aralıklar hız için çok gürültülü
+MAX_RATE_PER_HOUR = 0.1
+FULL_THRESHOLD = 0.75
+CHECKPOINT_INTERVAL_SECONDS = 60
+
+
+def _normal_cdf(x):
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+
+class OnlineFillModel:
+    """
+    Konteyner başına dolum hızı (doluluk/saat) için normal önselli Bayesçi tahmin
+
+    Her konteyner için yalnızca (ağırlık toplamı, sonsal ortalama, gözlem
+    sayısı) tutulur; her bildirim sabit zamanda işlenir.
+    """
+
+    def __init__(self, state_path=STATE_PATH, prior_rate=PRIOR_RATE_PER_HOUR,
+                 prior_strength=PRIOR_STRENGTH, checkpoint_interval=CHECKPOINT_INTERVAL_SECONDS):
+        self.state_path = state_path
+        self.prior_rate = prior_rate
+        self.prior_strength = prior_strength
+        self.checkpoint_interval = checkpoint_interval
+        self.version = 0
+        self.update_count = 0
+        self.last_checkpoint_at = None
+        self._state = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def load(cls, state_path=STATE_PATH, **kwargs):
+        """Diskteki son checkpoint'ten yükle (yoksa boş model)"""
+        model = cls(state_path=state_path, **kwargs)
+        if os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            model.prior_rate = saved.get('prior_rate', model.prior_rate)
+            model.version = saved.get('version', 0)
+            model.update_count = saved.get('update_count', 0)
+            model._state = {int(k): v for k, v in saved['containers'].items()}
+        return model
+
+    def _posterior(self, container_id):
+        weight, mean, count = self._state.get(container_id, (0.0, self.prior_rate, 0))
+        return weight, mean, count
+
+    def update(self, container_id, previous_fill, reported_fill, hours_elapsed, weight=1.0):
+        """
+        Bir bildirimle konteynerin dolum hızını güncelle
+
+        Parametreler:
+            previous_fill: Son bilinen doluluk seviyesi (0-1)
+            reported_fill: Bildirilen doluluk seviyesi (0-1)
+            hours_elapsed: Son bilinen seviyeden bu yana geçen saat
+            weight: Gözlem ağırlığı (örn. kullanıcı güven puanı)
+
+        Döndürür:
+            Güncellenmişse True
+        """
+        if hours_elapsed is None or hours_elapsed < MIN_INTERVAL_HOURS or weight <= 0:
+            return False
+
+        observed_rate = (reported_fill - previous_fill) / hours_elapsed
+        if observed_rate < 0:
+            # Seviye düşmüş: arada toplama yapılmış, hız bilgisi yok
+            return False
+        observed_rate = min(observed_rate, MAX_RATE_PER_HOUR)
+
+        with self._lock:
+            old_weight, old_mean, count = self._posterior(container_id)
+            prior_weight = self.prior_strength + old_weight
+            new_weight = old_weight + weight
+            new_mean = (prior_weight * old_mean + weight * observed_rate) / (prior_weight + weight)
+            self._state[container_id] = (new_weight, new_mean, count + 1)
+            self.update_count += 1
+            self.version += 1
+            self._dirty = True
+        return True
+
+    def predict(self, container_id, current_fill, hours_since):
+        """
+        Şu anki doluluk tahmini ve dolu olma olasılığı
+
+        Parametreler:
+            current_fill: Son bilinen doluluk seviyesi
+            hours_since: Son bilinen seviyeden bu yana geçen saat
+        """
+        weight, rate, count = self._posterior(container_id)
+        hours_since = max(hours_since or 0.0, 0.0)
+        rate_std = OBSERVATION_STD / math.sqrt(self.prior_strength + weight)
+
+        fill = min(1.0, current_fill + rate * hours_since)
+        fill_std = rate_std * hours_since
+        if fill_std > 0:
+            full_probability = 1 - _normal_cdf((FULL_THRESHOLD - fill) / fill_std)
+        else:
+            full_probability = float(fill >= FULL_THRESHOLD)
+
+        return {
+            'fill_rate_per_hour': rate,
+            'fill_rate_std': rate_std,
+            'predicted_fill': fill,
+            'fill_probability': full_probability,
+            # Toplu modeldeki gibi: tahmini doluluk eşiği geçtiyse dolu
+            'is_full': fill >= FULL_THRESHOLD,
+            'observations': count,
+            'model_version': f'online-{self.version}'
+        }
+
+    def checkpoint(self):
+        """Durumu diske atomik olarak yaz"""
+        with self._lock:
+            if not self._dirty and os.path.exists(self.state_path):
+                return False
+            payload = {
+                'prior_rate': self.prior_rate,
+                'version': self.version,
+                'update_count': self.update_count,
+                'saved_at': datetime.now().isoformat(),
+                'containers': {str(k): list(v) for k, v in self._state.items()}
+            }
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.state_path)
+        self.last_checkpoint_at = datetime.now()
+        return True
+
+    def _run(self):
+        while not self._stop_event.wait(self.checkpoint_interval):
+            try:
+                self.checkpoint()
+            except Exception as e:
+                print(f"❌ Çevrimiçi model checkpoint hatası: {e}")
+
+    def start(self):
+        """Periyodik checkpoint thread'ini başlat"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='online-fill-checkpoint', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Thread'i durdur ve son durumu kaydet"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.checkpoint()
+
+    def stats(self):
+        return {
+            'mode': 'online',
+            'model_version': f'online-{self.version}',
+            'containers_tracked': len(self._state),
+            'update_count': self.update_count,
+            'last_checkpoint_at': self.last_checkpoint_at.isoformat() if self.last_checkpoint_at else None
+        }
+
+
+def hours_between(start_iso, end=None):
+    """ISO tarih (veya sadece tarih) ile şimdi arasındaki saat"""
+    if not start_iso:
+        return None
+    end = end or datetime.now()
+    return (end - datetime.fromisoformat(start_iso)).total_seconds() / 3600
@@ -0,0 +1,109 @@
+"""
+NİLÜFER BELEDİYESİ - TAHMİN ÖNBELLEĞİ
+Konteyner durumuna göre anahtarlanan TTL + LRU sınırlı tahmin önbelleği
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = 10000
+TTL_SECONDS = 300
+
+
+def prediction_key(container_id, last_collection_date, current_fill_level, model_version):
+    """Önbellek anahtarı: durumun herhangi bir parçası değişince anahtar da değişir"""
+    return (int(container_id), str(last_collection_date), float(current_fill_level), str(model_version))
+
+
+class PredictionCache:
+    """
+    (container_id, last_collection_date, current_fill_level, model_version)
+    anahtarlı tahmin önbelleği
+
+    - TTL: zamana bağlı özellikler (son toplamadan geçen süre) eskimesin diye
+    - LRU: en az kullanılan kayıt max_entries aşılınca atılır
+    - invalidate(container_id): bildirim sonrası konteynerin kaydı silinir
+    - clear(): yeniden eğitim sonrası tüm kayıtlar silinir
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()   # anahtar -> (kayıt zamanı, değer)
+        self._keys_by_container = {}    # container_id -> anahtar kümesi
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        keys = self._keys_by_container.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_container[key[0]]
+
+    def get(self, key):
+        """Geçerli kayıt varsa değeri, yoksa None döndür"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Kaydı ekle; aynı konteynerin eski durum anahtarları silinir"""
+        with self._lock:
+            for old_key in list(self._keys_by_container.get(key[0], ())):
+                if old_key != key:
+                    self._remove(old_key)
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            self._keys_by_container.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, container_id):
+        """Bir konteynerin tüm kayıtlarını sil"""
+        with self._lock:
+            keys = list(self._keys_by_container.get(int(container_id), ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        """Tüm kayıtları sil (örn. model değişti)"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_container.clear()
+
+    def stats(self):
+        """Boyutlandırma için sayaçlar"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'expirations': self.expirations,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
@@ -0,0 +1,213 @@
+"""
+NİLÜFER BELEDİYESİ - TAHMİN ÖN HESAPLAMA
+Aktif konteynerleri periyodik olarak tek geçişte skorlayıp predictions tablosuna yazar
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+DB_PATH = 'nilufer_waste.db'
+MODEL_PATH = 'models/fill_predictor.pkl'
+
+# Yenileme aralığı ve saklama süresi
+REFRESH_INTERVAL_SECONDS = 15 * 60
+RETENTION_HOURS = 48
+
+
+def ensure_prediction_index(conn):
+    """Son tahmin sorguları için indeksi oluştur (eski veritabanları için)"""
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_predictions_container_time
+        ON predictions(container_id, predicted_at)
+    """)
+
+
+def _with_staleness(row, now, max_age_seconds):
+    """Kayda tahmin yaşını ve bayatlık bilgisini ekle"""
+    predicted_at = datetime.fromisoformat(row['predicted_at'])
+    age_seconds = (now - predicted_at).total_seconds()
+    return {
+        'container_id': row['container_id'],
+        'fill_probability': float(row['predicted_fill_level']),
+        'is_full': bool(row['is_full']),
+        'confidence': float(row['confidence_score']),
+        'model_version': row['model_version'],
+        'predicted_at': row['predicted_at'],
+        'age_seconds': round(age_seconds, 1),
+        'is_stale': age_seconds > max_age_seconds
+    }
+
+
+def get_latest_prediction(conn, container_id, max_age_seconds=2 * REFRESH_INTERVAL_SECONDS):
+    """Bir konteynerin en son kayıtlı tahminini indeks üzerinden getir"""
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("""
+        SELECT container_id, model_version, predicted_fill_level,
+               confidence_score, is_full, predicted_at
+        FROM predictions
+        WHERE container_id = ?
+        ORDER BY predicted_at DESC
+        LIMIT 1
+    """, (container_id,)).fetchone()
+
+    if not row:
+        return None
+    return _with_staleness(row, datetime.now(), max_age_seconds)
+
+
+def get_latest_predictions(conn, max_age_seconds=2 * REFRESH_INTERVAL_SECONDS):
+    """Tüm konteynerler için en son kayıtlı tahminleri getir"""
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("""
+        SELECT p.container_id, p.model_version, p.predicted_fill_level,
+               p.confidence_score, p.is_full, p.predicted_at
+        FROM predictions p
+        JOIN (
+            SELECT container_id, MAX(predicted_at) AS predicted_at
+            FROM predictions
+            GROUP BY container_id
+        ) latest
+        ON p.container_id = latest.container_id AND p.predicted_at = latest.predicted_at
+        ORDER BY p.container_id
+    """).fetchall()
+
+    now = datetime.now()
+    return [_with_staleness(row, now, max_age_seconds) for row in rows]
+
+
+class PredictionRefresher:
+    """
+    Arka planda periyodik tahmin yenileyici
+
+    Her geçişte tüm aktif konteynerler tek bir model çağrısıyla skorlanır ve
+    sonuçlar model_version etiketiyle tek transaction içinde yazılır.
+    """
+
+    def __init__(self, model_data, db_path=DB_PATH, interval_seconds=REFRESH_INTERVAL_SECONDS,
+                 retention_hours=RETENTION_HOURS, feature_store=None, on_batch=None):
+        self.model_data = model_data
+        self.db_path = db_path
+        self.feature_store = feature_store  # None ise ilk yenilemede oluşturulur
+        self.interval_seconds = interval_seconds
+        self.retention_hours = retention_hours
+        self.on_batch = on_batch  # on_batch(X, dolum_olasılığı): ör. kayma izleyici
+        self.last_refresh_at = None
+        self.last_refresh_count = 0
+        self.last_refresh_seconds = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+    def set_model_data(self, model_data):
+        """Yeni modeli devreye al ve döngüyü aralığı beklemeden uyandır"""
+        self.model_data = model_data
+        self._wake_event.set()
+
+    def refresh(self):
+        """Tek geçişte tüm aktif konteynerleri skorla ve kaydet"""
+        model_data = self.model_data
+        if not model_data:
+            return 0
+
+        if self.feature_store is None:
+            from feature_store import FeatureStore
+            self.feature_store = FeatureStore(self.db_path)
+
+        started = time.perf_counter()
+        now = datetime.now()
+
+        containers, X = self.feature_store.classifier_matrix(now=now)
+        if containers.empty:
+            return 0
+
+        probabilities = model_data['model'].predict_proba(X)
+        fill_probability = probabilities[:, 1]
+        confidence = probabilities.max(axis=1)
+        if self.on_batch:
+            self.on_batch(X, fill_probability)
+
+        model_version = model_data.get('version', 'unknown')
+        predicted_at = now.isoformat()
+        rows = [
+            (int(cid), model_version, float(prob), float(conf), int(prob >= 0.75), predicted_at)
+            for cid, prob, conf in zip(containers['container_id'], fill_probability, confidence)
+        ]
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cutoff = (now - timedelta(hours=self.retention_hours)).isoformat()
+            with conn:
+                ensure_prediction_index(conn)
+                conn.executemany("""
+                    INSERT INTO predictions
+                    (container_id, model_version, predicted_fill_level, confidence_score, is_full, predicted_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.execute("DELETE FROM predictions WHERE predicted_at < ?", (cutoff,))
+        finally:
+            conn.close()
+
+        self.last_refresh_at = now
+        self.last_refresh_count = len(rows)
+        self.last_refresh_seconds = time.perf_counter() - started
+        return len(rows)
+
+    def _run(self):
+        """Durdurulana kadar periyodik yenileme döngüsü"""
+        while not self._stop_event.is_set():
+            # Geçiş sırasında gelen model değişikliği bir sonraki geçişi hemen başlatır
+            self._wake_event.clear()
+            try:
+                count = self.refresh()
+                if count:
+                    print(f"🔄 {count} konteyner tahmini yenilendi ({self.last_refresh_seconds:.2f} sn)")
+            except Exception as e:
+                print(f"❌ Tahmin yenileme hatası: {e}")
+            # Model henüz yüklenmediyse ilk geçiş boştur; set_model_data beklemeyi keser
+            self._wake_event.wait(self.interval_seconds)
+
+    def start(self):
+        """Arka plan thread'ini başlat"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='prediction-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arka plan thread'ini durdur"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def status(self):
+        """Son yenileme bilgileri"""
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'interval_seconds': self.interval_seconds,
+            'last_refresh_at': self.last_refresh_at.isoformat() if self.last_refresh_at else None,
+            'last_refresh_count': self.last_refresh_count,
+            'last_refresh_seconds': self.last_refresh_seconds
+        }
+
+
+def main():
+    print("=" * 60)
+    print("TAHMİN ÖN HESAPLAMA")
+    print("=" * 60)
+
+    import joblib
+
+    model_data = joblib.load(MODEL_PATH)
+    refresher = PredictionRefresher(model_data)
+    count = refresher.refresh()
+
+    print(f"\n✓ {count} konteyner skorlandı ({refresher.last_refresh_seconds:.2f} sn)")
+    print(f"✓ Model sürümü: {model_data.get('version', 'unknown')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,25 @@ Gelişmiş TSP/VRP Algoritması
 import numpy as np
 import pandas as pd
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import math
+import sys
+
+# Tahmin modu: varış zamanı tahmini için ortalama hız ve durak başına servis süresi
+ROUTE_SPEED_KMH = 30
+SERVICE_MINUTES_PER_STOP = 2
+FORECAST_FILL_CAP = 0.95  # app_ai.py ile aynı üst sınır
 
 class RouteOptimizer:
-    def __init__(self, db_path='nilufer_waste.db'):
+    def __init__(self, db_path='nilufer_waste.db', fill_model=None, feature_store=None, travel_times=None):
         self.db_path = db_path
         self.routes = []
+        # Tahmin modu için (verilmezse ilk kullanımda yüklenir)
+        self.fill_model = fill_model
+        self.feature_store = feature_store
+        # GPS'ten öğrenilen saat × bölge hız tablosu (yoksa sabit ortalama hız)
+        self.travel_times = travel_times
         
     def haversine_distance(self, lat1, lon1, lat2, lon2):
         """İki nokta arası mesafeyi km cinsinden hesapla"""
@@ -87,8 +98,8 @@ class RouteOptimizer:
         
         return route
     
-    def optimize_routes_by_priority(self, containers, vehicles):
-        """Öncelik bazlı rota optimizasyonu"""
+    def optimize_routes_by_priority(self, containers, vehicles, start_time=None):
+        """Öncelik bazlı rota optimizasyonu (start_time: rota süresindeki saat bazlı hızlar için)"""
         print("\n🔧 Rotalar optimize ediliyor...")
         
         # Tüm konteynerleri al (sadece yüksek öncelikli değil)
@@ -154,7 +165,7 @@ class RouteOptimizer:
                 total_load = sum(c['fill_level'] * c['capacity_liters'] 
                                for c in optimized_route)
                 capacity_usage = (total_load / vehicle['capacity_liters']) * 100
-                total_time_hours = total_distance / 30  # Ortalama 30 km/saat
+                total_time_hours = self.route_hours(optimized_route, start_time or datetime.now())
                 
                 # Frontend için rota noktalarını hazırla
                 route_points = [[c['latitude'], c['longitude']] for c in optimized_route]
@@ -166,11 +177,14 @@ class RouteOptimizer:
                         'container_id': c['container_id'],
                         'latitude': c['latitude'],
                         'longitude': c['longitude'],
-                        'current_fill_level': c['fill_level'],
+                        'current_fill_level': c.get('current_fill_level', c['fill_level']),
                         'container_type': c['container_type'],
                         'capacity_liters': c['capacity_liters'],
                         'neighborhood_name': c.get('neighborhood_name', 'Bilinmeyen')
                     })
+                    if 'forecast_fill_level' in c:
+                        container_details[-1]['forecast_fill_level'] = c['forecast_fill_level']
+                        container_details[-1]['estimated_arrival'] = c['estimated_arrival']
                 
                 routes.append({
                     'vehicle_id': vehicle['vehicle_id'],
@@ -265,6 +279,133 @@ class RouteOptimizer:
         conn.close()
         return containers
     
+    def _load_forecast_inputs(self):
+        """Doluluk regresyon modeli (ağaç dizileri) ve özellik deposu"""
+        if self.fill_model is None:
+            from model_store import load_compact_model, load_model
+            self.fill_model, _ = load_compact_model('models/fill_prediction_model.pkl')
+            if self.fill_model is None:
+                self.fill_model, _ = load_model('models/fill_prediction_model.pkl', allow_pickle=False)
+        if self.feature_store is None:
+            from feature_store import FeatureStore
+            self.feature_store = FeatureStore(self.db_path)
+    
+    def forecast_fill_levels(self, collection_time, arrival_times=None):
+        """
+        Tüm aktif konteynerlerin varış anındaki doluluk tahmini (tek toplu model çağrısı)
+        
+        arrival_times: {container_id: datetime}; olmayanlar için collection_time
+        Döndürür: (statik_df, varış_zamanları, tahmini_doluluk)
+        """
+        self._load_forecast_inputs()
+        static = self.feature_store.static_frame()
+        arrivals = pd.Series(pd.Timestamp(collection_time), index=static.index)
+        if arrival_times:
+            known = pd.Series(arrival_times, dtype='datetime64[ns]')
+            known = known[known.index.isin(static.index)]
+            arrivals.loc[known.index] = known
+        
+        from feature_store import regressor_features
+        X = regressor_features(static, arrivals.to_numpy())
+        forecast = np.clip(self.fill_model.predict(X), 0, FORECAST_FILL_CAP)
+        return static, arrivals, forecast
+    
+    def get_forecast_priority_containers(self, collection_time=None, min_priority=0.7, arrival_times=None):
+        """
+        Planlanan toplama anındaki tahmini doluluğa göre konteyner seç
+        
+        get_high_priority_containers ile aynı yapıyı döndürür; fill_level
+        varış anındaki tahmini doluluktur (yük hesabı da buna göre yapılır).
+        """
+        collection_time = collection_time or datetime.now()
+        static, arrivals, forecast = self.forecast_fill_levels(collection_time, arrival_times)
+        
+        selected = np.flatnonzero((forecast >= min_priority) & static['latitude'].notna().to_numpy()
+                                  & static['longitude'].notna().to_numpy())
+        selected = selected[np.argsort(-forecast[selected], kind='stable')]
+        
+        fallback = arrivals - pd.Timedelta(days=5)
+        days_since = (arrivals - static['last_collection'].fillna(fallback)).dt.days.to_numpy()
+        priority = 0.5 * forecast + 0.3 * np.minimum(days_since / 10, 1.0) + 0.2 * 0.5
+        
+        columns = ['container_id', 'neighborhood_id', 'container_type', 'capacity_liters',
+                   'latitude', 'longitude', 'current_fill_level', 'last_collection_date', 'neighborhood_name']
+        containers = static.iloc[selected][columns].to_dict('records')
+        for i, container in zip(selected, containers):
+            container.update({
+                'fill_level': float(forecast[i]),
+                'forecast_fill_level': round(float(forecast[i]), 4),
+                'estimated_arrival': arrivals.iloc[i].isoformat(),
+                'collection_priority': float(priority[i])
+            })
+        return containers
+    
+    def _travel_time_table(self):
+        """Öğrenilmiş hız tablosu (ilk kullanımda yüklenir; yoksa None)"""
+        if self.travel_times is None:
+            from travel_times import load_travel_times
+            self.travel_times = load_travel_times() or False
+        return self.travel_times or None
+    
+    def route_hours(self, route, start_time):
+        """
+        Rota süresi (saat): öğrenilmiş tablo varsa saat × bölge hızları ve
+        izlerden gelen servis süresiyle, yoksa ortalama 30 km/saat sürüş
+        """
+        table = self._travel_time_table()
+        if table is None:
+            return self._calculate_route_distance(route) / ROUTE_SPEED_KMH
+        _, total_minutes = table.route_minutes([(c['latitude'], c['longitude']) for c in route], start_time)
+        return total_minutes / 60
+    
+    def estimate_arrival_times(self, routes, start_time):
+        """Rota sırasına göre tahmini varış zamanları (öğrenilmiş ya da ortalama hız + durak süresi)"""
+        table = self._travel_time_table()
+        arrivals = {}
+        for route in routes:
+            if table is not None:
+                offsets, _ = table.route_minutes(
+                    [(c['latitude'], c['longitude']) for c in route['containers']], start_time
+                )
+                for c, minutes in zip(route['containers'], offsets):
+                    arrivals[c['container_id']] = start_time + timedelta(minutes=minutes)
+                continue
+            elapsed_hours = 0.0
+            previous = None
+            for c in route['containers']:
+                if previous is not None:
+                    elapsed_hours += self.haversine_distance(
+                        previous['latitude'], previous['longitude'], c['latitude'], c['longitude']
+                    ) / ROUTE_SPEED_KMH
+                arrivals[c['container_id']] = start_time + timedelta(hours=elapsed_hours)
+                elapsed_hours += SERVICE_MINUTES_PER_STOP / 60
+                previous = c
+        return arrivals
+    
+    def optimize_routes_forecast(self, vehicles, collection_time=None, min_priority=0.7, refine=True):
+        """
+        Tahmin-sonra-rota: konteynerler planlanan toplama anındaki tahmini
+        doluluğa göre seçilir. refine=True ise ilk rotalardan çıkan varış
+        zamanlarıyla tahminler yenilenip rotalar yeniden kurulur.
+        """
+        collection_time = collection_time or datetime.now()
+        containers = self.get_forecast_priority_containers(collection_time, min_priority)
+        routes = self.optimize_routes_by_priority(containers, vehicles, collection_time)
+        
+        if refine and routes:
+            arrivals = self.estimate_arrival_times(routes, collection_time)
+            containers = self.get_forecast_priority_containers(collection_time, min_priority, arrivals)
+            print(f"   🔁 Varış zamanlarıyla tahminler yenilendi ({len(arrivals)} konteyner)")
+            routes = self.optimize_routes_by_priority(containers, vehicles, collection_time)
+        
+        # Son rota sırasına göre varış zamanları (tahminler seçimde kullanılan zamana göredir)
+        arrivals = self.estimate_arrival_times(routes, collection_time)
+        for route in routes:
+            for c, detail in zip(route['containers'], route['container_details']):
+                c['estimated_arrival'] = detail['estimated_arrival'] = arrivals[c['container_id']].isoformat()
+        
+        return routes
+    
     def get_available_vehicles(self):
         """Aktif araçları al"""
         conn = sqlite3.connect(self.db_path)
@@ -321,20 +462,26 @@ def main():
     print("🚀 NİLÜFER BELEDİYESİ - ROTA OPTİMİZASYONU")
     print("="*80)
     
+    # 'current': mevcut doluluk, 'forecast': planlanan toplama anındaki tahmini doluluk
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'current'
     optimizer = RouteOptimizer()
     
-    # Yüksek öncelikli konteynerleri al
-    print("\n📦 Yüksek öncelikli konteynerler getiriliyor...")
-    containers = optimizer.get_high_priority_containers(min_priority=0.6)
-    print(f"✓ {len(containers)} yüksek öncelikli konteyner bulundu")
-    
     # Araçları al
     print("\n🚛 Araçlar getiriliyor...")
     vehicles = optimizer.get_available_vehicles()
     print(f"✓ {len(vehicles)} aktif araç bulundu")
     
-    # Rotaları optimize et
-    routes = optimizer.optimize_routes_by_priority(containers, vehicles)
+    if mode == 'forecast':
+        print("\n🔮 Tahmin modu: konteynerler toplama anındaki tahmini doluluğa göre seçiliyor...")
+        routes = optimizer.optimize_routes_forecast(vehicles, min_priority=0.6)
+    else:
+        # Yüksek öncelikli konteynerleri al
+        print("\n📦 Yüksek öncelikli konteynerler getiriliyor...")
+        containers = optimizer.get_high_priority_containers(min_priority=0.6)
+        print(f"✓ {len(containers)} yüksek öncelikli konteyner bulundu")
+        
+        # Rotaları optimize et
+        routes = optimizer.optimize_routes_by_priority(containers, vehicles)
     
     # Raporu yazdır
     optimizer.print_optimization_report()
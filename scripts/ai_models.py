@@ -15,6 +15,117 @@ from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import accuracy_score, classification_report, mean_absolute_error
 import joblib
 import json
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from feature_store import CONTAINER_TYPE_MAP, parse_collection_dates, season_of
+
+DB_PATH = 'nilufer_waste.db'
+
+# Bildirim durumu -> makul doluluk olasılığı aralığı
+REPORT_THRESHOLDS = {
+    'EMPTY': (0.0, 0.25),
+    'HALF_FULL': (0.25, 0.75),
+    'FULL': (0.75, 0.90),
+    'OVERFLOWING': (0.90, 1.0)
+}
+REVIEW_DEVIATION = 0.20   # Bu sapmanın altı incelemeye
+REJECT_DEVIATION = 0.40   # Bu sapmanın üstü yüksek güvenle red
+
+# Bekleyen bildirimler + FillLevelPredictor.prepare_features için konteyner verisi
+PENDING_REPORTS_QUERY = """
+SELECT
+    r.report_id,
+    r.container_id,
+    r.fill_level_estimate,
+    c.last_collection_date,
+    c.capacity_liters,
+    c.container_type,
+    COALESCE(n.population_density, 0) as population_density,
+    COALESCE(h.avg_tonnage_last_30_days, 0) as avg_tonnage_last_30_days,
+    COALESCE(h.historical_fill_rate, c.current_fill_level) as historical_fill_rate
+FROM citizen_reports r
+JOIN containers c ON r.container_id = c.container_id
+LEFT JOIN neighborhoods n ON c.neighborhood_id = n.neighborhood_id
+LEFT JOIN (
+    SELECT container_id,
+           AVG(CASE WHEN collection_date >= ? THEN tonnage_collected END) as avg_tonnage_last_30_days,
+           AVG(fill_level_before) as historical_fill_rate
+    FROM collection_events
+    GROUP BY container_id
+) h ON c.container_id = h.container_id
+WHERE r.is_verified = 0 AND r.verified_at IS NULL
+ORDER BY r.report_id
+LIMIT ?
+"""
+
+
+def report_category(fill_level):
+    """Sayısal doluluk tahmini (0-1) -> bildirim durumu (EMPTY / HALF_FULL / FULL / OVERFLOWING)"""
+    edges = [REPORT_THRESHOLDS[name][0] for name in list(REPORT_THRESHOLDS)[1:]]
+    return np.asarray(list(REPORT_THRESHOLDS))[np.digitize(np.asarray(fill_level, dtype=float), edges)]
+
+
+def validation_decisions(fill_probability, user_reports, model_confidence):
+    """
+    Bildirim doğrulama kararları (vektörel)
+    
+    Parametreler:
+        fill_probability: Modelin dolu olma olasılıkları
+        user_reports: Bildirilen durumlar
+        model_confidence: Modelin güven değerleri (kabul edilen bildirimler için)
+        
+    Döndürür:
+        (sonuç, güven_puanı, sapma) dizileri; geçersiz durumda sapma NaN
+    """
+    fill_probability = np.asarray(fill_probability, dtype=float)
+    reports = pd.Series(np.asarray(user_reports, dtype=str)).str.upper()
+    low = reports.map({name: bounds[0] for name, bounds in REPORT_THRESHOLDS.items()}).to_numpy(dtype=float)
+    high = reports.map({name: bounds[1] for name, bounds in REPORT_THRESHOLDS.items()}).to_numpy(dtype=float)
+    
+    # Aralık içindeyse 0, dışındaysa en yakın sınıra uzaklık
+    deviation = np.maximum(low - fill_probability, 0) + np.maximum(fill_probability - high, 0)
+    conditions = [np.isnan(low), deviation == 0, deviation < REVIEW_DEVIATION, deviation < REJECT_DEVIATION]
+    result = np.select(conditions, ['REJECTED', 'ACCEPTED', 'NEEDS_REVIEW', 'REJECTED'], 'REJECTED')
+    confidence = np.select(conditions, [0.0, np.asarray(model_confidence, dtype=float), 0.5, 0.7], 0.95)
+    return result, confidence, deviation
+
+
+def load_pending_reports(conn, limit=None, now=None):
+    """
+    Karar bekleyen bildirimler ve konteyner verileri
+
+    Bekleyen = verified_at boş: gönderimde doğrulanan / reddedilen
+    (submit_report) ve toplu doğrulamada karara bağlanan bildirimler
+    verified_at ile damgalanır, tekrar kuyruğa girmez.
+    """
+    since = ((now or datetime.now()) - timedelta(days=30)).strftime('%Y-%m-%d')
+    reports = pd.read_sql_query(PENDING_REPORTS_QUERY, conn, params=(since, -1 if limit is None else limit))
+    reports['user_report'] = report_category(reports['fill_level_estimate'])
+    return reports
+
+
+def apply_validation_results(conn, results, now=None):
+    """
+    Kararları tek transaction'da yaz
+    
+    ACCEPTED -> is_verified=1, REJECTED -> is_verified=0; ikisinde de
+    verified_at damgalanır. NEEDS_REVIEW bildirimleri moderatör kuyruğunda kalır.
+    """
+    decided = results[results['validation_result'] != 'NEEDS_REVIEW']
+    verified_at = (now or datetime.now()).isoformat()
+    rows = list(zip(
+        (decided['validation_result'] == 'ACCEPTED').astype(int).tolist(),
+        [verified_at] * len(decided),
+        decided['report_id'].astype(int).tolist()
+    ))
+    with conn:
+        conn.executemany(
+            "UPDATE citizen_reports SET is_verified = ?, verified_at = ? WHERE report_id = ?", rows
+        )
+    return len(rows)
 
 
 # ============== MODEL #1: DOLULUK SEVİYESİ TAHMİNİ ==============
@@ -52,24 +163,23 @@ class FillLevelPredictor:
         """
         features = pd.DataFrame()
         
-        # Zaman bazlı özellikler
-        data['last_collection_date'] = pd.to_datetime(data['last_collection_date'])
+        # Zaman bazlı özellikler (feature_store.py ile aynı tanım)
+        last_collection = parse_collection_dates(data['last_collection_date'])
         current_time = datetime.now()
         
         features['hours_since_last_collection'] = (
-            (current_time - data['last_collection_date']).dt.total_seconds() / 3600
+            (pd.Timestamp(current_time) - last_collection).dt.total_seconds() / 3600
         )
         
         features['day_of_week'] = current_time.weekday()
-        features['is_weekend'] = (current_time.weekday() >= 5).astype(int)
+        features['is_weekend'] = int(current_time.weekday() >= 5)
         features['season'] = self._get_season(current_time)
         
         # Konteyner özellikleri
         features['container_capacity'] = data['capacity_liters']
         
-        # Konteyner tipi kodlama (one-hot encoding alternatifi: basit etiket kodlama)
-        container_type_map = {'plastic': 1, 'glass': 2, 'organic': 3, 'paper': 4}
-        features['container_type_encoded'] = data['container_type'].map(container_type_map)
+        # Konteyner tipi kodlama (veritabanındaki tipler)
+        features['container_type_encoded'] = data['container_type'].map(CONTAINER_TYPE_MAP).fillna(2)
         
         # Nüfus yoğunluğu
         features['population_density'] = data['population_density']
@@ -82,15 +192,7 @@ class FillLevelPredictor:
     
     def _get_season(self, date):
         """Tarihten mevsim bilgisi al (0=Kış, 1=İlkbahar, 2=Yaz, 3=Sonbahar)"""
-        month = date.month
-        if month in [12, 1, 2]:
-            return 0  # Kış
-        elif month in [3, 4, 5]:
-            return 1  # İlkbahar
-        elif month in [6, 7, 8]:
-            return 2  # Yaz
-        else:
-            return 3  # Sonbahar
+        return season_of(date.month)
     
     def train(self, training_data, target_column='is_full'):
         """
@@ -195,54 +297,30 @@ class FillLevelPredictor:
         prediction = self.predict(container_data)
         fill_probability = prediction['fill_probability']
         
-        # Makullük eşik değerlerini tanımla
-        thresholds = {
-            'EMPTY': {'min': 0.0, 'max': 0.25},
-            'HALF_FULL': {'min': 0.25, 'max': 0.75},
-            'FULL': {'min': 0.75, 'max': 0.90},
-            'OVERFLOWING': {'min': 0.90, 'max': 1.0}
-        }
-        
-        expected_range = thresholds.get(user_report.upper())
+        # Toplu doğrulamayla aynı karar kuralı
+        results, confidences, deviations = validation_decisions(
+            [fill_probability], [user_report], [prediction['confidence']]
+        )
+        validation_result, confidence, deviation = results[0], float(confidences[0]), float(deviations[0])
         
-        if expected_range is None:
+        if np.isnan(deviation):
             return {
                 'validation_result': 'REJECTED',
                 'reason': 'Geçersiz bildirim durumu',
                 'confidence_score': 0.0
             }
         
-        # Tahminin beklenen aralıkta olup olmadığını kontrol et
-        if expected_range['min'] <= fill_probability <= expected_range['max']:
-            # Bildirim makul
-            validation_result = 'ACCEPTED'
-            confidence = prediction['confidence']
+        if validation_result == 'ACCEPTED':
             reason = f"Bildirim model tahminiyle eşleşiyor (doluluk seviyesi: {fill_probability:.2%})"
-            deviation = 0
-            
+        elif validation_result == 'NEEDS_REVIEW':
+            reason = f"Modelden küçük sapma ({deviation:.2%}). İnceleme için işaretlendi."
+        elif deviation < REJECT_DEVIATION:
+            reason = f"Modelden orta seviye sapma ({deviation:.2%}). Bildirim reddedildi."
         else:
-            # Sapma hesapla
-            if fill_probability < expected_range['min']:
-                deviation = expected_range['min'] - fill_probability
-            else:
-                deviation = fill_probability - expected_range['max']
-            
-            # Sapma şiddetine göre karar ver
-            if deviation < 0.20:  # %20 tolerans içinde
-                validation_result = 'NEEDS_REVIEW'
-                confidence = 0.5
-                reason = f"Modelden küçük sapma ({deviation:.2%}). İnceleme için işaretlendi."
-            elif deviation < 0.40:  # %20-40 sapma
-                validation_result = 'REJECTED'
-                confidence = 0.7
-                reason = f"Modelden orta seviye sapma ({deviation:.2%}). Bildirim reddedildi."
-            else:  # > %40 sapma
-                validation_result = 'REJECTED'
-                confidence = 0.95
-                reason = f"Modelden önemli sapma ({deviation:.2%}). Bildirim oldukça makul dışı."
+            reason = f"Modelden önemli sapma ({deviation:.2%}). Bildirim oldukça makul dışı."
         
         return {
-            'validation_result': validation_result,
+            'validation_result': str(validation_result),
             'confidence_score': confidence,
             'reason': reason,
             'model_prediction': fill_probability,
@@ -251,6 +329,62 @@ class FillLevelPredictor:
             'container_id': container_id
         }
     
+    def predict_batch(self, container_data):
+        """
+        Çok sayıda konteyner için tek model çağrısı
+        
+        Döndürür:
+            (dolu olma olasılıkları, güven) dizileri
+        """
+        if self.model is None:
+            raise ValueError("Model henüz eğitilmedi. Önce train() metodunu çağırın.")
+        
+        probabilities = self.model.predict_proba(self.prepare_features(container_data))
+        return probabilities[:, 1], probabilities.max(axis=1)
+    
+    def validate_reports_batch(self, reports):
+        """
+        Bildirim kuyruğunu tek özellik matrisi ve tek model çağrısıyla doğrula
+        
+        Parametreler:
+            reports: report_id, container_id, user_report ve prepare_features
+                     kolonlarını içeren DataFrame (load_pending_reports çıktısı)
+                     
+        Döndürür:
+            Bildirim başına karar DataFrame'i
+        """
+        fill_probability, model_confidence = self.predict_batch(reports)
+        result, confidence, deviation = validation_decisions(
+            fill_probability, reports['user_report'], model_confidence
+        )
+        return pd.DataFrame({
+            'report_id': reports['report_id'].to_numpy(),
+            'container_id': reports['container_id'].to_numpy(),
+            'user_claim': reports['user_report'].to_numpy(),
+            'model_prediction': fill_probability,
+            'validation_result': result,
+            'confidence_score': confidence,
+            'deviation': deviation
+        })
+    
+    def validate_pending_reports(self, db_path=DB_PATH, limit=None, now=None):
+        """
+        Bekleyen tüm bildirimleri toplu doğrula ve sonuçları tek transaction'da yaz
+        
+        Döndürür:
+            Karar DataFrame'i (NEEDS_REVIEW olanlar kuyrukta kalır)
+        """
+        conn = sqlite3.connect(db_path)
+        try:
+            reports = load_pending_reports(conn, limit, now)
+            if reports.empty:
+                return reports
+            results = self.validate_reports_batch(reports)
+            apply_validation_results(conn, results, now)
+        finally:
+            conn.close()
+        return results
+    
     def save_model(self, filepath):
         """Eğitilmiş modeli diske kaydet"""
         if self.model is None:
@@ -433,7 +567,25 @@ class DynamicRouter:
 
 # ============== ÖRNEK KULLANIM ==============
 
-if __name__ == "__main__":
+def validate_pending_main(model_path, limit=None):
+    """python scripts/ai_models.py validate <model.pkl> [limit]"""
+    predictor = FillLevelPredictor()
+    predictor.load_model(model_path)
+    
+    started = datetime.now()
+    results = predictor.validate_pending_reports(limit=limit)
+    elapsed = (datetime.now() - started).total_seconds()
+    
+    print(f"\n🔍 {len(results)} bekleyen bildirim {elapsed:.2f} sn'de doğrulandı")
+    if len(results):
+        for result, count in results['validation_result'].value_counts().items():
+            print(f"   {result}: {count}")
+
+
+if __name__ == "__main__" and len(sys.argv) > 2 and sys.argv[1] == 'validate':
+    validate_pending_main(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else None)
+
+elif __name__ == "__main__":
     print("=" * 60)
     print("Akıllı Atık Yönetim Sistemi - Yapay Zeka Modelleri")
     print("Nilüfer Belediyesi")
@@ -7,12 +7,19 @@ from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 import sqlite3
 from datetime import datetime
-import joblib
 import numpy as np
+import atexit
 import os
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
+import sys
+import threading
+sys.path.append('.')
+from drift_monitor import DriftMonitor
+from model_loader import LazyLoader, health_report
+from model_store import load_model
+from model_registry import ModelRegistry, RetrainWorker
+from online_fill_model import OnlineFillModel, hours_between
+from prediction_cache import PredictionCache, prediction_key
+from prediction_refresher import PredictionRefresher, get_latest_prediction, get_latest_predictions
 
 app = Flask(__name__, static_folder='public', static_url_path='')
 CORS(app)
@@ -20,97 +27,120 @@ CORS(app)
 DB_PATH = 'nilufer_waste.db'
 MODEL_PATH = 'models/fill_predictor.pkl'
 
-# Model yükle
-model_data = None
-try:
-    model_data = joblib.load(MODEL_PATH)
-    print(f"✓ Model yüklendi")
-except:
-    print(f"⚠️ Model bulunamadı")
+# 'batch': N doğru bildirimde arka planda yeniden eğitim
+# 'online': her bildirim konteyner bazlı dolum hızı modelini anında günceller
+FILL_MODEL_MODE = os.environ.get('FILL_MODEL_MODE', 'batch')
 
 # Model eğitim sayacı (her 10 doğru bildirimde bir eğit)
 training_counter = {'verified_count': 0, 'threshold': 10}
 
-def retrain_model():
-    """Model'i güncel verilerle yeniden eğit"""
-    global model_data
+# Aktif model sürümlü referans üzerinden okunur; eğitim arka planda yapılır
+model_registry = ModelRegistry()
+retrain_worker = RetrainWorker(model_registry, db_path=DB_PATH, model_path=MODEL_PATH)
+
+def trigger_drift_retrain(reasons):
+    """Dağılım kayması / hata artışında arka plan eğitimi"""
+    print(f"📉 Tahmin kayması tespit edildi ({', '.join(reasons)}), model eğitimi kuyruğa alındı")
+    if not online_model:
+        retrain_worker.submit(reason='drift')
+
+# Servis edilen tahminlerin dağılımı ve doğrulanmış bildirimlere karşı hata
+drift_monitor = DriftMonitor(on_drift=trigger_drift_retrain)
+
+# Periyodik tahmin yenileyici (sunucu başlatılınca devreye girer); her toplu
+# skorlama kayma izleyicinin 'population' akışına eklenir
+prediction_refresher = PredictionRefresher(
+    None, db_path=DB_PATH,
+    on_batch=lambda X, scores: drift_monitor.observe(X, scores, source='population')
+)
+model_registry.subscribe(lambda snapshot: prediction_refresher.set_model_data(snapshot.model_data))
+
+# Konteyner durumu + model sürümü anahtarlı tahmin önbelleği
+prediction_cache = PredictionCache()
+model_registry.subscribe(lambda snapshot: prediction_cache.clear())
+
+def load_serving_state():
+    """Özellik deposu (pandas), sınıflandırıcı ve seyahat süresi tablosu (diziler mmap ile)"""
+    from feature_store import FeatureStore
+    from travel_times import load_travel_times
     
+    model_data = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        
-        # Eğitim verilerini hazırla - hem eski hem yeni veriler
-        query = """
-        SELECT 
-            c.container_id,
-            c.container_type,
-            c.capacity_liters,
-            c.current_fill_level,
-            n.population_density,
-            CASE 
-                WHEN c.current_fill_level >= 0.75 THEN 1 
-                ELSE 0 
-            END as is_full
-        FROM containers c
-        LEFT JOIN neighborhoods n ON c.neighborhood_id = n.neighborhood_id
-        WHERE c.status = 'active'
-        """
-        
-        df = pd.read_sql_query(query, conn)
-        
-        if len(df) < 50:  # Minimum veri kontrolü
-            conn.close()
-            return False
-        
-        # Feature engineering
-        df['type_glass'] = (df['container_type'] == 'Cam').astype(int)
-        df['type_paper'] = (df['container_type'] == 'Kağıt').astype(int)
-        df['type_plastic'] = (df['container_type'] == 'Plastik').astype(int)
-        df['type_metal'] = (df['container_type'] == 'Metal').astype(int)
-        df['type_organic'] = (df['container_type'] == 'Organik').astype(int)
-        df['type_general'] = (df['container_type'] == 'Genel').astype(int)
-        
-        df['capacity_large'] = (df['capacity_liters'] >= 1100).astype(int)
-        df['capacity_medium'] = ((df['capacity_liters'] >= 800) & (df['capacity_liters'] < 1100)).astype(int)
-        df['density_high'] = (df['population_density'] > 10000).astype(int)
-        
-        # Features ve target
-        feature_cols = ['container_id', 'capacity_liters', 'population_density',
-                       'type_glass', 'type_paper', 'type_plastic', 'type_metal', 
-                       'type_organic', 'type_general', 'capacity_large', 
-                       'capacity_medium', 'density_high', 'current_fill_level']
-        
-        X = df[feature_cols].fillna(0)
-        y = df['is_full']
-        
-        # Train-test split
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Model eğit
-        model = RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10)
-        model.fit(X_train, y_train)
-        
-        # Accuracy hesapla
-        train_accuracy = model.score(X_train, y_train)
-        test_accuracy = model.score(X_test, y_test)
-        
-        # Model'i kaydet
+        model, model_meta = load_model(MODEL_PATH, allow_pickle=False)
         model_data = {
             'model': model,
-            'feature_columns': feature_cols,
-            'train_accuracy': train_accuracy,
-            'test_accuracy': test_accuracy,
-            'trained_at': datetime.now().isoformat()
+            'version': model_meta.get('version', 'unknown'),
+            'trained_at': model_meta.get('trained_at')
         }
-        
-        joblib.dump(model_data, MODEL_PATH)
-        conn.close()
-        
-        print(f"✅ Model yeniden eğitildi! Train: {train_accuracy:.3f}, Test: {test_accuracy:.3f}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Model eğitim hatası: {e}")
-        return False
+        print(f"✓ Model yüklendi")
+    except Exception:
+        print(f"⚠️ Model bulunamadı")
+    
+    travel_times = load_travel_times()
+    if travel_times is None:
+        print(f"⚠️ Seyahat süresi tablosu yok, sabit hız kullanılacak")
+    
+    return {'feature_store': FeatureStore(DB_PATH), 'model_data': model_data, 'travel_times': travel_times}
+
+def set_drift_reference(feature_store, model_data):
+    """Kayma referansı: tüm konteynerlerin özellikleri ve model skorları"""
+    from feature_store import CLASSIFIER_FEATURES
+    
+    _, X = feature_store.classifier_matrix()
+    if model_data and len(X):
+        scores = model_data['model'].predict_proba(X)[:, 1]
+        drift_monitor.set_reference(X, scores, feature_names=CLASSIFIER_FEATURES)
+
+def warmup_serving_state(state):
+    """Statik özellik önbelleğini doldur, ilk tahmini yap ve kayma referansını kur"""
+    _, X = state['feature_store'].classifier_matrix()
+    if state['model_data'] and len(X):
+        state['model_data']['model'].predict_proba(X[:1])
+        set_drift_reference(state['feature_store'], state['model_data'])
+
+def refresh_drift_reference(snapshot):
+    # İlk devreye alma warmup'ta yapılır; sonraki eğitimlerde referans yenilenir
+    state = serving.get()
+    if state and snapshot.model_data:
+        set_drift_reference(state['feature_store'], snapshot.model_data)
+
+model_registry.subscribe(refresh_drift_reference)
+
+def activate_serving_state(state):
+    prediction_refresher.feature_store = state['feature_store']
+    if state['model_data']:
+        model_registry.swap(state['model_data'])
+
+# Çevrimiçi mod: son checkpoint'ten devam et
+online_model = OnlineFillModel.load() if FILL_MODEL_MODE == 'online' else None
+
+# Modeller arka planda yüklenir; veritabanı endpoint'leri beklemeden çalışır
+serving = LazyLoader('serving', load_serving_state, warmup_serving_state, activate_serving_state)
+serving.start()
+
+# Debug reloader'ın izleyici süreci yalnızca sunucu sürecini başlatır; arka plan
+# thread'leri orada çalışmaz. WSGI sunucuları (gunicorn/waitress), use_reloader=False
+# ve içe aktarma her zaman başlatır.
+USE_RELOADER = True
+RUN_BACKGROUND_WORKERS = not (__name__ == '__main__' and USE_RELOADER
+                              and os.environ.get('WERKZEUG_RUN_MAIN') != 'true')
+_background_workers = {'started': False}
+_background_lock = threading.Lock()
+
+def start_background_workers():
+    """Tahmin yenileyici ve çevrimiçi model checkpoint'ini başlat (süreç başına bir kez)"""
+    with _background_lock:
+        if _background_workers['started'] or not RUN_BACKGROUND_WORKERS:
+            return
+        _background_workers['started'] = True
+    # Model hazır olana kadar ilk geçiş boştur; model devreye alınınca döngü uyanır
+    prediction_refresher.start()
+    if online_model:
+        online_model.start()
+        # Kapanışta son güncellemeler de kaydedilir (checkpoint aralığı beklenmez)
+        atexit.register(online_model.stop)
+
+start_background_workers()
 
 @app.route('/')
 def index():
@@ -187,82 +217,148 @@ def leaderboard():
 @app.route('/api/predict/<int:container_id>')
 def predict_container(container_id):
     """Tek konteyner tahmini"""
+    state = serving.get()
+    if not state:
+        return jsonify({'error': 'Model yükleniyor', 'health': serving.status()}), 503
+    
+    # İstek boyunca aynı model sürümü kullanılır
+    model_data = model_registry.model_data
     if not model_data:
         return jsonify({'error': 'Model yüklü değil'}), 503
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    # Statik özellikler önbellekten, zaman özellikleri istek anında
+    static, X = state['feature_store'].classifier_matrix([container_id])
+    if static.empty:
+        return jsonify({'error': 'Konteyner bulunamadı'}), 404
+    row = static.iloc[0]
+    hours_since = float(X[0, 0])
+    model_version = model_data.get('version', 'unknown')
+    
+    # Tahmin (aynı durum ve model sürümü için önbellekten)
+    cache_key = prediction_key(container_id, row['last_collection_date'],
+                               row['current_fill_level'], model_version)
+    cached = prediction_cache.get(cache_key)
+    if cached is None:
+        # Olasılık ve ağaçlar arası yayılım aynı ağaç çıktılarından
+        interval = model_data['model'].predict_interval(X)
+        fill_probability = float(interval['prediction'][0])
+        cached = (fill_probability, max(fill_probability, 1 - fill_probability), {
+            'std': float(interval['std'][0]),
+            'lower': float(interval['lower'][0]),
+            'upper': float(interval['upper'][0]),
+            'method': interval['method']
+        })
+        prediction_cache.put(cache_key, cached)
+    fill_probability, confidence, uncertainty = cached
+    drift_monitor.observe(X, [fill_probability])
     
-    cursor.execute("""
-        SELECT 
-            c.container_id,
-            c.container_type,
-            c.capacity_liters,
-            c.last_collection_date,
-            c.current_fill_level,
-            c.latitude,
-            c.longitude,
-            n.neighborhood_name,
-            n.population,
-            n.population_density,
-            n.area_km2
-        FROM containers c
-        LEFT JOIN neighborhoods n ON c.neighborhood_id = n.neighborhood_id
-        WHERE c.container_id = ?
-    """, (container_id,))
+    result = {
+        'container_id': container_id,
+        'neighborhood': row['neighborhood_name'],
+        'container_type': row['container_type'],
+        'capacity_liters': int(row['capacity_liters']),
+        'current_fill_level': float(row['current_fill_level']),
+        'fill_probability': fill_probability,
+        'is_full': bool(fill_probability >= 0.75),
+        'confidence': confidence,
+        'uncertainty': uncertainty,
+        'latitude': float(row['latitude']),
+        'longitude': float(row['longitude']),
+        'model_version': model_version,
+        'prediction_timestamp': datetime.now().isoformat()
+    }
+    
+    if online_model:
+        result['online'] = online_model.predict(container_id, float(row['current_fill_level']), hours_since)
     
-    row = cursor.fetchone()
+    return jsonify(result)
+
+@app.route('/api/predictions/latest')
+def latest_predictions():
+    """Tüm konteynerler için önceden hesaplanmış son tahminler"""
+    conn = sqlite3.connect(DB_PATH)
+    predictions = get_latest_predictions(conn)
     conn.close()
     
-    if not row:
-        return jsonify({'error': 'Konteyner bulunamadı'}), 404
+    return jsonify({
+        'count': len(predictions),
+        'stale_count': sum(1 for p in predictions if p['is_stale']),
+        'refresher': prediction_refresher.status(),
+        'predictions': predictions
+    })
+
+@app.route('/api/predictions/latest/<int:container_id>')
+def latest_prediction(container_id):
+    """Tek konteyner için önceden hesaplanmış son tahmin"""
+    conn = sqlite3.connect(DB_PATH)
+    prediction = get_latest_prediction(conn, container_id)
+    conn.close()
+    
+    if not prediction:
+        return jsonify({'error': 'Kayıtlı tahmin bulunamadı'}), 404
     
-    # Özellikleri oluştur
-    if row[3]:
-        last_date = datetime.fromisoformat(row[3])
-        hours_since = (datetime.now() - last_date).total_seconds() / 3600
-    else:
-        hours_since = 168
-    
-    days_since = hours_since / 24
-    now = datetime.now()
-    day_of_week = now.weekday()
-    is_weekend = int(now.weekday() >= 5)
-    month = now.month
-    season = (month % 12) // 3
-    
-    capacity = row[2]
-    container_type_map = {'underground': 4, '770lt': 3, '400lt': 2, 'plastic': 1}
-    container_type_encoded = container_type_map.get(row[1], 2)
-    
-    population = row[8] if row[8] else 10000
-    pop_density = row[9] if row[9] else 5000
-    area = row[10] if row[10] else 2.0
-    
-    features = [
-        hours_since, days_since, day_of_week, is_weekend, month, season,
-        capacity, container_type_encoded, population, pop_density, area,
-        0.5, 0.5, 10, 0.5
-    ]
-    
-    # Tahmin
-    model = model_data['model']
-    probabilities = model.predict_proba([features])[0]
-    fill_probability = probabilities[1]
+    return jsonify(prediction)
+
+@app.route('/api/predictions/refresh', methods=['POST'])
+def refresh_predictions():
+    """Tahminleri hemen yeniden hesapla"""
+    if not model_registry.model_data:
+        return jsonify({'error': 'Model yüklü değil'}), 503
     
+    prediction_refresher.refresh()
+    return jsonify({'success': True, **prediction_refresher.status()})
+
+@app.route('/api/health')
+def health():
+    """Hazır olma durumu (modeller yüklenene kadar 503)"""
+    report, status_code = health_report([serving])
+    # /api/predict ile aynı model sürümü; takas sayacı ayrı anahtarda
+    snapshot = model_registry.current()
+    report['model_version'] = (snapshot.model_data or {}).get('version')
+    report['registry_version'] = snapshot.version
+    return jsonify(report), status_code
+
+@app.route('/api/model/metrics')
+def model_metrics():
+    """Arka plan eğitim metrikleri ve aktif model sürümü"""
+    metrics = retrain_worker.metrics()
+    metrics['fill_model_mode'] = FILL_MODEL_MODE
+    metrics['prediction_cache'] = prediction_cache.stats()
+    state = serving.get()
+    if state:
+        metrics['feature_store'] = state['feature_store'].stats()
+    if online_model:
+        metrics['online'] = online_model.stats()
+    return jsonify(metrics)
+
+@app.route('/api/model/monitoring')
+def model_monitoring():
+    """Hareketli MAE, özellik/skor PSI değerleri ve kayma tetiklemeleri"""
+    report = drift_monitor.report()
+    report['model_version'] = (model_registry.model_data or {}).get('version')
+    return jsonify(report)
+
+@app.route('/api/forecast/fill')
+def fill_forecast():
+    """Toplama geçmişinden konteynerlerin eşiğe (varsayılan %75) ulaşma tahmini"""
+    from flask import request
+    from fill_forecast import FULL_THRESHOLD, build_forecast
+
+    threshold = request.args.get('threshold', FULL_THRESHOLD, type=float)
+    limit = request.args.get('limit', 100, type=int)
+
+    conn = sqlite3.connect(DB_PATH)
+    forecast, factors = build_forecast(conn, threshold=threshold)
+    conn.close()
+
+    forecast = forecast.sort_values('days_to_threshold').head(limit)
+    forecast['reach_date'] = forecast['reach_date'].dt.strftime('%Y-%m-%dT%H:%M')
+
     return jsonify({
-        'container_id': container_id,
-        'neighborhood': row[7],
-        'container_type': row[1],
-        'capacity_liters': row[2],
-        'current_fill_level': float(row[4]),
-        'fill_probability': float(fill_probability),
-        'is_full': bool(fill_probability >= 0.75),
-        'confidence': float(max(probabilities)),
-        'latitude': float(row[5]),
-        'longitude': float(row[6]),
-        'model_version': model_data['version'],
-        'prediction_timestamp': datetime.now().isoformat()
+        'threshold': threshold,
+        'weekday_factors': [round(float(f), 4) for f in factors],
+        'count': len(forecast),
+        'containers': forecast.round(4).to_dict(orient='records')
     })
 
 @app.route('/api/auth/register', methods=['POST'])
@@ -507,7 +603,7 @@ def submit_report():
     total_reports = user_info[1] if user_info[1] else 0
     
     # Konteyner mevcut doluluk seviyesini al
-    cursor.execute("SELECT current_fill_level FROM containers WHERE container_id = ?", (container_id,))
+    cursor.execute("SELECT current_fill_level, last_collection_date FROM containers WHERE container_id = ?", (container_id,))
     container_info = cursor.fetchone()
     
     if not container_info:
@@ -516,6 +612,15 @@ def submit_report():
     
     actual_fill = container_info[0]
     
+    # Bildirim öncesi model tahmini (kayma izleme için)
+    state = serving.get()
+    model_data = model_registry.model_data
+    model_probability = None
+    if state and model_data:
+        _, X = state['feature_store'].classifier_matrix([container_id])
+        if len(X):
+            model_probability = float(model_data['model'].predict_proba(X)[0, 1])
+    
     # Doğruluk hesapla (fark ne kadar küçükse o kadar doğru)
     accuracy = 1.0 - abs(fill_level - actual_fill)
     accuracy = max(0.0, min(1.0, accuracy))  # 0-1 arası sınırla
@@ -539,17 +644,25 @@ def submit_report():
     new_trust = current_trust + trust_change
     new_trust = max(0.0, min(1.0, new_trust))  # 0-1 arası sınırla
     
-    # Bildirimi kaydet (citizen_reports tablosu kullan)
+    # Çevrimiçi mod: bildirim modeli anında günceller (güven puanı ağırlığıyla)
+    if online_model and status != 'rejected':
+        online_model.update(container_id, actual_fill, fill_level,
+                            hours_between(container_info[1]), weight=current_trust)
+    
+    # Bildirimi kaydet (citizen_reports tablosu kullan); doğrulanan ve reddedilen
+    # bildirimler verified_at ile damgalanır, yalnızca 'pending' toplu doğrulamaya kalır
+    submitted_at = datetime.now().isoformat()
     cursor.execute("""
         INSERT INTO citizen_reports 
         (user_id, container_id, fill_level_estimate, latitude, longitude, 
-         notes, prediction_diff, is_verified, actual_full, submitted_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+         notes, prediction_diff, is_verified, verified_at, actual_full, submitted_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (user_id, container_id, fill_level, 40.2, 28.9, 
           notes, abs(fill_level - actual_fill), 
           1 if status == 'verified' else 0, 
+          None if status == 'pending' else submitted_at,
           int(actual_fill >= 0.75),
-          datetime.now().isoformat()))
+          submitted_at))
     
     # Kullanıcı istatistiklerini güncelle
     cursor.execute("""
@@ -560,7 +673,12 @@ def submit_report():
         WHERE user_id = ?
     """, (new_trust, total_reports + 1, status, user_id))
     
+    # Doğrulanmış bildirim: model olasılığı ile bildirilen dolu/boş durumu arasındaki hata
+    if status == 'verified' and model_probability is not None:
+        drift_monitor.record_outcome(model_probability, float(fill_level >= 0.75))
+    
     # Eğer bildirim doğrulanmışsa, konteyner doluluk seviyesini güncelle
+    model_update_queued = False
     if status == 'verified' and accuracy >= 0.8:  # Çok doğru tahminlerde güncelle
         cursor.execute("""
             UPDATE containers 
@@ -569,34 +687,22 @@ def submit_report():
             WHERE container_id = ?
         """, (fill_level, datetime.now().isoformat(), container_id))
         
-        # Model eğitim sayacını artır
-        training_counter['verified_count'] += 1
+        # Model eğitim sayacını artır (çevrimiçi modda yeniden eğitim gerekmez)
+        if not online_model:
+            training_counter['verified_count'] += 1
         
-        # Belirli sayıda doğru bildirimde model'i yeniden eğit
-        if training_counter['verified_count'] >= training_counter['threshold']:
-            conn.commit()
-            conn.close()
-            
-            # Model'i arka planda eğit
-            print(f"🔄 {training_counter['verified_count']} doğru bildirim toplandı, model yeniden eğitiliyor...")
-            retrain_success = retrain_model()
-            
-            if retrain_success:
-                training_counter['verified_count'] = 0  # Sayacı sıfırla
-            
-            return jsonify({
-                'success': True,
-                'message': 'Bildirim kaydedildi ve model güncellendi!',
-                'report_status': status,
-                'accuracy': round(accuracy * 100, 1),
-                'trust_score': round(new_trust, 2),
-                'total_reports': total_reports + 1,
-                'trust_change': round(trust_change, 3),
-                'model_updated': retrain_success
-            })
+        # Belirli sayıda doğru bildirimde model'i arka planda yeniden eğit
+        if not online_model and training_counter['verified_count'] >= training_counter['threshold']:
+            print(f"🔄 {training_counter['verified_count']} doğru bildirim toplandı, model eğitimi kuyruğa alındı")
+            retrain_worker.submit()
+            training_counter['verified_count'] = 0
+            model_update_queued = True
     
     conn.commit()
     conn.close()
+    if state:
+        state['feature_store'].invalidate(container_id)
+    prediction_cache.invalidate(container_id)
     
     return jsonify({
         'success': True,
@@ -605,7 +711,8 @@ def submit_report():
         'accuracy': round(accuracy * 100, 1),
         'trust_score': round(new_trust, 2),
         'total_reports': total_reports + 1,
-        'trust_change': round(trust_change, 3)
+        'trust_change': round(trust_change, 3),
+        'model_update_queued': model_update_queued
     })
 
 @app.route('/api/simulate', methods=['POST'])
@@ -746,6 +853,9 @@ def optimize_routes():
                 vehicle_idx = (vehicle_idx + 1) % len(vehicles)
         
         # Her araç için rota detayları oluştur
+        state = serving.get()
+        travel_times = state['travel_times'] if state else None
+        start_time = datetime.now()
         for vehicle in vehicles:
             vehicle_id = vehicle['vehicle_id']
             vehicle_data = vehicle_assignments[vehicle_id]
@@ -771,11 +881,19 @@ def optimize_routes():
             
             assigned_containers = sorted_containers
             
-            # Mesafe ve süre hesapla (basitleştirilmiş)
-            total_distance = len(assigned_containers) * 2.5  # Ortalama 2.5 km per konteyner
-            avg_speed = 35  # Ortalama hız km/h (şehir içi)
-            total_time = (total_distance / avg_speed) * 60  # dakika
-            total_time += len(assigned_containers) * 5  # Her konteyner için 5 dk toplama süresi
+            # Mesafe ve süre hesapla: GPS'ten öğrenilmiş tablo varsa saat × bölge hızlarıyla
+            if travel_times is not None:
+                from travel_times import haversine_km
+                points = [(c['latitude'], c['longitude']) for c in assigned_containers]
+                lats, lons = np.array(points).T
+                total_distance = float(haversine_km(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum())
+                _, total_time = travel_times.route_minutes(points, start_time)
+            else:
+                # Basitleştirilmiş
+                total_distance = len(assigned_containers) * 2.5  # Ortalama 2.5 km per konteyner
+                avg_speed = 35  # Ortalama hız km/h (şehir içi)
+                total_time = (total_distance / avg_speed) * 60  # dakika
+                total_time += len(assigned_containers) * 5  # Her konteyner için 5 dk toplama süresi
             
             # Toplam ağırlık (ton cinsinden) - zaten vehicle_data'da hesaplanmış
             total_weight_tons = vehicle_data['weight']
@@ -832,11 +950,11 @@ if __name__ == '__main__':
     print("=" * 60)
     print("NİLÜFER BELEDİYESİ - BACKEND API")
     print("=" * 60)
-    print(f"\n✓ Model: {'Yüklü ✓' if model_data else 'YÜKLENMEDİ ✗'}")
+    print(f"\n✓ Model: arka planda yükleniyor (durum: /api/health)")
     print(f"✓ Veritabanı: {DB_PATH}")
     print("\n🌐 URL'ler:")
     print("  Vatandaş: http://localhost:5000/")
     print("  Admin: http://localhost:5000/admin")
     print("\n" + "=" * 60 + "\n")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=True, use_reloader=USE_RELOADER, host='0.0.0.0', port=5000)
@@ -0,0 +1,67 @@
+"""
+TEK SATIR TAHMİN GECİKMESİ KARŞILAŞTIRMASI
+sklearn predict/predict_proba ile model_store.py'deki dizi tabanlı ağaç
+gezinmesinin tek satır ve küçük batch gecikmesini ölçer
+
+Kullanım:
+    python scripts/benchmark_inference.py [tekrar_sayısı]
+"""
+
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+sys.path.append('.')
+
+from model_store import load_model
+
+MODELS = ['models/fill_predictor.pkl', 'models/fill_prediction_model.pkl']
+BATCH_SIZES = [1, 8, 64, 1024]
+
+
+def predict_fn(model, kind):
+    return model.predict_proba if kind == 'forest_classifier' else model.predict
+
+
+def median_microseconds(fn, X, repeats):
+    """Tek çağrı süresinin medyanı (µs)"""
+    fn(X)
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(X)
+        samples.append(time.perf_counter() - started)
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    rng = np.random.default_rng(42)
+
+    for path in MODELS:
+        loaded = joblib.load(path)
+        sk_model = loaded['model'] if isinstance(loaded, dict) else loaded
+        forest, meta = load_model(path)
+        sk_fn, arr_fn = predict_fn(sk_model, meta['kind']), predict_fn(forest, meta['kind'])
+
+        print("\n" + "=" * 60)
+        print(f"{path} ({meta['kind']}, {meta['n_trees']} ağaç, derinlik {meta['max_depth']})")
+        print("=" * 60)
+        print(f"{'Satır':>6} | {'sklearn':>12} | {'diziler':>12} | {'hızlanma':>8} | aynı")
+
+        for batch in BATCH_SIZES:
+            X = rng.random((batch, meta['n_features'])) * 100
+            same = np.array_equal(sk_fn(X), arr_fn(X))
+            n = max(repeats // batch, 20)
+            sk_us = median_microseconds(sk_fn, X, n)
+            arr_us = median_microseconds(arr_fn, X, n)
+            print(f"{batch:>6} | {sk_us:>9.1f} µs | {arr_us:>9.1f} µs | {sk_us / arr_us:>7.1f}x | "
+                  f"{'✓' if same else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
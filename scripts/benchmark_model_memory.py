@@ -0,0 +1,100 @@
+"""
+MODEL BELLEK KARŞILAŞTIRMASI
+Her worker sürecinin pickle ile ve paylaşımlı mmap dizileriyle model
+yüklediğinde kullandığı bellek ve yükleme süresini ölçer (Linux /proc gerekir)
+
+Kullanım:
+    python scripts/benchmark_model_memory.py [worker_sayısı]
+"""
+
+import multiprocessing as mp
+import os
+import sys
+import time
+
+sys.path.append('.')
+
+MODELS = ['models/fill_predictor.pkl', 'models/fill_prediction_model.pkl']
+
+
+def read_memory_kb():
+    """Rss / Pss / Shared değerlerini kB olarak oku"""
+    values = {}
+    with open('/proc/self/smaps_rollup', 'r') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Shared_Clean:', 'Shared_Dirty:'):
+                values[parts[0].rstrip(':')] = int(parts[1])
+    values['Shared'] = values.pop('Shared_Clean', 0) + values.pop('Shared_Dirty', 0)
+    return values
+
+
+def worker(mode, barrier, results):
+    import numpy as np
+    before = read_memory_kb()
+    started = time.perf_counter()
+
+    models = []
+    for path in MODELS:
+        if mode == 'pickle':
+            import joblib
+            loaded = joblib.load(path)
+            models.append(loaded['model'] if isinstance(loaded, dict) else loaded)
+        else:
+            from model_store import load_model
+            models.append(load_model(path)[0])
+
+    # Tüm sayfalara dokunmak için her modelle bir tahmin yap
+    for model in models:
+        model.predict(np.zeros((1, model.n_features_in_)))
+    load_seconds = time.perf_counter() - started
+
+    # Pss tüm worker'lar yüklendikten sonra anlamlı olur
+    barrier.wait()
+    after = read_memory_kb()
+    results.put({
+        'load_seconds': load_seconds,
+        'rss_mb': after['Rss'] / 1024,
+        'pss_mb': after['Pss'] / 1024,
+        'shared_mb': after['Shared'] / 1024,
+        'model_rss_mb': (after['Rss'] - before['Rss']) / 1024
+    })
+    barrier.wait()
+
+
+def run(mode, n_workers):
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(n_workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(mode, barrier, results)) for _ in range(n_workers)]
+    for p in processes:
+        p.start()
+    rows = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+
+    def avg(key):
+        return sum(r[key] for r in rows) / len(rows)
+
+    print(f"{mode:8s} | {avg('load_seconds'):8.3f} sn | RSS {avg('rss_mb'):7.1f} MB | "
+          f"PSS {avg('pss_mb'):7.1f} MB | paylaşılan {avg('shared_mb'):6.1f} MB | "
+          f"model+import RSS {avg('model_rss_mb'):6.1f} MB")
+
+
+def main():
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    # Dizileri önceden oluştur (ilk dışa aktarım ölçüme girmesin)
+    from model_store import load_model
+    for path in MODELS:
+        load_model(path)
+
+    print("=" * 100)
+    print(f"MODEL BELLEK KARŞILAŞTIRMASI ({n_workers} worker, worker başına ortalama)")
+    print("=" * 100)
+    run('pickle', n_workers)
+    run('mmap', n_workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+API SOĞUK BAŞLATMA SÜRESİ
+Her uygulama yeni bir Python sürecinde içe aktarılır; ilk veritabanı
+endpoint yanıtına ve /api/health'in hazır olmasına kadar geçen süre ölçülür
+
+Kullanım:
+    python scripts/benchmark_startup.py [tekrar_sayısı]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+APPS = [
+    # (modül, yükleyici, veritabanı endpoint'i, model endpoint'i)
+    ('app_sqlite', 'serving', '/api/dashboard/stats', '/api/predict/1'),
+    ('app_ai', 'ai_models', '/api/neighborhoods', '/api/predict_fill/1')
+]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module} as api
+imported = time.perf_counter() - started
+client = api.app.test_client()
+db_status = client.get('{db_endpoint}').status_code
+first_response = time.perf_counter() - started
+early_health = client.get('/api/health').status_code
+api.{loader}.wait(60)
+ready = time.perf_counter() - started
+model_status = client.get('{model_endpoint}').status_code
+print(json.dumps({{'import': imported, 'first_response': first_response, 'ready': ready,
+                  'db_status': db_status, 'early_health': early_health, 'model_status': model_status,
+                  'pandas_at_import': 'pandas' in sys.modules}}))
+"""
+
+
+def measure(module, loader, db_endpoint, model_endpoint):
+    """Yeni süreçte bir ölçüm"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(['.', 'scripts', os.environ.get('PYTHONPATH', '')]))
+    code = PROBE.format(module=module, loader=loader, db_endpoint=db_endpoint, model_endpoint=model_endpoint)
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'Uygulama':<12} | {'import':>8} | {'ilk DB yanıtı':>13} | {'hazır':>8} | durum kodları")
+    for module, loader, db_endpoint, model_endpoint in APPS:
+        runs = [measure(module, loader, db_endpoint, model_endpoint) for _ in range(repeats)]
+        median = {key: float(np.median([run[key] for run in runs])) for key in ('import', 'first_response', 'ready')}
+        last = runs[-1]
+        print(f"{module:<12} | {median['import']:>6.3f} s | {median['first_response']:>11.3f} s | "
+              f"{median['ready']:>6.3f} s | DB {last['db_status']}, health(erken) {last['early_health']}, "
+              f"model {last['model_status']}")
+
+
+if __name__ == "__main__":
+    main()
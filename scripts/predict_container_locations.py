@@ -9,6 +9,10 @@ GPS verilerindeki TÜM özellikleri kullanarak konteyner konumlarını ML ile be
 - Açıklama (Duran, Hareketli, Rölanti Alarmı vb.)
 - Mahalle bilgisi
 - Mesafe (kısa mesafeli durmalar)
+
+Kullanım:
+    python predict_container_locations.py                          # tüm geçmiş (toplu)
+    python predict_container_locations.py incremental <gün.csv>    # yeni günü mevcut kümelere ekle
 """
 
 import pandas as pd
@@ -18,205 +22,275 @@ from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import LabelEncoder
 import sqlite3
 import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gps_cache import open_gps_columns
+from gps_features import EventClassifier, duration_minutes
+from stop_clustering import CLUSTER_STATE_PATH, EPS_METERS, IncrementalStopClusters, cluster_stops
+from stop_segmentation import iter_segment_stops
+
+GPS_PATH = 'data/all_merged_data.csv'
+CHUNK_SIZE = 50000
+TOP_STOPS = 10000          # Akışta tutulan en yüksek skorlu aday sayısı (main: tümü)
+MIN_CONTAINER_SCORE = 4    # 4+ skor = muhtemelen konteyner noktası
+
+# GPS dosyası kolonları (farklı dışa aktarımlar için değiştirilebilir)
+DURATION_COLUMN = 'Duraklama Süresi'
+IDLE_COLUMN = 'Rölanti Süresi'
+SPEED_COLUMN = 'Hız(km/sa)'
+DESCRIPTION_COLUMN = 'Açıklama'
+DISTANCE_COLUMN = 'Mesafe(km)'
+NEIGHBORHOOD_COLUMN = 'Mahalle'
+LAT_COLUMN = 'Enlem'
+LON_COLUMN = 'Boylam'
+VEHICLE_COLUMN = 'Plaka'
+TIME_COLUMN = 'Tarih'
+
+
+def gps_columns():
+    """Pipeline'ın okuduğu kolonlar (geri kalanlar hiç belleğe alınmaz)"""
+    return [DURATION_COLUMN, IDLE_COLUMN, SPEED_COLUMN, DESCRIPTION_COLUMN,
+            DISTANCE_COLUMN, NEIGHBORHOOD_COLUMN, LAT_COLUMN, LON_COLUMN]
+
+
+class GpsStreamSummary:
+    """
+    Parça parça güncellenen GPS özeti (bellek dosya boyutundan bağımsız)
+
+    Toplamlar ve mahalle bazlı sayaçlar her parçada eklenir; kümeleme için
+    yalnızca en yüksek skorlu top_n aday nokta tutulur (top_n=None: tüm adaylar).
+    """
+
+    def __init__(self, top_n=TOP_STOPS):
+        self.top_n = top_n
+        self.rows = 0
+        self.chunks = 0
+        self.duration_sum = 0.0
+        self.idle_sum = 0.0
+        self.stopped = 0
+        self.duran = 0
+        self.trafik = 0
+        self.candidates = 0
+        self.neighborhoods = pd.DataFrame(columns=['records', 'candidates', 'candidate_minutes'], dtype=float)
+        self._stops = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, features, candidates):
+        """Bir parçanın özelliklerini ve aday noktalarını ekle"""
+        self.rows += len(features)
+        self.chunks += 1
+        self.duration_sum += float(features['duraklama_dakika'].sum())
+        self.idle_sum += float(features['rolanti_dakika'].sum())
+        self.stopped += int(features['is_stopped'].sum())
+        self.duran += int(features['is_duran'].sum())
+        self.trafik += int(features['is_trafik'].sum())
+        self.candidates += len(candidates)
+
+        by_neighborhood = pd.DataFrame({
+            'records': features.groupby(NEIGHBORHOOD_COLUMN, observed=True).size(),
+            'candidates': candidates.groupby(NEIGHBORHOOD_COLUMN, observed=True).size(),
+            'candidate_minutes': candidates.groupby(NEIGHBORHOOD_COLUMN, observed=True)['duraklama_dakika'].sum()
+        }).fillna(0)
+        self.neighborhoods = by_neighborhood.add(self.neighborhoods, fill_value=0)
+
+        if self.top_n is None:
+            self._stops.append(candidates)
+        else:
+            # Önceki en iyiler önce: eşit skorda dosyadaki ilk kayıt kalır (tek seferde nlargest ile aynı)
+            merged = pd.concat(self._stops + [candidates]) if self._stops else candidates
+            self._stops = [merged.nlargest(self.top_n, 'container_score')]
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def top_stops(self):
+        """Kümelemeye gidecek aday noktalar (henüz parça yoksa None)"""
+        if not self._stops:
+            return None
+        if len(self._stops) > 1:
+            self._stops = [pd.concat(self._stops)]
+        return self._stops[0]
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def stats(self):
+        rows = max(self.rows, 1)
+        return {
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'rows_per_second': round(self.rows_per_second),
+            'avg_stop_minutes': self.duration_sum / rows,
+            'avg_idle_minutes': self.idle_sum / rows,
+            'stopped_ratio': self.stopped / rows,
+            'duran_records': self.duran,
+            'traffic_records': self.trafik,
+            'candidate_stops': self.candidates,
+            'top_stops': 0 if self.top_stops is None else len(self.top_stops),
+            'neighborhoods': len(self.neighborhoods)
+        }
+
 
 class ContainerLocationPredictor:
     def __init__(self):
         self.model = None
         self.label_encoder = LabelEncoder()
-        
-    def load_and_analyze_gps_data(self):
-        """GPS verilerini yükle ve analiz et"""
-        print("\n📊 GPS verileri yükleniyor ve analiz ediliyor...")
-        
-        # GPS verilerini chunklara bölerek yükle (hafıza sorunu için)
-        print("  (Büyük dosya - parça parça yükleniyor...)")
-        chunks = []
-        chunk_size = 50000
-        
-        for chunk in pd.read_csv('data/all_merged_data.csv', chunksize=chunk_size):
-            chunks.append(chunk)
-            if len(chunks) % 5 == 0:
-                print(f"  ... {len(chunks) * chunk_size:,} kayıt yüklendi")
-        
-        gps_data = pd.concat(chunks, ignore_index=True)
-        print(f"✓ {len(gps_data):,} GPS kaydı yüklendi")
-        print(f"✓ Kolonlar: {len(gps_data.columns)} adet")
-        
-        return gps_data
+        self.event_classifier = EventClassifier()
+    
+    def iter_gps_chunks(self, path=GPS_PATH, chunk_size=CHUNK_SIZE):
+        """GPS kayıtlarını parça parça oku (kolon önbelleğinden, yalnızca gerekli kolonlar)"""
+        return open_gps_columns(path, gps_columns()).iter_frames(chunk_size)
+    
+    def stream_container_stops(self, path=GPS_PATH, chunk_size=CHUNK_SIZE, top_n=TOP_STOPS):
+        """
+        Akan GPS işleme: her parça özelliklere çevrilir, aday duraklara
+        indirgenir ve özete eklenir; bir sonraki parça ondan sonra okunur
+        (top_n=None: tüm aday noktalar tutulur)
+        
+        Döndürür:
+            (en yüksek skorlu top_n aday nokta, GpsStreamSummary)
+        """
+        print("\n📊 GPS verileri akış halinde işleniyor...")
+        summary = GpsStreamSummary(top_n)
+        
+        for chunk in self.iter_gps_chunks(path, chunk_size):
+            features = self.extract_features(chunk)
+            summary.add(features, self.identify_container_stops(features))
+            if summary.chunks % 5 == 0:
+                print(f"  ... {summary.rows:,} kayıt işlendi ({summary.rows_per_second:,.0f} kayıt/sn)")
+        
+        stats = summary.stats()
+        print(f"✓ {stats['rows']:,} GPS kaydı işlendi ({stats['rows_per_second']:,} kayıt/sn)")
+        print(f"  - Duraklama süresi ortalaması: {stats['avg_stop_minutes']:.2f} dk")
+        print(f"  - Rölanti süresi ortalaması: {stats['avg_idle_minutes']:.2f} dk")
+        print(f"  - Durma oranı: {stats['stopped_ratio']*100:.1f}%")
+        print(f"  - 'Duran' kayıt sayısı: {stats['duran_records']:,}")
+        print(f"  - Trafik/Kaza kayıtları: {stats['traffic_records']:,}")
+        print(f"✓ {stats['candidate_stops']:,} potansiyel konteyner noktası bulundu "
+              f"(%{stats['candidate_stops'] / max(stats['rows'], 1) * 100:.2f})")
+        
+        top_stops = summary.top_stops if summary.top_stops is not None else pd.DataFrame()
+        return top_stops, summary
+    
+    def segment_container_stops(self, path=GPS_PATH, chunk_size=CHUNK_SIZE):
+        """
+        Araç izlerinden durak segmentleri (kümeleme adayları)
+        
+        Kolon önbelleği parça parça okunur; her parça skorlanır ve araç +
+        zaman sırasıyla ardışık duran kayıtlar tek durağa indirilir
+        (stop_segmentation.iter_segment_stops). Her aracın son koşusu bir
+        sonraki parçaya taşınır, bellekte parça + araç başına bir koşu ve
+        aday duraklar kalır. Her durağın başlangıcı, bitişi ve gerçek servis
+        süresi (duraklama_dakika) vardır; skoru durak boyunca en yüksek kayıt
+        skorudur. Plaka/Tarih kolonları olmayan dışa aktarımlarda satır bazlı
+        akışa (en yüksek skorlu TOP_STOPS aday) düşer.
+        """
+        columns = open_gps_columns(path, gps_columns() + [VEHICLE_COLUMN, TIME_COLUMN])
+        if not {VEHICLE_COLUMN, TIME_COLUMN} <= {column['name'] for column in columns.columns}:
+            print("⚠️ Araç/zaman kolonları yok, satır bazlı akışa geçiliyor")
+            return self.stream_container_stops(path, chunk_size)[0]
+        
+        print("\n🚛 Araç izleri durak segmentlerine ayrılıyor...")
+        started = time.perf_counter()
+        
+        def scored_chunks():
+            for chunk in columns.iter_frames(chunk_size):
+                features = self.extract_features(chunk)
+                self.identify_container_stops(features)  # container_score kolonunu ekler
+                features[VEHICLE_COLUMN] = chunk[VEHICLE_COLUMN]
+                features[TIME_COLUMN] = chunk[TIME_COLUMN]
+                yield features
+        
+        n_segments, candidates = 0, []
+        for segments in iter_segment_stops(scored_chunks(), vehicle_column=VEHICLE_COLUMN,
+                                           time_column=TIME_COLUMN, speed_column='hiz',
+                                           lat_column=LAT_COLUMN, lon_column=LON_COLUMN,
+                                           duration_column='duraklama_dakika',
+                                           first_columns=[NEIGHBORHOOD_COLUMN],
+                                           max_columns=['container_score']):
+            n_segments += len(segments)
+            candidates.append(segments[segments['container_score'] >= MIN_CONTAINER_SCORE])
+        container_stops = pd.concat(candidates, ignore_index=True)
+        container_stops['duraklama_dakika'] = container_stops['dwell_minutes']
+        
+        print(f"✓ {columns.rows:,} kayıt -> {n_segments:,} durak -> "
+              f"{len(container_stops):,} aday ({time.perf_counter() - started:.1f} sn)")
+        print(f"  - Ortalama servis süresi: {container_stops['duraklama_dakika'].mean():.1f} dk")
+        return container_stops
     
     def extract_features(self, gps_data):
-        """GPS verilerinden konteyner tespiti için özellikler çıkar"""
-        print("\n🔧 Özellikler çıkarılıyor...")
-        
-        # Duraklama süresini dakikaya çevir
-        def parse_duration(duration_str):
-            try:
-                if pd.isna(duration_str) or duration_str == '00:00:00':
-                    return 0
-                parts = str(duration_str).split(':')
-                hours = int(parts[0])
-                minutes = int(parts[1])
-                seconds = int(parts[2])
-                return hours * 60 + minutes + seconds / 60
-            except:
-                return 0
-        
-        # Rölanti süresini dakikaya çevir
-        def parse_idle(idle_str):
-            try:
-                if pd.isna(idle_str) or idle_str == '00:00:00':
-                    return 0
-                parts = str(idle_str).split(':')
-                hours = int(parts[0])
-                minutes = int(parts[1])
-                seconds = int(parts[2])
-                return hours * 60 + minutes + seconds / 60
-            except:
-                return 0
-        
-        df = gps_data.copy()
+        """GPS parçasından konteyner tespiti için özellikler (yalnızca gereken kolonlar)"""
+        df = pd.DataFrame({
+            NEIGHBORHOOD_COLUMN: gps_data[NEIGHBORHOOD_COLUMN],
+            LAT_COLUMN: gps_data[LAT_COLUMN],
+            LON_COLUMN: gps_data[LON_COLUMN]
+        })
         
         # 1. Süre özellikleri
-        df['duraklama_dakika'] = df['Duraklama Süresi'].apply(parse_duration)
-        df['rolanti_dakika'] = df['Rölanti Süresi'].apply(parse_idle)
+        df['duraklama_dakika'] = np.nan_to_num(duration_minutes(gps_data[DURATION_COLUMN]))
+        df['rolanti_dakika'] = np.nan_to_num(duration_minutes(gps_data[IDLE_COLUMN]))
         
         # 2. Hız özellikleri
-        df['hiz'] = pd.to_numeric(df['Hız(km/sa)'], errors='coerce').fillna(0)
+        df['hiz'] = pd.to_numeric(gps_data[SPEED_COLUMN], errors='coerce').fillna(0)
         df['is_stopped'] = (df['hiz'] == 0).astype(int)
         
-        # 3. Açıklama kategorileri
-        df['aciklama_lower'] = df['Açıklama'].str.lower().fillna('')
-        
-        # Konteyner toplama göstergeleri
-        df['is_duran'] = df['aciklama_lower'].str.contains('duran|duraklama', na=False).astype(int)
-        df['is_rolanti'] = df['aciklama_lower'].str.contains('rölanti', na=False).astype(int)
-        df['is_alarm'] = df['aciklama_lower'].str.contains('alarm', na=False).astype(int)
-        
-        # Kaza, trafik işaretlerini filtrele (NEGATIF göstergeler)
-        df['is_trafik'] = df['aciklama_lower'].str.contains(
-            'hız|kırmızı|trafik|kaza|ihlal', na=False
-        ).astype(int)
-        df['is_kontak'] = df['aciklama_lower'].str.contains('kontak', na=False).astype(int)
+        # 3. Açıklama kategorileri (duran, rölanti, alarm; trafik ve kontak NEGATIF göstergeler)
+        # Her farklı açıklama bir kez sınıflandırılır, satırlar kod tablosundan okunur
+        for column, flags in self.event_classifier.flags(gps_data[DESCRIPTION_COLUMN]).items():
+            df[column] = flags
         
         # 4. Mesafe özellikleri
-        df['mesafe'] = pd.to_numeric(df['Mesafe(km)'], errors='coerce').fillna(0)
-        
-        print(f"✓ Özellikler hazırlandı")
-        print(f"  - Duraklama süresi ortalaması: {df['duraklama_dakika'].mean():.2f} dk")
-        print(f"  - Rölanti süresi ortalaması: {df['rolanti_dakika'].mean():.2f} dk")
-        print(f"  - Durma oranı: {df['is_stopped'].mean()*100:.1f}%")
-        print(f"  - 'Duran' kayıt sayısı: {df['is_duran'].sum():,}")
-        print(f"  - Trafik/Kaza kayıtları: {df['is_trafik'].sum():,}")
+        df['mesafe'] = pd.to_numeric(gps_data[DISTANCE_COLUMN], errors='coerce').fillna(0)
         
         return df
     
     def identify_container_stops(self, df):
-        """Konteyner toplama noktalarını ML ile belirle"""
-        print("\n🤖 Konteyner toplama noktaları ML ile belirleniyor...")
-        
+        """Konteyner toplama noktalarını skorla, eşiği geçenleri döndür"""
         # Konteyner toplama kriterleri (skorlama sistemi)
-        df['container_score'] = 0.0
-        
-        # 1. Duraklama süresi (5+ dakika = yüksek skor)
-        df.loc[df['duraklama_dakika'] >= 5, 'container_score'] += 3
-        df.loc[df['duraklama_dakika'] >= 10, 'container_score'] += 2
-        
-        # 2. Rölanti (motor çalışırken durursa = konteyner boşaltma)
-        df.loc[df['rolanti_dakika'] >= 2, 'container_score'] += 2
-        
-        # 3. Hız = 0
-        df.loc[df['is_stopped'] == 1, 'container_score'] += 1
-        
-        # 4. "Duran" veya "Duraklama" açıklaması
-        df.loc[df['is_duran'] == 1, 'container_score'] += 2
-        df.loc[df['is_rolanti'] == 1, 'container_score'] += 1
-        
-        # 5. NEGATİF skorlar (bunlar konteyner DEĞİL!)
-        df.loc[df['is_trafik'] == 1, 'container_score'] -= 5  # Trafik/hız ihlali
-        df.loc[df['is_kontak'] == 1, 'container_score'] -= 3  # Kontak açma/kapama
-        df.loc[df['is_alarm'] == 1, 'container_score'] -= 2   # Genel alarmlar
-        
-        # Eşik değer: 4+ skor = muhtemelen konteyner noktası
-        potential_containers = df[df['container_score'] >= 4].copy()
-        
-        print(f"✓ {len(potential_containers):,} potansiyel konteyner noktası bulundu")
-        print(f"  Toplam GPS kaydının %{len(potential_containers)/len(df)*100:.2f}'si")
-        
-        return potential_containers
+        score = (
+            # 1. Duraklama süresi (5+ dakika = yüksek skor)
+            3.0 * (df['duraklama_dakika'] >= 5) + 2 * (df['duraklama_dakika'] >= 10)
+            # 2. Rölanti (motor çalışırken durursa = konteyner boşaltma)
+            + 2 * (df['rolanti_dakika'] >= 2)
+            # 3. Hız = 0
+            + df['is_stopped']
+            # 4. "Duran" veya "Duraklama" açıklaması
+            + 2 * df['is_duran'] + df['is_rolanti']
+            # 5. NEGATİF skorlar (bunlar konteyner DEĞİL!)
+            - 5 * df['is_trafik'] - 3 * df['is_kontak'] - 2 * df['is_alarm']
+        )
+        df['container_score'] = score
+        
+        return df[score >= MIN_CONTAINER_SCORE]
     
-    def cluster_container_locations(self, container_stops):
-        """Konteyner noktalarını kümelemek (aynı konteynerin farklı ziyaretleri)"""
-        print("\n🗺️ Konteyner konumları kümeleniyor...")
+    def cluster_container_locations(self, container_stops, eps_meters=EPS_METERS, n_jobs=None):
+        """
+        Konteyner noktalarını kümelemek (aynı konteynerin farklı ziyaretleri)
         
-        # Önce en yüksek skorluları al (hafıza optimizasyonu)
-        print("  - En yüksek skorlu noktalar seçiliyor...")
-        top_stops = container_stops.nlargest(10000, 'container_score')
-        print(f"  ✓ {len(top_stops):,} en iyi nokta seçildi")
-        
-        # Mahalle bazında grupla
-        all_clusters = []
-        processed_mahalle = 0
-        total_mahalle = len(top_stops['Mahalle'].unique())
-        
-        for mahalle in top_stops['Mahalle'].unique():
-            if pd.isna(mahalle):
-                continue
-            
-            processed_mahalle += 1
-            if processed_mahalle % 10 == 0:
-                print(f"  ... {processed_mahalle}/{total_mahalle} mahalle işlendi")
-            
-            mahalle_data = top_stops[top_stops['Mahalle'] == mahalle]
-            
-            if len(mahalle_data) < 2:
-                # Tek nokta varsa direkt ekle
-                for _, row in mahalle_data.iterrows():
-                    all_clusters.append({
-                        'mahalle': mahalle,
-                        'latitude': row['Enlem'],
-                        'longitude': row['Boylam'],
-                        'visit_count': 1,
-                        'avg_duration': row['duraklama_dakika'],
-                        'avg_score': row['container_score']
-                    })
-                continue
-            
-            # Koordinatları al
-            coords = mahalle_data[['Enlem', 'Boylam']].values
-            
-            # DBSCAN kümeleme (yakın noktaları grupla)
-            # eps=0.0005 yaklaşık 55 metre
-            try:
-                clustering = DBSCAN(eps=0.0005, min_samples=2).fit(coords)
-                
-                # Her küme için merkez nokta ve istatistikler
-                for label in set(clustering.labels_):
-                    if label == -1:  # Gürültü noktaları
-                        continue
-                    
-                    cluster_points = mahalle_data[clustering.labels_ == label]
-                    
-                    all_clusters.append({
-                        'mahalle': mahalle,
-                        'latitude': cluster_points['Enlem'].mean(),
-                        'longitude': cluster_points['Boylam'].mean(),
-                        'visit_count': len(cluster_points),
-                        'avg_duration': cluster_points['duraklama_dakika'].mean(),
-                        'avg_score': cluster_points['container_score'].mean()
-                    })
-            except Exception as e:
-                # Kümeleme başarısız olursa en yüksek skorlu noktayı al
-                best = mahalle_data.nlargest(1, 'container_score').iloc[0]
-                all_clusters.append({
-                    'mahalle': mahalle,
-                    'latitude': best['Enlem'],
-                    'longitude': best['Boylam'],
-                    'visit_count': len(mahalle_data),
-                    'avg_duration': mahalle_data['duraklama_dakika'].mean(),
-                    'avg_score': mahalle_data['container_score'].mean()
-                })
-        
-        clusters_df = pd.DataFrame(all_clusters)
+        Tüm aday noktalar mahalle bazında, haversine mesafesi ve metre
+        cinsinden eps ile paralel kümelenir (stop_clustering.cluster_stops).
+        """
+        print("\n🗺️ Konteyner konumları kümeleniyor...")
+        print(f"  ✓ {len(container_stops):,} aday nokta, eps = {eps_meters:.0f} m")
+        
+        labels = cluster_stops(container_stops, NEIGHBORHOOD_COLUMN, LAT_COLUMN, LON_COLUMN,
+                               eps_meters=eps_meters, n_jobs=n_jobs)
+        clustered = container_stops[labels >= 0]
+        
+        # Her küme için merkez nokta ve istatistikler (tek groupby)
+        clusters_df = clustered.groupby(labels[labels >= 0], sort=True).agg(
+            mahalle=(NEIGHBORHOOD_COLUMN, 'first'),
+            latitude=(LAT_COLUMN, 'mean'),
+            longitude=(LON_COLUMN, 'mean'),
+            visit_count=(LAT_COLUMN, 'size'),
+            avg_duration=('duraklama_dakika', 'mean'),
+            avg_score=('container_score', 'mean')
+        ).reset_index(drop=True)
+        clusters_df['mahalle'] = clusters_df['mahalle'].astype(object)
         
         print(f"✓ {len(clusters_df)} benzersiz konteyner konumu belirlendi")
         print(f"  Ortalama ziyaret sayısı: {clusters_df['visit_count'].mean():.1f}")
@@ -224,6 +298,31 @@ class ContainerLocationPredictor:
         
         return clusters_df
     
+    def update_locations_incremental(self, gps_path, state_path=CLUSTER_STATE_PATH, n_jobs=None):
+        """
+        Artımlı mod: yeni günün GPS dosyasını kayıtlı kümelere ekle
+        
+        Aday noktalar mevcut küme merkezlerine atanır; yalnızca eşleşmeyen
+        yoğun noktalar yeni küme açar. Maliyet yeni günün satır sayısıyla
+        orantılıdır (tüm geçmiş yeniden işlenmez).
+        
+        Döndürür:
+            (güncel kümeler - cluster_container_locations ile aynı kolonlar, özet)
+        """
+        container_stops = self.segment_container_stops(gps_path)
+        
+        state = IncrementalStopClusters.load(state_path, group_column=NEIGHBORHOOD_COLUMN,
+                                             lat_column=LAT_COLUMN, lon_column=LON_COLUMN)
+        result = state.update(container_stops, n_jobs=n_jobs)
+        state.save(state_path)
+        
+        print(f"\n🗺️ Artımlı kümeleme (güncelleme #{state.updates}):")
+        print(f"  ✓ {result['matched']:,}/{result['rows']:,} nokta mevcut kümelere eklendi")
+        print(f"  ✓ {result['new_clusters']} yeni konum, {result['pending']:,} nokta beklemede")
+        print(f"✓ Toplam {result['clusters']:,} konteyner konumu -> {state_path}")
+        
+        return state.to_frame(), result
+    
     def update_database_with_predictions(self, predicted_locations):
         """Tahmin edilen konumlarla database'i güncelle"""
         print("\n💾 Database güncelleniyor...")
@@ -318,22 +417,24 @@ def main():
     print("  ✓ Hız = 0 kontrolü")
     print("  ✓ Açıklama metni analizi (Duran, Rölanti vs.)")
     print("  ✓ Trafik/Kaza filtreleme (NEGATİF skorlama)")
-    print("  ✓ DBSCAN kümeleme")
+    print("  ✓ Araç bazlı durak segmentasyonu (başlangıç/bitiş, servis süresi)")
+    print("  ✓ DBSCAN kümeleme (haversine, metre cinsinden eps)")
     print("  ✓ Mahalle bazlı gruplama")
     
     predictor = ContainerLocationPredictor()
     
-    # 1. GPS verilerini yükle
-    gps_data = predictor.load_and_analyze_gps_data()
-    
-    # 2. Özellikleri çıkar
-    featured_data = predictor.extract_features(gps_data)
+    if len(sys.argv) > 2 and sys.argv[1] == 'incremental':
+        # Yalnızca yeni gün: kayıtlı kümelere ekle ve veritabanını güncelle
+        clustered_locations, _ = predictor.update_locations_incremental(sys.argv[2])
+        predictor.update_database_with_predictions(clustered_locations)
+        return
     
-    # 3. Konteyner noktalarını belirle (ML skorlama)
-    container_stops = predictor.identify_container_stops(featured_data)
+    # 1-3. GPS verilerini oku, kayıtları skorla ve araç izlerinden durak segmentleri çıkar
+    container_stops = predictor.segment_container_stops()
     
-    # 4. Konumları kümeleme
+    # 4. Konumları kümeleme (artımlı güncellemeler bu kümelerden devam eder)
     clustered_locations = predictor.cluster_container_locations(container_stops)
+    IncrementalStopClusters.from_frame(clustered_locations).save()
     
     # 5. Database'i güncelle
     predictor.update_database_with_predictions(clustered_locations)
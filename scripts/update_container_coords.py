@@ -2,34 +2,29 @@
 Konteyner Koordinatlarını Gerçek GPS Verilerinden Güncelle
 """
 
+import os
+import sys
 import pandas as pd
 import sqlite3
 import numpy as np
 from sklearn.cluster import DBSCAN
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gps_cache import load_gps_frame
+from gps_features import duration_minutes
+
 def extract_real_container_locations():
     """GPS verilerinden gerçek konteyner konumlarını çıkar"""
     print("\n🗺️ Gerçek GPS verilerinden konteyner konumları çıkarılıyor...")
     
     # GPS verilerini yükle
     print("   📊 GPS verileri yükleniyor...")
-    gps_data = pd.read_csv('data/all_merged_data.csv')
+    gps_data = load_gps_frame('data/all_merged_data.csv',
+                              columns=['Duraklama Süresi', 'Mahalle', 'Enlem', 'Boylam'])
     print(f"   ✓ {len(gps_data):,} GPS kaydı yüklendi")
     
-    # Duraklama süresini parse et
-    def parse_duration(duration_str):
-        try:
-            if pd.isna(duration_str) or duration_str == '00:00:00':
-                return 0
-            parts = str(duration_str).split(':')
-            hours = int(parts[0])
-            minutes = int(parts[1])
-            seconds = int(parts[2])
-            return hours * 60 + minutes + seconds / 60
-        except:
-            return 0
-    
-    gps_data['duration_minutes'] = gps_data['Duraklama Süresi'].apply(parse_duration)
+    # Duraklama süresi (önbellekte dakikaya çevrilmiş; ham metin de çözülür)
+    gps_data['duration_minutes'] = duration_minutes(gps_data['Duraklama Süresi'])
     
     # 5 dakikadan uzun duraklamalar (muhtemel konteyner noktaları)
     stops = gps_data[gps_data['duration_minutes'] > 5].copy()
@@ -0,0 +1,269 @@
+"""
+NİLÜFER BELEDİYESİ - DURAK KÜMELEME
+GPS aday duraklarını mahalle bazında DBSCAN ile konteyner konumlarına
+kümeleyen motor:
+
+    - Noktalar bir kez gruplanır (groupby indeksleri; mahalle başına filtre yok)
+    - Mesafe haversine (BallTree), eps metre cinsinden: derece cinsinden eps
+      Bursa enleminde doğu-batı yönünde kuzey-güneye göre ~%25 daha kısadır
+    - Mahalleler süreç havuzunda paralel kümelenir (büyükten küçüğe)
+    - Artımlı mod: küme durumu saklanır, yeni günler mevcut merkezlere atanır
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import DBSCAN
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_M = 6371000.0
+EPS_METERS = 50.0        # Aynı konteynerin farklı ziyaretleri bu yarıçap içinde
+MIN_SAMPLES = 2
+INLINE_POINTS = 5000     # Toplam nokta bunun altındaysa havuz açılmaz
+
+
+def meters_to_radians(meters):
+    """Yer yüzeyinde metre -> haversine metriğinin kullandığı radyan"""
+    return meters / EARTH_RADIUS_M
+
+
+def label_points(lat, lon, eps_meters=EPS_METERS, min_samples=MIN_SAMPLES):
+    """
+    Tek grubun noktalarını kümele
+
+    Parametreler:
+        lat, lon: Derece cinsinden koordinat dizileri
+
+    Döndürür:
+        Küme etiketleri (0..k-1, gürültü = -1). min_samples'tan az nokta
+        varsa her nokta kendi kümesidir (mahalledeki tek kanıt atılmaz).
+    """
+    n_points = len(lat)
+    if n_points < min_samples:
+        return np.arange(n_points)
+    coords = np.radians(np.column_stack([lat, lon]))
+    return DBSCAN(eps=meters_to_radians(eps_meters), min_samples=min_samples,
+                  metric='haversine', algorithm='ball_tree').fit(coords).labels_
+
+
+def _label_task(task):
+    lat, lon, eps_meters, min_samples = task
+    return label_points(lat, lon, eps_meters, min_samples)
+
+
+def cluster_stops(stops, group_column, lat_column, lon_column, eps_meters=EPS_METERS,
+                  min_samples=MIN_SAMPLES, n_jobs=None):
+    """
+    Tüm aday durakları grup (mahalle) bazında kümele
+
+    Parametreler:
+        stops: Aday duraklar (DataFrame)
+        n_jobs: Süreç sayısı (None = çekirdek sayısı, 1 = aynı süreçte)
+
+    Döndürür:
+        stops ile aynı indeksli küme etiketleri; etiketler gruplar arasında
+        benzersizdir, gürültü / grupsuz / koordinatsız noktalar -1
+    """
+    labels = np.full(len(stops), -1, dtype=np.int64)
+    valid = stops[lat_column].notna().to_numpy() & stops[lon_column].notna().to_numpy()
+    positions = np.flatnonzero(valid)
+    groups = pd.Series(positions).groupby(stops[group_column].to_numpy()[positions], sort=False).indices
+
+    # Büyük gruplar önce: havuzdaki son iş tek başına uzun sürmesin
+    members = sorted((positions[index] for index in groups.values()), key=len, reverse=True)
+    lat = stops[lat_column].to_numpy(dtype=np.float64)
+    lon = stops[lon_column].to_numpy(dtype=np.float64)
+    tasks = [(lat[rows], lon[rows], eps_meters, min_samples) for rows in members]
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(tasks) < 2 or len(positions) < INLINE_POINTS:
+        group_labels = [_label_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+            group_labels = list(pool.map(_label_task, tasks))
+
+    offset = 0
+    for rows, local in zip(members, group_labels):
+        clustered = local >= 0
+        labels[rows[clustered]] = local[clustered] + offset
+        offset += int(local.max()) + 1 if clustered.any() else 0
+    return pd.Series(labels, index=stops.index, name='cluster')
+
+
+CLUSTER_STATE_PATH = 'models/container_clusters.json'
+CLUSTER_STATE_FORMAT = 1
+MATCH_NEIGHBORS = 4      # Farklı mahalledeki yakın kümeleri atlamak için sorgulanan merkez sayısı
+PENDING_UPDATES = 14     # Eşleşmeyen seyrek noktalar bu kadar güncelleme bekler
+
+CLUSTER_COLUMNS = ('mahalle', 'latitude', 'longitude', 'visit_count', 'avg_duration', 'avg_score')
+PENDING_COLUMNS = ('mahalle', 'latitude', 'longitude', 'duration', 'score', 'update')
+
+
+class IncrementalStopClusters:
+    """
+    Yeni GPS günleriyle güncellenen konteyner konum kümeleri
+
+    Her küme için merkez, ziyaret sayısı ve süre/skor ortalamaları tutulur.
+    Yeni noktalar, aynı mahalledeki eps yarıçapı içindeki en yakın merkeze
+    (BallTree) atanır ve ortalamalar güncellenir. Eşleşmeyen noktalar, önceki
+    güncellemelerden bekleyen seyrek noktalarla birlikte DBSCAN'e girer; yalnızca
+    yoğun olanlar yeni küme açar. Maliyet yeni satır + bekleyen nokta sayısıyla
+    orantılıdır, geçmişin tamamıyla değil.
+    """
+
+    def __init__(self, eps_meters=EPS_METERS, min_samples=MIN_SAMPLES,
+                 group_column='Mahalle', lat_column='Enlem', lon_column='Boylam',
+                 duration_column='duraklama_dakika', score_column='container_score'):
+        self.eps_meters = eps_meters
+        self.min_samples = min_samples
+        self.group_column = group_column
+        self.lat_column = lat_column
+        self.lon_column = lon_column
+        self.duration_column = duration_column
+        self.score_column = score_column
+        self.updates = 0
+        self.clusters = pd.DataFrame({name: pd.Series(dtype=object if name == 'mahalle' else float)
+                                      for name in CLUSTER_COLUMNS})
+        self.pending = pd.DataFrame({name: pd.Series(dtype=object if name == 'mahalle' else float)
+                                     for name in PENDING_COLUMNS})
+        self._tree = None
+
+    @classmethod
+    def load(cls, state_path=CLUSTER_STATE_PATH, **kwargs):
+        """Kaydedilmiş durumu yükle (yoksa boş durum)"""
+        state = cls(**kwargs)
+        if os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('format') == CLUSTER_STATE_FORMAT:
+                state.eps_meters = saved['eps_meters']
+                state.updates = saved['updates']
+                state.clusters = pd.DataFrame(saved['clusters'], columns=list(CLUSTER_COLUMNS))
+                state.pending = pd.DataFrame(saved['pending'], columns=list(PENDING_COLUMNS))
+        return state
+
+    @classmethod
+    def from_frame(cls, clusters, **kwargs):
+        """Toplu kümeleme çıktısından başlangıç durumu (artımlı güncellemeler buradan sürer)"""
+        state = cls(**kwargs)
+        state.clusters = clusters[list(CLUSTER_COLUMNS)].reset_index(drop=True)
+        return state
+
+    def save(self, state_path=CLUSTER_STATE_PATH):
+        """Durumu diske atomik olarak yaz"""
+        payload = {
+            'format': CLUSTER_STATE_FORMAT,
+            'eps_meters': self.eps_meters,
+            'updates': self.updates,
+            'saved_at': datetime.now().isoformat(),
+            'clusters': self.clusters.to_dict('list'),
+            'pending': self.pending.to_dict('list')
+        }
+        os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+        tmp_path = state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, state_path)
+
+    def _points(self, stops):
+        """Aday duraklardan (mahalle, koordinat, süre, skor) tablosu"""
+        if stops.empty:
+            return self.pending.iloc[:0].copy()
+        points = pd.DataFrame({
+            'mahalle': stops[self.group_column].to_numpy(dtype=object),
+            'latitude': stops[self.lat_column].to_numpy(dtype=np.float64),
+            'longitude': stops[self.lon_column].to_numpy(dtype=np.float64),
+            'duration': stops[self.duration_column].to_numpy(dtype=np.float64),
+            'score': stops[self.score_column].to_numpy(dtype=np.float64),
+            'update': self.updates
+        })
+        return points.dropna(subset=['mahalle', 'latitude', 'longitude'])
+
+    def match(self, mahalle, lat, lon):
+        """Her nokta için aynı mahallede eps içindeki en yakın küme (yoksa -1)"""
+        n_clusters = len(self.clusters)
+        if n_clusters == 0 or len(lat) == 0:
+            return np.full(len(lat), -1)
+        if self._tree is None:
+            self._tree = BallTree(np.radians(self.clusters[['latitude', 'longitude']].to_numpy(dtype=np.float64)),
+                                  metric='haversine')
+        distances, nearest = self._tree.query(np.radians(np.column_stack([lat, lon])),
+                                              k=min(MATCH_NEIGHBORS, n_clusters))
+
+        names = pd.Index(self.clusters['mahalle'].unique())
+        cluster_codes = names.get_indexer(self.clusters['mahalle'])
+        point_codes = names.get_indexer(pd.Index(mahalle))
+        same = (cluster_codes[nearest] == point_codes[:, None]) & (distances <= meters_to_radians(self.eps_meters))
+        first = same.argmax(axis=1)
+        return np.where(same.any(axis=1), nearest[np.arange(len(lat)), first], -1)
+
+    def _accumulate(self, cluster_ids, points):
+        """Eşleşen noktaları küme ortalamalarına ekle (bincount; satır döngüsü yok)"""
+        n_clusters = len(self.clusters)
+        added = np.bincount(cluster_ids, minlength=n_clusters)
+        counts = self.clusters['visit_count'].to_numpy(dtype=np.float64)
+        total = counts + added
+        touched = added > 0
+        for column, source in (('latitude', 'latitude'), ('longitude', 'longitude'),
+                               ('avg_duration', 'duration'), ('avg_score', 'score')):
+            sums = np.bincount(cluster_ids, weights=points[source].to_numpy(), minlength=n_clusters)
+            means = self.clusters[column].to_numpy(dtype=np.float64).copy()
+            means[touched] = (means[touched] * counts[touched] + sums[touched]) / total[touched]
+            self.clusters[column] = means
+        self.clusters['visit_count'] = total.astype(np.int64)
+        # Merkezler kaydı: sonraki eşleştirmeler ağacı güncel merkezlerle yeniden kurar
+        self._tree = None
+
+    def update(self, stops, n_jobs=None):
+        """
+        Yeni günün aday duraklarını ekle
+
+        Döndürür:
+            {'rows', 'matched', 'new_clusters', 'pending', 'clusters'}
+        """
+        self.updates += 1
+        points = self._points(stops)
+        cluster_ids = self.match(points['mahalle'].to_numpy(), points['latitude'].to_numpy(),
+                                 points['longitude'].to_numpy())
+        matched = cluster_ids >= 0
+        if matched.any():
+            self._accumulate(cluster_ids[matched], points[matched])
+
+        # Eşleşmeyenler + süresi dolmamış bekleyenler: yalnızca yoğun olanlar küme açar
+        pending = self.pending[self.pending['update'] > self.updates - PENDING_UPDATES]
+        candidates = pd.concat([pending, points[~matched]], ignore_index=True)
+        labels = cluster_stops(candidates, 'mahalle', 'latitude', 'longitude',
+                               eps_meters=self.eps_meters, min_samples=self.min_samples, n_jobs=n_jobs)
+        # label_points tek noktalı mahalleyi küme sayar; artımlı modda yeni küme için yoğunluk şart
+        group_sizes = candidates.groupby('mahalle')['mahalle'].transform('size')
+        labels[group_sizes < self.min_samples] = -1
+
+        dense = labels >= 0
+        new_clusters = candidates[dense].groupby(labels[dense]).agg(
+            mahalle=('mahalle', 'first'),
+            latitude=('latitude', 'mean'),
+            longitude=('longitude', 'mean'),
+            visit_count=('latitude', 'size'),
+            avg_duration=('duration', 'mean'),
+            avg_score=('score', 'mean')
+        )
+        if len(new_clusters):
+            self.clusters = pd.concat([self.clusters, new_clusters], ignore_index=True)
+            self._tree = None
+        self.pending = candidates[~dense].reset_index(drop=True)
+
+        return {
+            'rows': len(points),
+            'matched': int(matched.sum()),
+            'new_clusters': len(new_clusters),
+            'pending': len(self.pending),
+            'clusters': len(self.clusters)
+        }
+
+    def to_frame(self):
+        """cluster_container_locations ile aynı kolonlar"""
+        return self.clusters.astype({'visit_count': np.int64})
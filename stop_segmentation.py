@@ -0,0 +1,150 @@
+"""
+NİLÜFER BELEDİYESİ - ARAÇ BAZLI DURAK SEGMENTASYONU
+GPS kayıtlarını araç ve zamana göre bir kez sıralar; her aracın izinde
+ardışık "duran" kayıtları (hız ~0 ve konum değişimi küçük) run-length
+kodlamasıyla tek durak kaydına indirger.
+
+Her durak için başlangıç, bitiş, gerçek bekleme süresi ve merkez üretilir;
+kümelemeye satırlar yerine duraklar gider.
+
+iter_segment_stops dosyayı parça parça işler: her aracın son (henüz
+bitmemiş olabilecek) koşusu bir sonraki parçaya taşınır, bellek parça +
+araç başına bir koşu ile sınırlı kalır.
+"""
+
+import numpy as np
+import pandas as pd
+
+from gps_features import parse_gps_times
+from stop_clustering import EARTH_RADIUS_M
+
+STOP_SPEED_KMH = 3.0        # Bu hızın altı "duruyor"
+STOP_RADIUS_METERS = 30.0   # Ardışık iki kayıt arası bu mesafeden az = aynı yerde
+MAX_GAP_MINUTES = 15.0      # Daha uzun kayıt boşluğu durağı böler (veri kesintisi)
+MIN_DWELL_MINUTES = 1.0     # Daha kısa duraklamalar (ışık, trafik) atılır
+
+
+def step_distances(lat, lon):
+    """Ardışık kayıtlar arası haversine mesafe (metre); ilk kayıt 0"""
+    if len(lat) == 0:
+        return np.zeros(0)
+    lat, lon = np.radians(lat), np.radians(lon)
+    d_lat, d_lon = np.diff(lat), np.diff(lon)
+    a = np.sin(d_lat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(d_lon / 2) ** 2
+    return np.concatenate([[0.0], 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))])
+
+
+def run_starts(*keys):
+    """Herhangi bir anahtarın değiştiği konumlar (RLE başlangıçları; ilk satır dahil)"""
+    n_rows = len(keys[0])
+    changed = np.zeros(n_rows, dtype=bool)
+    if n_rows:
+        changed[0] = True
+    for key in keys:
+        changed[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(changed)
+
+
+def _reduce(ufunc, values, starts):
+    """ufunc.reduceat; boş segment listesinde boş dizi"""
+    return ufunc.reduceat(values, starts) if len(starts) else np.array([], dtype=values.dtype)
+
+
+def segment_stops(gps, vehicle_column='Plaka', time_column='Tarih', speed_column='Hız(km/sa)',
+                  lat_column='Enlem', lon_column='Boylam', duration_column=None,
+                  first_columns=(), max_columns=(), stop_speed=STOP_SPEED_KMH,
+                  stop_radius=STOP_RADIUS_METERS, max_gap=MAX_GAP_MINUTES,
+                  min_dwell=MIN_DWELL_MINUTES, hold_last_run=False):
+    """
+    Araç izlerinden durak segmentleri çıkar (satır döngüsü yok)
+
+    Parametreler:
+        gps: GPS kayıtları (araç, zaman, hız, koordinat kolonları)
+        duration_column: Cihazın raporladığı duraklama süresi (dakika); tek
+            kayıtlık duraklarda bekleme süresi buradan gelir
+        first_columns: Durağın ilk kaydından taşınacak kolonlar (ör. mahalle)
+        max_columns: Durak boyunca en büyük değeri alınacak kolonlar (ör. skor)
+        hold_last_run: Her aracın son koşusu segmentlere katılmaz, satırları
+            ayrıca döndürülür (parçalı işlemede bir sonraki parçaya taşınır)
+
+    Döndürür:
+        Durak başına bir satır: araç, start, end, dwell_minutes, points,
+        koordinat kolonlarında merkez, first_columns ve max_columns
+        (hold_last_run=True ise (segmentler, taşınan satırlar))
+    """
+    times = parse_gps_times(gps[time_column])
+    valid = (gps[vehicle_column].notna().to_numpy() & ~np.isnat(times)
+             & gps[lat_column].notna().to_numpy() & gps[lon_column].notna().to_numpy())
+    rows = np.flatnonzero(valid)
+
+    # Araç + zaman sırası (tek sıralama; eşit zamanda dosya sırası korunur)
+    vehicle = pd.factorize(gps[vehicle_column].to_numpy()[rows])[0]
+    minutes = times[rows].astype('datetime64[s]').astype(np.int64) / 60.0
+    sort = np.lexsort((minutes, vehicle))
+    order, vehicle, minutes = rows[sort], vehicle[sort], minutes[sort]
+    lat = gps[lat_column].to_numpy(dtype=np.float64)[order]
+    lon = gps[lon_column].to_numpy(dtype=np.float64)[order]
+    speed = pd.to_numeric(gps[speed_column], errors='coerce').to_numpy(dtype=np.float64)[order]
+
+    # Segment sınırı: yeni araç, uzun kayıt boşluğu ya da yer değişimi
+    new_vehicle = np.concatenate([[True], vehicle[1:] != vehicle[:-1]])
+    moved = ~new_vehicle & (step_distances(lat, lon) > stop_radius)
+    gap = ~new_vehicle & (np.diff(minutes, prepend=minutes[:1]) > max_gap)
+    stationary = np.nan_to_num(speed) <= stop_speed
+
+    # RLE: duruş durumu ya da sınırda yeni koşu; yalnızca duran koşular durak
+    runs = run_starts(stationary, np.cumsum(new_vehicle | moved | gap))
+    ends = np.append(runs[1:], len(order))[:len(runs)]
+
+    # Bekleme: ilk-son kayıt arası süre; tek kayıtlık duraklarda cihazın raporladığı süre
+    dwell = minutes[ends - 1] - minutes[runs]
+    if duration_column is not None:
+        reported = np.nan_to_num(gps[duration_column].to_numpy(dtype=np.float64)[order])
+        dwell = np.maximum(dwell, _reduce(np.maximum, reported, runs))
+    keep = stationary[runs] & (dwell >= min_dwell)
+    if hold_last_run:
+        # Aracın parçadaki son koşusu sonraki parçada sürebilir: satırları taşınır
+        last_run = np.append(new_vehicle[runs[1:]], True) if len(runs) else np.zeros(0, dtype=bool)
+        keep &= ~last_run
+        carry = gps.iloc[np.sort(order[np.repeat(last_run, ends - runs)])]
+    starts, ends = runs[keep], ends[keep]
+    points = ends - starts
+
+    segments = pd.DataFrame({
+        vehicle_column: gps[vehicle_column].to_numpy()[order[starts]],
+        'start': times[order[starts]],
+        'end': times[order[ends - 1]],
+        'dwell_minutes': dwell[keep],
+        'points': points,
+        lat_column: _reduce(np.add, lat, runs)[keep] / points,
+        lon_column: _reduce(np.add, lon, runs)[keep] / points
+    })
+    for column in first_columns:
+        segments[column] = gps[column].to_numpy()[order[starts]]
+    for column in max_columns:
+        segments[column] = _reduce(np.maximum, gps[column].to_numpy(dtype=np.float64)[order], runs)[keep]
+    if hold_last_run:
+        return segments, carry
+    return segments
+
+
+def iter_segment_stops(chunks, **kwargs):
+    """
+    Parça parça gelen GPS kayıtlarından durak segmentleri (sınırlı bellek)
+
+    Her parçada araçların son koşusu tutulur ve bir sonraki parçanın başına
+    eklenir; böylece parça sınırına denk gelen durak bölünmez. Bir aracın
+    kayıtları parçalar boyunca zaman sırasıyla gelmelidir (dosya araç ya da
+    zaman sıralı); daha önce kapanmış bir durağın öncesine düşen geç kayıt
+    ayrı durak olarak sayılır. Parametreler segment_stops ile aynıdır.
+
+    Üretir:
+        Her parça için kapanan duraklar; sonda taşınan koşuların durakları
+    """
+    carry = None
+    for chunk in chunks:
+        gps = chunk if carry is None or carry.empty else pd.concat([carry, chunk], ignore_index=True)
+        segments, carry = segment_stops(gps, hold_last_run=True, **kwargs)
+        yield segments
+    if carry is not None and not carry.empty:
+        yield segment_stops(carry, **kwargs)
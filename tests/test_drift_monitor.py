@@ -0,0 +1,117 @@
+"""
+Tahmin Kayma İzleyici Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from drift_monitor import DriftMonitor, population_stability_index
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_psi_zero_for_same_distribution_and_large_for_shift():
+    """Aynı dağılımda PSI ~0, kaymış dağılımda eşik üstü mü?"""
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=(5000, 2))
+    monitor = DriftMonitor(['a', 'b'], min_observations=10)
+    monitor.set_reference(reference)
+
+    monitor.observe(rng.normal(size=(2000, 2)), source='population')
+    psi = monitor.psi()
+    assert psi['a'] < 0.02 and psi['b'] < 0.02
+    assert monitor.drift_reasons() == []
+
+    # Tek konteynere yığılan istek trafiği karar vermez, yalnızca raporlanır
+    monitor.observe(np.zeros((500, 2)), source='served')
+    assert monitor.psi('served')['a'] > monitor.psi_threshold
+    assert monitor.drift_reasons() == []
+
+    shifted = rng.normal(size=(2000, 2))
+    shifted[:, 1] += 1.5
+    monitor.observe(shifted, source='population')
+    psi = monitor.psi()
+    assert psi['a'] < 0.02
+    assert psi['b'] > monitor.psi_threshold
+    assert monitor.drift_reasons()[0].startswith('psi:b=')
+    assert population_stability_index([10, 10], [10, 10]) == 0.0
+
+
+def test_mae_windows_expire_and_drift_triggers_once_per_cooldown():
+    """Hata kovaları süresi dolunca düşüyor, tetikleme bekleme süresine uyuyor mu?"""
+    clock = FakeClock()
+    triggered = []
+    monitor = DriftMonitor(['a'], window_seconds=60, n_windows=2, mae_threshold=0.3,
+                           min_observations=5, cooldown_seconds=600,
+                           on_drift=triggered.append, clock=clock)
+    monitor.set_reference(np.arange(100, dtype=float).reshape(-1, 1))
+
+    for _ in range(5):
+        monitor.record_outcome(0.9, 1.0)
+    assert abs(monitor.report()['recent']['mae'] - 0.1) < 1e-9
+    assert triggered == []
+
+    clock.now = 60
+    for _ in range(10):
+        monitor.record_outcome(0.9, 0.0)
+    assert len(triggered) == 1 and triggered[0][0].startswith('mae=')
+
+    # Bekleme süresi içinde ikinci tetikleme yok
+    monitor.record_outcome(0.9, 0.0)
+    assert len(triggered) == 1
+
+    # İki kova sonra eski hatalar halkadan düşer; ömür boyu toplam korunur
+    clock.now = 180
+    monitor.record_outcome(0.0, 0.0)
+    report = monitor.report()
+    assert report['recent']['outcomes'] == 1
+    assert report['lifetime']['outcomes'] == 17
+    assert report['drift']['trigger_count'] == 1
+
+
+def test_calendar_rollover_does_not_trigger_drift():
+    """Statik özellikler aynıyken gün / hafta dönümü kayma sayılmıyor mu?"""
+    from feature_store import CLASSIFIER_FEATURES
+
+    rng = np.random.default_rng(1)
+    n = 400
+    static = rng.normal(size=(n, len(CLASSIFIER_FEATURES)))
+
+    def matrix(day_of_week, hours_since):
+        X = static.copy()
+        columns = {name: j for j, name in enumerate(CLASSIFIER_FEATURES)}
+        X[:, columns['hours_since']] = hours_since
+        X[:, columns['days_since']] = hours_since / 24
+        X[:, columns['day_of_week']] = day_of_week
+        X[:, columns['is_weekend']] = float(day_of_week >= 5)
+        X[:, columns['month']] = 1 + day_of_week // 6
+        X[:, columns['season']] = 0
+        return X
+
+    triggered = []
+    monitor = DriftMonitor(min_observations=10, on_drift=triggered.append)
+    # Pazar 20:00 referansı; izleme Pazartesi ve 48 saat toplamasız
+    monitor.set_reference(matrix(6, rng.uniform(0, 24, n)), feature_names=CLASSIFIER_FEATURES)
+    monitor.observe(matrix(0, rng.uniform(48, 72, n)), source='population')
+
+    assert 'day_of_week' not in monitor.psi() and 'hours_since' not in monitor.psi()
+    assert 'capacity' in monitor.psi()
+    assert monitor.drift_reasons() == [] and triggered == []
+    assert 'is_weekend' in monitor.report()['psi_excluded_features']
+
+    # Statik bir özellik kayarsa yine tetiklenir
+    shifted = matrix(0, 30.0)
+    shifted[:, CLASSIFIER_FEATURES.index('capacity')] += 3
+    monitor.observe(shifted, source='population')
+    assert triggered and triggered[0][0].startswith('psi:capacity=')
@@ -0,0 +1,107 @@
+"""
+Özellik Deposu Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from feature_store import (
+    CLASSIFIER_FEATURES, REGRESSOR_FEATURES, FeatureStore,
+    classifier_features, load_static_features, regressor_features, rotation_day_map
+)
+
+DB_PATH = 'nilufer_waste.db'
+
+
+@pytest.fixture
+def db_copy(tmp_path):
+    """Testlerin gerçek veritabanını değiştirmemesi için kopya"""
+    path = tmp_path / 'nilufer_waste.db'
+    shutil.copy(DB_PATH, path)
+    return str(path)
+
+
+def test_matrices_match_feature_lists():
+    """Özellik matrisleri tanımlı kolon sayısında ve eksiksiz mi?"""
+    conn = sqlite3.connect(DB_PATH)
+    static = load_static_features(conn)
+    conn.close()
+
+    X_clf = classifier_features(static)
+    X_reg = regressor_features(static)
+    assert X_clf.shape == (len(static), len(CLASSIFIER_FEATURES))
+    assert X_reg.shape == (len(static), len(REGRESSOR_FEATURES))
+    assert not np.isnan(X_clf).any() and not np.isnan(X_reg).any()
+
+
+def test_historical_aggregates_are_used():
+    """Toplama geçmişi olan konteynerde sabit yer tutucular yerine gerçek değerler var mı?"""
+    conn = sqlite3.connect(DB_PATH)
+    cid, count, avg_fill = conn.execute("""
+        SELECT container_id, COUNT(*), AVG(fill_level_before)
+        FROM collection_events GROUP BY container_id ORDER BY container_id LIMIT 1
+    """).fetchone()
+    static = load_static_features(conn, [cid])
+    conn.close()
+
+    X = classifier_features(static)
+    assert X[0, CLASSIFIER_FEATURES.index('collection_count')] == count
+    assert X[0, CLASSIFIER_FEATURES.index('avg_fill')] == pytest.approx(avg_fill)
+
+
+def test_cache_invalidation_per_container(db_copy):
+    """Önbellek yalnızca geçersiz kılınan konteyner için yeniden okunuyor mu?"""
+    store = FeatureStore(db_copy)
+    static = store.static_frame()
+    cid = int(static.index[0])
+    before = float(static.loc[cid, 'current_fill_level'])
+
+    conn = sqlite3.connect(db_copy)
+    conn.execute("UPDATE containers SET current_fill_level = ? WHERE container_id = ?",
+                 (1 - before, cid))
+    conn.commit()
+    conn.close()
+
+    assert store.static_frame([cid]).loc[cid, 'current_fill_level'] == before
+
+    store.invalidate(cid)
+    misses = store.misses
+    assert store.static_frame([cid]).loc[cid, 'current_fill_level'] == pytest.approx(1 - before)
+    assert store.misses == misses + 1
+    assert len(store.static_frame()) == len(static)
+
+
+def test_time_features_do_not_reload(db_copy):
+    """Zaman özellikleri önbellekteki statik veriyle istek anında hesaplanıyor mu?"""
+    store = FeatureStore(db_copy)
+    now = datetime(2026, 1, 5, 12, 0)
+    _, X1 = store.classifier_matrix(now=now)
+    misses = store.misses
+
+    _, X2 = store.classifier_matrix(now=now + timedelta(hours=24))
+    assert store.misses == misses
+    assert np.allclose(X2[:, 0] - X1[:, 0], 24)
+    assert np.array_equal(X1[:, 6:], X2[:, 6:])
+
+
+def test_rotation_day_map_matches_legacy_rules():
+    """Rotasyon eşlemesi eski iterrows döngüsüyle aynı kuralları uyguluyor mu?"""
+    rotations = pd.DataFrame({
+        'MAHALLE': [' 19 Mayıs Mahallesi', 'ATAEVLER MAHALLESİ', 'ATAEVLER MAHALLESİ', 'X'],
+        'DAYS_PER_WEEK': ['3', '6', '7', None]
+    })
+    days = rotation_day_map(rotations, 'MAHALLE', 'DAYS_PER_WEEK')
+
+    assert days['19 MAYIS MAHALLESI'] == 3
+    assert days['ATAEVLER MAHALLESİ'] == 7  # Son satır geçerli
+    assert days['X'] == 3  # Eksik değer -> varsayılan
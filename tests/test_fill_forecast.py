@@ -0,0 +1,125 @@
+"""
+Dolum Hızı Tahmini Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fill_forecast import (
+    build_forecast, collection_intervals, days_to_threshold, elapsed_effective_days,
+    estimate_fill_rates, fit_weekday_factors, weekday_counts
+)
+from feature_store import parse_collection_dates
+
+
+def _events(container_id, neighborhood_id, dates, fills):
+    return pd.DataFrame({
+        'container_id': container_id,
+        'neighborhood_id': neighborhood_id,
+        'collection_date': dates,
+        'fill_level_before': fills
+    })
+
+
+def test_intervals_and_weekday_counts():
+    """Aralıklar bir önceki toplamanın ertesi günü başlıyor mu?"""
+    events = _events(1, 1, ['2025-12-01', '2025-12-04T09:30:00', '2025-12-04', '2025-12-15'], [0.9, 0.3, 0.3, 0.8])
+    intervals = collection_intervals(events)
+
+    # 1 Aralık pazartesi -> ilk aralık salı başlar, 3 gün
+    assert intervals['n_days'].tolist() == [3, 11]
+    assert intervals['start_dow'].tolist() == [1, 4]
+    assert weekday_counts([1], [3]).tolist() == [[0, 1, 1, 1, 0, 0, 0]]
+    assert weekday_counts([4], [11]).sum() == 11
+
+
+def test_days_to_threshold_matches_day_by_day():
+    """Kapalı form, günlük simülasyonla aynı sonucu veriyor mu?"""
+    factors = np.array([1.2, 0.8, 1.0, 1.0, 1.1, 0.4, 1.5])
+    factors = factors / factors.mean()
+    current = np.array([0.0, 0.5, 0.74, 0.9, 0.1])
+    rates = np.array([0.05, 0.1, 0.2, 0.1, 0.003])
+
+    days = days_to_threshold(current, rates, factors, start_dow=3)
+
+    for fill, rate, expected in zip(current, rates, days):
+        elapsed, day = 0.0, 3
+        while fill + 1e-12 < 0.75:
+            step = rate * factors[day % 7]
+            if fill + step >= 0.75:
+                elapsed += (0.75 - fill) / step
+                break
+            fill, elapsed, day = fill + step, elapsed + 1, day + 1
+        assert np.isclose(expected, elapsed)
+
+
+def test_seasonality_and_pooling():
+    """Gün çarpanları öğreniliyor ve geçmişsiz konteyner mahalle hızını alıyor mu?"""
+    true_factors = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 0.5, 1.5])
+    dates = pd.date_range('2025-09-01', periods=120, freq='D')
+    rng = np.random.default_rng(0)
+
+    frames = []
+    for cid, rate in [(1, 0.05), (2, 0.10)]:
+        picked = dates[np.sort(rng.choice(len(dates), 40, replace=False))]
+        gaps = np.diff(picked).astype('timedelta64[D]').astype(int)
+        starts = (picked[:-1].dayofweek + 1) % 7
+        fills = rate * (weekday_counts(starts, gaps) @ true_factors)
+        frames.append(_events(cid, 1, picked[1:].strftime('%Y-%m-%d'), fills))
+
+    intervals = collection_intervals(pd.concat(frames, ignore_index=True))
+    factors = fit_weekday_factors(weekday_counts(intervals['start_dow'], intervals['n_days']),
+                                  intervals['fill'], intervals['container_id'], ridge=1.0)
+    assert np.allclose(factors, true_factors, atol=0.05)
+
+    containers = pd.DataFrame({'container_id': [1, 2, 3, 4], 'neighborhood_id': [1, 1, 1, 9]})
+    rates = estimate_fill_rates(intervals, containers, factors)
+
+    assert rates.loc[1, 'daily_rate'] < rates.loc[2, 'daily_rate']
+    assert np.isclose(rates.loc[2, 'daily_rate'], 0.10, atol=0.01)
+    assert rates['rate_source'].tolist() == ['container', 'container', 'neighborhood', 'global']
+    assert 0.05 < rates.loc[3, 'daily_rate'] < 0.10
+
+
+def test_forecast_projects_stale_levels_to_now():
+    """current_fill_level son toplamadaki seviye: bayat konteyner eşiği çoktan geçmiş sayılıyor mu?"""
+    conn = sqlite3.connect(':memory:')
+    conn.executescript("""
+        CREATE TABLE containers (container_id INTEGER, neighborhood_id INTEGER, current_fill_level REAL,
+                                 last_collection_date TEXT, status TEXT);
+        CREATE TABLE collection_events (container_id INTEGER, collection_date TEXT, fill_level_before REAL);
+    """)
+    conn.executemany("INSERT INTO containers VALUES (?, ?, ?, ?, 'active')", [
+        (1, 1, 0.2, '2025-12-17T06:00:00'),   # 11 gün önce toplanmış
+        (2, 1, 0.2, '2025-12-28'),            # Bugün toplanmış
+        (3, 1, 0.2, None),                    # Tarih yok: projeksiyon yapılmaz
+    ])
+    # Her iki günde bir toplama, %20 dolum -> günlük ~%10
+    dates = pd.date_range('2025-10-01', '2025-12-15', freq='2D').strftime('%Y-%m-%d')
+    conn.executemany("INSERT INTO collection_events VALUES (?, ?, ?)",
+                     [(cid, d, 0.2) for cid in (1, 2, 3) for d in dates])
+
+    now = pd.Timestamp('2025-12-28 12:00')
+    forecast, factors = build_forecast(conn, now=now)
+    conn.close()
+    forecast = forecast.set_index('container_id')
+
+    elapsed = elapsed_effective_days(parse_collection_dates(pd.Series(['2025-12-17T06:00:00', '2025-12-28', None])),
+                                     now, factors)
+    # 18..27 Aralık tam günler + bugünün yarısı
+    days = pd.date_range('2025-12-18', '2025-12-27').dayofweek
+    assert np.isclose(elapsed[0], factors[days].sum() + 0.5 * factors[now.dayofweek])
+    assert elapsed[1] == 0 and elapsed[2] == 0
+
+    assert forecast.loc[1, 'projected_fill_level'] == 1.0
+    assert forecast.loc[1, 'days_to_threshold'] == 0
+    assert forecast.loc[2, 'projected_fill_level'] == 0.2
+    assert forecast.loc[2, 'days_to_threshold'] > 4
+    assert forecast.loc[3, 'days_to_threshold'] == forecast.loc[2, 'days_to_threshold']
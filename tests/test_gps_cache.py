@@ -0,0 +1,69 @@
+"""
+GPS Kolon Önbelleği Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gps_cache
+from gps_features import duration_minutes
+
+
+def write_csv(path, n_rows=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        '#': np.arange(n_rows),
+        'Plaka': rng.choice(['16 ABC 01', '16 ABC 02'], n_rows),
+        'Tarih': pd.Timestamp('2025-12-01 08:00') + pd.to_timedelta(rng.integers(0, 86400, n_rows), unit='s'),
+        'Duraklama Süresi': rng.choice(['00:00:00', '00:07:30', '01:02:03', 'bozuk'], n_rows),
+        'Hız(km/sa)': rng.choice([0, 12, 35], n_rows),
+        'Açıklama': rng.choice(['Duran', 'Hareketli', 'Rölanti Alarmı'], n_rows),
+        'Mahalle': rng.choice(['GÖRÜKLE MH.', 'ÖZLÜCE MH.', None], n_rows),
+        'Enlem': 40.2 + rng.random(n_rows) * 0.05,
+        'Boylam': 28.9 + rng.random(n_rows) * 0.05
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_cache_round_trip_matches_csv(tmp_path):
+    """Önbellekten okunan kolonlar CSV'den çözülen değerlerle aynı mı?"""
+    path = str(tmp_path / 'gps.csv')
+    source = write_csv(path)
+
+    frame = gps_cache.load_gps_frame(path)
+    assert '#' not in frame.columns and len(frame) == len(source)
+    assert isinstance(frame['Mahalle'].dtype, pd.CategoricalDtype)
+    assert frame['Mahalle'].astype(object).where(frame['Mahalle'].notna(), None).tolist() == source['Mahalle'].tolist()
+    assert (frame['Açıklama'].astype(str) == source['Açıklama']).all()
+    assert np.allclose(frame['Duraklama Süresi'], duration_minutes(source['Duraklama Süresi']), equal_nan=True)
+    assert (frame['Tarih'] == source['Tarih']).all()
+    assert np.array_equal(frame['Enlem'], pd.read_csv(path)['Enlem'])
+
+    # Kolon izdüşümü ve satır aralığı
+    columns = gps_cache.open_gps_columns(path, ['Enlem', 'Plaka'])
+    part = columns.frame(100, 200)
+    assert list(part.columns) == ['Enlem', 'Plaka']
+    assert list(part.index) == list(range(100, 200))
+    assert sum(len(chunk) for chunk in columns.iter_frames(300)) == len(source)
+
+
+def test_cache_rebuilds_only_when_content_changes(tmp_path):
+    """Dokunulan dosyada yeniden üretim yok, içerik değişince var mı?"""
+    path = str(tmp_path / 'gps.csv')
+    write_csv(path)
+    built = gps_cache.ensure_gps_cache(path)
+
+    os.utime(path, (built['source_mtime'] + 100, built['source_mtime'] + 100))
+    assert gps_cache.cache_is_fresh(path)
+    assert gps_cache.ensure_gps_cache(path)['built_at'] == built['built_at']
+
+    write_csv(path, n_rows=500, seed=1)
+    assert not gps_cache.cache_is_fresh(path)
+    assert gps_cache.ensure_gps_cache(path)['rows'] == 500
@@ -0,0 +1,78 @@
+"""
+GPS Kayıt Özellikleri Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gps_features import EVENT_CATEGORIES, EventClassifier, duration_minutes, parse_gps_times
+
+
+def reference_minutes(value):
+    """Eski satır satır çözümleyici (bozuk değer = NaN)"""
+    try:
+        hours, minutes, seconds = (int(part) for part in str(value).split(':'))
+        return hours * 60 + minutes + seconds / 60
+    except ValueError:
+        return np.nan
+
+
+def test_matches_row_by_row_parser():
+    """Vektörel sonuç satır satır çözümlemeyle aynı mı?"""
+    rng = np.random.default_rng(0)
+    seconds = rng.integers(0, 100 * 3600, 5000)
+    values = pd.Series([f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in seconds], dtype=object)
+    values[::50] = '123:04:05'
+    values[7::50] = '1:2:3'
+
+    expected = values.map(reference_minutes).to_numpy()
+    assert np.allclose(duration_minutes(values), expected)
+    assert np.allclose(duration_minutes(values.to_numpy(dtype=str)), expected)
+
+
+def test_malformed_values_become_nan():
+    """Boş, bozuk ve Türkçe karakterli değerler NaN oluyor mu?"""
+    values = ['00:05:30', None, np.nan, '', 'bozuk', 'Çalışıyor', '00:0a:00', '00:05:30:00', 5, ' 00:01:00']
+    minutes = duration_minutes(values)
+
+    assert minutes[0] == 5.5 and minutes[-1] == 1.0
+    assert np.isnan(minutes[1:-1]).all()
+    assert len(duration_minutes([])) == 0
+
+
+def test_event_flags_match_keyword_scans():
+    """Farklı metin başına sınıflandırma, satır satır str.contains taramalarıyla aynı mı?"""
+    texts = ['Duran', 'Hareketli', 'Rölanti Alarmı', 'Kontak Kapandı', 'Hız İhlali',
+             'KIRMIZI IŞIK', 'Duraklama', 'Kaza Alarmı', None, np.nan, '', 5]
+    values = pd.Series(np.random.default_rng(0).choice(np.array(texts, dtype=object), 2000), dtype=object)
+    lowered = values.str.lower().fillna('')
+
+    classifier = EventClassifier()
+    for column in (values, values.astype('category')):
+        flags = classifier.flags(column)
+        assert list(flags) == [f'is_{name}' for name in EVENT_CATEGORIES]
+        for name, keywords in EVENT_CATEGORIES.items():
+            expected = lowered.str.contains('|'.join(keywords), na=False).astype(int).to_numpy()
+            assert (flags[f'is_{name}'] == expected).all()
+
+    # Yeni kategori: ek tarama yok, yalnızca yeni metinler sınıflandırılır
+    custom = EventClassifier({**EVENT_CATEGORIES, 'bosaltma': ('boşaltma',)})
+    assert list(custom.flags(['Boşaltma Tamam', 'Duran'])['is_bosaltma']) == [1, 0]
+
+
+def test_gps_times_use_explicit_formats():
+    """Gün önce biçim parça içinde/arasında tutarlı mı, bozuk değer NaT mı?"""
+    times = parse_gps_times(['05.01.2025 08:00:00', '13.01.2025 09:30:00', '2025-01-14 10:00:00',
+                             '15.01.2025 11:15', None, 'bozuk'])
+    expected = pd.to_datetime(['2025-01-05 08:00', '2025-01-13 09:30', '2025-01-14 10:00',
+                               '2025-01-15 11:15', None, None]).to_numpy()
+    assert np.array_equal(times[:4], expected[:4])
+    assert np.isnat(times[4:]).all()
+    # Tek başına gelen parça da aynı biçimle okunur (ilk değerden çıkarım yok)
+    assert parse_gps_times(pd.Series(['05.01.2025 08:00:00']))[0] == expected[0]
@@ -0,0 +1,86 @@
+"""
+Akan GPS Durak Tespiti Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from predict_container_locations import ContainerLocationPredictor, NEIGHBORHOOD_COLUMN
+
+
+def write_gps_csv(path, n_rows, seed=0):
+    """GPS dışa aktarımı biçiminde sentetik dosya (fazladan kolonlarla)"""
+    rng = np.random.default_rng(seed)
+    stop_seconds = rng.choice([0, 30, 240, 420, 900], n_rows)
+    idle_seconds = rng.choice([0, 60, 180], n_rows)
+    pd.DataFrame({
+        'Plaka': rng.choice(['16 ABC 01', '16 ABC 02'], n_rows),
+        'Tarih': '2025-12-01 08:00:00',
+        'Duraklama Süresi': [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in stop_seconds],
+        'Rölanti Süresi': [f"00:{s // 60:02d}:{s % 60:02d}" for s in idle_seconds],
+        'Hız(km/sa)': rng.choice([0, 0, 12, 35], n_rows),
+        'Açıklama': rng.choice(['Duran', 'Hareketli', 'Rölanti Alarmı', 'Hız İhlali', 'Kontak Kapandı'], n_rows),
+        'Mesafe(km)': rng.random(n_rows).round(3),
+        'Mahalle': rng.choice(['ALAADDİNBEY MH.', 'GÖRÜKLE MH.', 'ÖZLÜCE MH.', None], n_rows),
+        'Enlem': 40.2 + rng.random(n_rows) * 0.05,
+        'Boylam': 28.9 + rng.random(n_rows) * 0.05
+    }).to_csv(path, index=False)
+
+
+def test_streaming_matches_full_load(tmp_path):
+    """Parça parça sonuç, tüm dosyayı tek seferde işlemekle aynı mı?"""
+    path = tmp_path / 'gps.csv'
+    write_gps_csv(path, 3000)
+    predictor = ContainerLocationPredictor()
+
+    top_stops, summary = predictor.stream_container_stops(str(path), chunk_size=400, top_n=200)
+
+    full = predictor.extract_features(pd.read_csv(path))
+    candidates = predictor.identify_container_stops(full)
+    expected = candidates.nlargest(200, 'container_score')
+
+    assert summary.rows == 3000 and summary.chunks == 8
+    assert summary.candidates == len(candidates)
+    # Önbellekte mahalle kategorik, hız float; değerler ham CSV ile aynı
+    pd.testing.assert_frame_equal(top_stops.astype({NEIGHBORHOOD_COLUMN: object}).sort_index(),
+                                  expected.sort_index(), check_dtype=False)
+    assert np.isclose(summary.stats()['avg_stop_minutes'], full['duraklama_dakika'].mean())
+
+    counts = candidates.groupby(NEIGHBORHOOD_COLUMN).size()
+    assert (summary.neighborhoods['candidates'].reindex(counts.index) == counts).all()
+    assert summary.rows_per_second > 0
+
+
+def test_memory_is_bounded_by_top_n(tmp_path):
+    """Tutulan aday sayısı dosya boyutuyla büyümüyor mu?"""
+    path = tmp_path / 'gps.csv'
+    write_gps_csv(path, 5000, seed=1)
+
+    top_stops, summary = ContainerLocationPredictor().stream_container_stops(str(path), chunk_size=500, top_n=50)
+
+    assert summary.candidates > 50
+    assert len(top_stops) == 50
+    assert set(top_stops.columns) >= {'Enlem', 'Boylam', 'container_score'}
+    assert 'Plaka' not in top_stops.columns
+
+
+def test_incremental_mode_persists_clusters(tmp_path):
+    """Artımlı mod küme durumunu kaydediyor, ikinci gün mevcut kümelere ekliyor mu?"""
+    state_path = str(tmp_path / 'clusters.json')
+    predictor = ContainerLocationPredictor()
+    for day in (1, 2):
+        # Aynı duraklar ikinci gün yeniden ziyaret ediliyor
+        path = tmp_path / f'gun{day}.csv'
+        write_gps_csv(path, 2000)
+        clusters, result = predictor.update_locations_incremental(str(path), state_path=state_path, n_jobs=1)
+
+    assert os.path.exists(state_path)
+    assert result['matched'] > 0
+    assert set(clusters.columns) == {'mahalle', 'latitude', 'longitude', 'visit_count', 'avg_duration', 'avg_score'}
+    assert clusters['visit_count'].min() >= 2
@@ -0,0 +1,71 @@
+"""
+Hiperparametre Araması Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import hyperparameter_search
+from hyperparameter_search import cache_folds, candidate_grid, search, select_trial
+
+CANDIDATES = [
+    ('GradientBoosting', {'n_estimators': 5, 'max_depth': 2, 'learning_rate': 0.1}),
+    ('RandomForest', {'n_estimators': 5, 'max_depth': 3})
+]
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 4))
+    return X, X[:, 0] * 0.5 + X[:, 1] * 0.2
+
+
+def test_fold_cache_is_reused(tmp_path):
+    """Aynı veri aynı önbellek klasörünü ve fold'ları kullanıyor mu?"""
+    X, y = _data()
+    first = cache_folds(X, y, cache_dir=str(tmp_path))
+    mtime = os.path.getmtime(os.path.join(first, 'folds.npy'))
+
+    assert cache_folds(X, y, cache_dir=str(tmp_path)) == first
+    assert os.path.getmtime(os.path.join(first, 'folds.npy')) == mtime
+    _, _, folds = hyperparameter_search.load_cached(first)
+    assert np.bincount(folds).tolist() == [40] * hyperparameter_search.N_SPLITS
+    assert cache_folds(X, y + 1, cache_dir=str(tmp_path)) != first
+
+    # Aynı veriyi yazan eşzamanlı başka süreç: mevcut klasör korunur, geçici klasör kalmaz
+    os.remove(os.path.join(first, 'folds.npy'))
+    assert cache_folds(X, y, cache_dir=str(tmp_path)) == first
+    assert not [name for name in os.listdir(tmp_path) if '.tmp' in name]
+
+
+def test_search_runs_and_respects_budget(tmp_path):
+    """Adaylar biter, bütçe sıfırsa hiçbiri başlamaz mı?"""
+    X, y = _data()
+    trials = search(X, y, CANDIDATES, budget_seconds=60, n_jobs=2, cache_dir=str(tmp_path))
+    assert [trial['status'] for trial in trials] == ['ok', 'ok']
+    assert all(trial['cv_mae'] < 0.2 and trial['n_nodes'] > 0 for trial in trials)
+    assert all(trial['serving_us_per_row'] > 0 for trial in trials)
+
+    expired = search(X, y, CANDIDATES, budget_seconds=0, n_jobs=1, cache_dir=str(tmp_path))
+    assert {trial['status'] for trial in expired} == {'skipped'}
+    assert select_trial(expired) is None
+
+
+def test_selection_and_grid_order():
+    """Tolerans içindeki en hızlı deneme seçiliyor, ucuz adaylar önce mi?"""
+    trials = [
+        {'status': 'ok', 'cv_mae': 0.100, 'serving_us_per_row': 30.0},
+        {'status': 'ok', 'cv_mae': 0.104, 'serving_us_per_row': 5.0},
+        {'status': 'ok', 'cv_mae': 0.200, 'serving_us_per_row': 1.0},
+        {'status': 'timeout', 'cv_mae': 0.050, 'serving_us_per_row': 1.0}
+    ]
+    assert select_trial(trials, tolerance=0.05)['serving_us_per_row'] == 5.0
+    assert select_trial(trials, tolerance=0.0)['cv_mae'] == 0.100
+
+    costs = [params['n_estimators'] * params['max_depth'] for _, params in candidate_grid()]
+    assert costs == sorted(costs)
@@ -0,0 +1,84 @@
+"""
+Model Küçültme Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from feature_store import CAPACITY_CATEGORY_CODES, REGRESSOR_FEATURES
+from model_compaction import mark_pareto, select_smallest, serving_metrics, truncate_forest
+from model_store import load_model
+
+
+def _regressor_features():
+    df = pd.read_csv('data/processed_containers.csv')
+    X = df[REGRESSOR_FEATURES].copy()
+    X['capacity_category'] = X['capacity_category'].map(CAPACITY_CATEGORY_CODES)
+    return X.fillna(X.median()).to_numpy()
+
+
+def test_full_truncation_is_identical():
+    """Tüm ağaçlar ve tam derinlik orijinal tahminleri birebir veriyor mu?"""
+    forest, _ = load_model('models/fill_prediction_model.pkl')
+    X = _regressor_features()
+
+    same = truncate_forest(forest, forest.n_estimators, forest.max_depth)
+    assert same.meta['n_nodes'] == forest.meta['n_nodes']
+    assert np.array_equal(same.predict(X), forest.predict(X))
+
+
+def test_depth_truncation_uses_internal_values():
+    """Derinlik 0'da her ağaç kök değerini döndürüyor mu?"""
+    forest, _ = load_model('models/fill_prediction_model.pkl')
+    stumps = truncate_forest(forest, 10, 0)
+
+    root_values = forest.value[forest.roots[:10]]
+    expected = forest.meta['init_value'] + forest.meta['learning_rate'] * np.cumsum(root_values)[-1]
+    assert stumps.meta['n_nodes'] == 10
+    assert np.allclose(stumps.predict(_regressor_features()[:3]), expected)
+
+
+def test_pareto_and_selection():
+    """Domine edilen adaylar eleniyor ve tolerans içindeki en küçük seçiliyor mu?"""
+    rows = mark_pareto([
+        {'mae': 0.10, 'latency_us': 10, 'bytes': 100},
+        {'mae': 0.05, 'latency_us': 20, 'bytes': 200},
+        {'mae': 0.06, 'latency_us': 25, 'bytes': 250},  # 2. aday tarafından domine
+        {'mae': 0.01, 'latency_us': 40, 'bytes': 400}
+    ])
+
+    assert [row['pareto'] for row in rows] == [True, True, False, True]
+    assert select_smallest(rows, max_mae=0.055)['bytes'] == 200
+    assert select_smallest(rows, max_mae=0.001) is None
+
+
+def test_serving_metrics_describe_the_served_model():
+    """Küçültülmüş model hizmet verirken ad / MAE onun kendi değerleri mi?"""
+    metadata = {
+        'metrics': {'model_name': 'GradientBoosting', 'mae': 0.01, 'rmse': 0.02,
+                    'r2_score': 0.99, 'timestamp': '2025-12-28T01:42:50'},
+        'compaction': {'selected': {'mae': 0.03, 'rmse': 0.05, 'r2_score': 0.95}}
+    }
+    full = serving_metrics(metadata)
+    assert full['variant'] == 'full' and full['mae'] == 0.01
+
+    compact_meta = {'n_trees': 20, 'max_depth': 4, 'compacted_at': '2026-01-05T10:00:00',
+                    'metrics': {'mae': 0.02, 'rmse': 0.04, 'r2_score': 0.97}}
+    compact = serving_metrics(metadata, compact_meta)
+    assert compact['variant'] == 'compact' and compact['metrics_from'] == 'compact'
+    assert (compact['mae'], compact['rmse']) == (0.02, 0.04)
+    assert '20 ağaç' in compact['model_name']
+    assert compact['timestamp'] == '2026-01-05T10:00:00'   # Önbellek anahtarı modele göre değişir
+
+    # Meta'da metrik yoksa (eski kayıt) compaction.selected kullanılır
+    del compact_meta['metrics']
+    assert serving_metrics(metadata, compact_meta)['mae'] == 0.03
+    del metadata['compaction']
+    fallback = serving_metrics(metadata, compact_meta)
+    assert fallback['metrics_from'] == 'full' and fallback['mae'] == 0.01
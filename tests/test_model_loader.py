@@ -0,0 +1,70 @@
+"""
+Tembel Model Yükleyici Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model_loader import LazyLoader, health_report
+
+
+def test_background_load_warmup_and_readiness():
+    """Yükleme bitene kadar get() beklemeden None, sağlık 503 dönüyor mu?"""
+    release = threading.Event()
+    calls = []
+
+    def load():
+        release.wait(5)
+        return {'model': 'm'}
+
+    loader = LazyLoader('model', load, warmup_fn=lambda value: calls.append('warmup'),
+                        on_ready=lambda value: calls.append('ready'))
+    loader.start()
+    loader.start()   # ikinci çağrı yeni thread açmaz
+
+    assert loader.get() is None
+    report, code = health_report([loader])
+    assert code == 503 and report['status'] == 'loading'
+
+    release.set()
+    assert loader.wait(5)
+    assert loader.get() == {'model': 'm'}
+    assert calls == ['warmup', 'ready']
+    report, code = health_report([loader])
+    assert code == 200 and report['ready']
+    assert report['components']['model']['load_seconds'] >= 0
+
+
+def test_failed_load_is_degraded():
+    """Yükleme hatası uygulamayı düşürmeden 'degraded' olarak raporlanıyor mu?"""
+    def load():
+        raise FileNotFoundError('models/yok.pkl')
+
+    failed = LazyLoader('model', load)
+    failed.load()
+    ok = LazyLoader('store', lambda: 'store')
+    ok.load()
+
+    assert failed.get(timeout=1) is None
+    assert failed.status()['state'] == 'failed'
+    assert 'yok.pkl' in failed.status()['error']
+    report, code = health_report([ok, failed])
+    assert code == 200 and report['status'] == 'degraded' and not report['ready']
+
+
+def test_health_reports_same_model_version_as_predict():
+    """/api/health model_version /api/predict ile aynı mı, takas sayacı ayrı mı?"""
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+    import app_sqlite
+
+    assert app_sqlite.serving.wait(60)
+    client = app_sqlite.app.test_client()
+    health = client.get('/api/health').get_json()
+    prediction = client.get('/api/predict/1').get_json()
+
+    assert health['model_version'] == prediction['model_version'] == app_sqlite.model_registry.model_data['version']
+    assert health['registry_version'] == app_sqlite.model_registry.current().version
@@ -0,0 +1,78 @@
+"""
+Arka Plan Model Eğitimi Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import shutil
+import sys
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model_registry import ModelRegistry, RetrainWorker, train_fill_classifier
+
+DB_PATH = 'nilufer_waste.db'
+
+
+def test_swap_increments_version_and_notifies():
+    """Model değişimi sürümü artırıyor ve dinleyicileri bilgilendiriyor mu?"""
+    registry = ModelRegistry({'model': None, 'version': 'v1'})
+    seen = []
+    registry.subscribe(lambda snapshot: seen.append(snapshot.model_data['version']))
+
+    old = registry.current()
+    new = registry.swap({'model': None, 'version': 'v2'})
+
+    assert (old.version, new.version) == (1, 2)
+    assert old.model_data['version'] == 'v1'
+    assert registry.model_data['version'] == 'v2'
+    assert seen == ['v2']
+
+
+def test_submit_does_not_block_and_coalesces():
+    """submit() bloklamıyor ve bekleyen istekler tek eğitimde birleşiyor mu?"""
+    release = threading.Event()
+    calls = []
+
+    def slow_train(db_path, model_path):
+        calls.append(1)
+        release.wait(5)
+        return {'model': None, 'version': f'v{len(calls) + 1}'}
+
+    registry = ModelRegistry({'model': None, 'version': 'v1'})
+    worker = RetrainWorker(registry, train_fn=slow_train)
+
+    worker.submit()
+    while not calls:
+        pass
+    worker.submit()
+    worker.submit()
+    assert worker.metrics()['queue_depth'] == 2
+    assert registry.model_data['version'] == 'v1'
+
+    release.set()
+    worker.join()
+
+    metrics = worker.metrics()
+    assert len(calls) == 2
+    assert metrics['retrain_count'] == 2
+    assert metrics['queue_depth'] == 0
+    assert metrics['active_model_version'] == 'v3'
+    assert metrics['last_retrain_seconds'] is not None
+
+
+def test_train_fill_classifier_matches_serving_features(tmp_path):
+    """Yeniden eğitilen model servisteki 15 özellikle çalışıyor mu?"""
+    db_path = str(tmp_path / 'nilufer_waste.db')
+    model_path = str(tmp_path / 'fill_predictor.pkl')
+    shutil.copy(DB_PATH, db_path)
+
+    model_data = train_fill_classifier(db_path=db_path, model_path=model_path)
+
+    assert model_data['version'].startswith('retrain-')
+    assert model_data['model'].n_features_in_ == 15
+    probabilities = model_data['model'].predict_proba(np.zeros((2, 15)))
+    assert probabilities.shape == (2, 2)
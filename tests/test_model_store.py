@@ -0,0 +1,187 @@
+"""
+Paylaşımlı Model Yükleme Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model_store import (
+    arrays_dir_for, export_for_serving, export_model_arrays, load_model, load_model_arrays
+)
+from feature_store import CAPACITY_CATEGORY_CODES, REGRESSOR_FEATURES, classifier_features, load_static_features
+
+DB_PATH = 'nilufer_waste.db'
+
+
+def _classifier_features():
+    conn = sqlite3.connect(DB_PATH)
+    containers = load_static_features(conn)
+    conn.close()
+    return classifier_features(containers)
+
+
+def _regressor_features():
+    df = pd.read_csv('data/processed_containers.csv')
+    X = df[REGRESSOR_FEATURES].copy()
+    X['capacity_category'] = X['capacity_category'].map(CAPACITY_CATEGORY_CODES)
+    return X.fillna(X.median()).to_numpy()
+
+
+def test_classifier_arrays_match_sklearn(tmp_path):
+    """RandomForest olasılıkları sklearn ile birebir aynı mı?"""
+    model = joblib.load('models/fill_predictor.pkl')['model']
+    export_model_arrays(model, str(tmp_path / 'rf'))
+    forest = load_model_arrays(str(tmp_path / 'rf'))
+
+    X = _classifier_features()
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(forest.predict(X), model.predict(X))
+
+
+def test_boosting_arrays_match_sklearn(tmp_path):
+    """GradientBoosting tahminleri sklearn ile birebir aynı mı?"""
+    model = joblib.load('models/fill_prediction_model.pkl')
+    export_model_arrays(model, str(tmp_path / 'gb'))
+    forest = load_model_arrays(str(tmp_path / 'gb'))
+
+    X = _regressor_features()
+    assert np.array_equal(forest.predict(X), model.predict(X))
+
+
+def test_predict_interval_from_tree_spread():
+    """Sınıflandırıcıda Wilson aralığı, std sklearn ağaçlarının yayılımıyla aynı mı?"""
+    model = joblib.load('models/fill_predictor.pkl')['model']
+    forest, _ = load_model('models/fill_predictor.pkl', allow_pickle=False)
+
+    X = _classifier_features()[:200]
+    interval = forest.predict_interval(X, coverage=0.8)
+    per_tree = np.stack([tree.predict_proba(X.astype(np.float32))[:, 1] for tree in model.estimators_], axis=1)
+
+    assert interval['method'] == 'wilson'
+    assert np.array_equal(interval['prediction'], forest.predict_proba(X)[:, 1])
+    assert np.allclose(interval['std'], per_tree.std(axis=1))
+    # Wilson genişliği: 2·z·sqrt(p(1-p)/n + z²/4n²)/(1+z²/n)
+    n, z = forest.n_estimators, 1.2815515655446004
+    wilson = forest.predict_interval(X[:1], coverage=0.8)
+    p = wilson['prediction'][0]
+    expected = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    assert np.isclose(wilson['upper'][0] - wilson['lower'][0], 2 * expected)
+    assert np.allclose(forest.predict_interval(X[:1])['upper'], interval['upper'][:1])
+
+    # GradientBoosting: ağaç yayılımı yerine residual std ile simetrik aralık
+    booster, _ = load_model('models/fill_prediction_model.pkl', allow_pickle=False)
+    X = _regressor_features()[:50]
+    interval = booster.predict_interval(X, coverage=0.95, residual_std=0.01)
+    assert interval['method'] == 'residual'
+    assert np.array_equal(interval['prediction'], booster.predict(X))
+    assert np.allclose(interval['upper'] - interval['prediction'], 1.96 * 0.01, atol=1e-4)
+
+
+def test_interval_contains_prediction(tmp_path):
+    """Sınıflandırıcı ve orman regresöründe lower <= tahmin <= upper mı?"""
+    from sklearn.ensemble import RandomForestRegressor
+
+    forest, _ = load_model('models/fill_predictor.pkl', allow_pickle=False)
+    X = _classifier_features()
+    interval = forest.predict_interval(X, coverage=0.8)
+    assert ((interval['lower'] <= interval['prediction']) & (interval['prediction'] <= interval['upper'])).all()
+    assert (interval['lower'] >= 0).all() and (interval['upper'] <= 1).all()
+    # Neredeyse oybirliğinde (ör. 0.95) kantil aralığı [1, 1] olurdu; Wilson tahmini içerir
+    confident = interval['prediction'] >= 0.9
+    assert (interval['lower'][confident] < interval['prediction'][confident]).all()
+
+    # Çarpık ağaç çıktıları: kantil aralığı ortalamayı dışarıda bırakabilir
+    rng = np.random.default_rng(0)
+    X_reg = rng.normal(size=(400, 3))
+    y = np.where(rng.random(400) < 0.1, 10.0, 0.0) + X_reg[:, 0]
+    regressor = RandomForestRegressor(n_estimators=30, max_depth=4, random_state=0).fit(X_reg, y)
+    export_model_arrays(regressor, str(tmp_path / 'rfr'))
+    interval = load_model_arrays(str(tmp_path / 'rfr')).predict_interval(X_reg, coverage=0.5)
+    assert interval['method'] == 'tree_spread'
+    assert ((interval['lower'] <= interval['prediction']) & (interval['prediction'] <= interval['upper'])).all()
+
+
+def test_load_model_uses_memory_map():
+    """Diziler mmap ile açılıyor ve sürüm bilgisi korunuyor mu?"""
+    forest, meta = load_model('models/fill_predictor.pkl')
+
+    assert isinstance(forest.threshold, np.memmap)
+    assert meta['version'] == 'v1.0.0'
+    assert meta['kind'] == 'forest_classifier'
+
+
+def test_single_row_fast_path_matches_sklearn(tmp_path):
+    """Tek satır ve küçük batch yolları sklearn ile birebir aynı mı?"""
+    model = joblib.load('models/fill_predictor.pkl')['model']
+    export_model_arrays(model, str(tmp_path / 'rf'))
+    forest = load_model_arrays(str(tmp_path / 'rf'))
+
+    X = _classifier_features()[:20]
+    for row in X:
+        assert np.array_equal(forest.predict_proba(row.reshape(1, -1)), model.predict_proba(row.reshape(1, -1)))
+    assert np.array_equal(forest.apply(X[:1]), forest.apply(X[:2])[:1])
+
+
+def test_leaves_loop_to_themselves(tmp_path):
+    """Yapraklar kendine dönüyor mu (sabit derinlikte gezinme için)?"""
+    model = joblib.load('models/fill_prediction_model.pkl')
+    meta = export_model_arrays(model, str(tmp_path / 'gb'))
+    forest = load_model_arrays(str(tmp_path / 'gb'))
+
+    leaves = np.unique(forest.apply(_regressor_features()))
+    assert np.array_equal(forest.left[leaves], leaves)
+    assert np.array_equal(forest.right[leaves], leaves)
+    assert meta['format'] == 2
+
+
+def test_export_for_serving_and_pickle_free_load(tmp_path):
+    """Dışa aktarım doğrulanıyor, diziler yoksa pickle açılmadan hata veriyor mu?"""
+    model_path = str(tmp_path / 'fill_prediction_model.pkl')
+    shutil.copy('models/fill_prediction_model.pkl', model_path)
+
+    try:
+        load_model(model_path, allow_pickle=False)
+        assert False, "Diziler yokken pickle açılmamalı"
+    except FileNotFoundError:
+        pass
+
+    meta = export_for_serving(model_path, X_check=_regressor_features())
+    assert meta['verified_rows'] > 2000
+    assert meta['feature_names'] == REGRESSOR_FEATURES
+    assert meta['arrays']['roots']['shape'] == [meta['n_trees']]
+
+    forest, _ = load_model(model_path, allow_pickle=False)
+    assert forest.n_estimators == meta['n_trees']
+
+    # Şemayla uyuşmayan dizi reddedilir
+    np.save(os.path.join(arrays_dir_for(model_path), 'roots.npy'), np.zeros(3, dtype=np.int64))
+    try:
+        load_model_arrays(arrays_dir_for(model_path))
+        assert False, "Şema uyuşmazlığı yakalanmalı"
+    except ValueError:
+        pass
+
+
+def test_apps_serve_without_sklearn():
+    """API'ler modelleri yükleyip tahmin yaparken sklearn içe aktarılmıyor mu?"""
+    code = (
+        "import sys, app_ai, app_sqlite\n"
+        "assert app_ai.ai_models.wait(60) and app_sqlite.serving.wait(60)\n"
+        "assert app_ai.app.test_client().get('/api/predict_fill/1').status_code == 200\n"
+        "assert app_sqlite.app.test_client().get('/api/predict/1').status_code == 200\n"
+        "print('sklearn' in sys.modules, 'joblib' in sys.modules)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(['.', 'scripts']))
+    result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == 'False False'
@@ -0,0 +1,60 @@
+"""
+Çevrimiçi Doluluk Modeli Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from online_fill_model import FULL_THRESHOLD, OnlineFillModel
+
+
+def test_update_moves_rate_towards_observation(tmp_path):
+    """Bildirim dolum hızını gözleme doğru çekiyor mu?"""
+    model = OnlineFillModel(state_path=str(tmp_path / 'state.json'), prior_rate=0.002, prior_strength=1.0)
+
+    assert model.update(7, previous_fill=0.2, reported_fill=0.6, hours_elapsed=10)
+    prediction = model.predict(7, current_fill=0.6, hours_since=0)
+
+    # Önsel 0.002, gözlem 0.04, eşit ağırlık -> 0.021
+    assert prediction['fill_rate_per_hour'] == pytest.approx(0.021)
+    assert prediction['observations'] == 1
+    assert model.predict(8, 0.6, 0)['fill_rate_per_hour'] == 0.002
+
+
+def test_uninformative_reports_are_ignored(tmp_path):
+    """Seviye düşüşü ve çok kısa aralıklar modeli değiştirmemeli"""
+    model = OnlineFillModel(state_path=str(tmp_path / 'state.json'))
+
+    assert not model.update(1, previous_fill=0.8, reported_fill=0.1, hours_elapsed=5)
+    assert not model.update(1, previous_fill=0.1, reported_fill=0.2, hours_elapsed=0.1)
+    assert model.update_count == 0
+
+
+def test_checkpoint_round_trip(tmp_path):
+    """Checkpoint sonrası yüklenen model aynı tahmini veriyor mu?"""
+    path = str(tmp_path / 'state.json')
+    model = OnlineFillModel(state_path=path)
+    model.update(3, 0.1, 0.5, 8, weight=0.9)
+    assert model.checkpoint()
+    assert not model.checkpoint()  # Değişiklik yoksa tekrar yazılmaz
+
+    restored = OnlineFillModel.load(path)
+    assert restored.predict(3, 0.5, 12) == model.predict(3, 0.5, 12)
+    assert restored.stats()['containers_tracked'] == 1
+
+
+def test_is_full_follows_predicted_fill(tmp_path):
+    """is_full doluluk eşiğine göre mi (olasılık eşiğine göre değil)?"""
+    model = OnlineFillModel(state_path=str(tmp_path / 'state.json'), prior_rate=0.01)
+
+    # Tahmin 0.76: eşiğin hemen üstü, belirsizlik yüzünden olasılık ~0.5
+    prediction = model.predict(1, current_fill=0.56, hours_since=20)
+    assert prediction['predicted_fill'] == pytest.approx(0.76)
+    assert 0.5 < prediction['fill_probability'] < FULL_THRESHOLD
+    assert prediction['is_full']
+    assert not model.predict(1, current_fill=0.5, hours_since=20)['is_full']
@@ -0,0 +1,63 @@
+"""
+Tahmin Önbelleği Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from prediction_cache import PredictionCache, prediction_key
+
+
+def test_state_change_misses():
+    """Durumun herhangi bir parçası değişince önbellek ıskalıyor mu?"""
+    cache = PredictionCache()
+    key = prediction_key(1, '2025-12-20', 0.4, 'v1')
+    cache.put(key, 0.9)
+
+    assert cache.get(key) == 0.9
+    assert cache.get(prediction_key(1, '2025-12-20', 0.5, 'v1')) is None
+    assert cache.get(prediction_key(1, '2025-12-20', 0.4, 'v2')) is None
+
+    # Yeni durum eklenince aynı konteynerin eski kaydı silinir
+    cache.put(prediction_key(1, '2025-12-28', 0.1, 'v1'), 0.2)
+    assert cache.get(key) is None
+    assert cache.stats()['entries'] == 1
+
+
+def test_lru_eviction_and_ttl():
+    """LRU sınırı ve TTL sayaçları doğru mu?"""
+    cache = PredictionCache(max_entries=2, ttl_seconds=0.05)
+    keys = [prediction_key(cid, 'd', 0.5, 'v1') for cid in (1, 2, 3)]
+    cache.put(keys[0], 'a')
+    cache.put(keys[1], 'b')
+    cache.get(keys[0])          # 1 en son kullanılan
+    cache.put(keys[2], 'c')     # 2 atılır
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 'a'
+    assert cache.stats()['evictions'] == 1
+
+    time.sleep(0.06)
+    assert cache.get(keys[2]) is None
+    stats = cache.stats()
+    assert stats['expirations'] == 1
+    assert stats['hits'] == 2 and stats['misses'] == 2
+
+
+def test_invalidate_and_clear():
+    """Bildirim ve yeniden eğitim sonrası kayıtlar siliniyor mu?"""
+    cache = PredictionCache()
+    cache.put(prediction_key(1, 'd', 0.5, 'v1'), 'a')
+    cache.put(prediction_key(2, 'd', 0.5, 'v1'), 'b')
+
+    cache.invalidate(1)
+    assert cache.get(prediction_key(1, 'd', 0.5, 'v1')) is None
+    assert cache.get(prediction_key(2, 'd', 0.5, 'v1')) == 'b'
+
+    cache.clear()
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['invalidations'] == 2
@@ -0,0 +1,86 @@
+"""
+Tahmin Ön Hesaplama Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+import joblib
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from prediction_refresher import PredictionRefresher, get_latest_prediction, get_latest_predictions
+
+DB_PATH = 'nilufer_waste.db'
+MODEL_PATH = 'models/fill_predictor.pkl'
+
+
+@pytest.fixture
+def db_copy(tmp_path):
+    """Testlerin gerçek veritabanını değiştirmemesi için kopya (boş tahmin tablosuyla)"""
+    path = tmp_path / 'nilufer_waste.db'
+    shutil.copy(DB_PATH, path)
+    # app_sqlite içe aktarıldığında yenileyici gerçek veritabanına yazmış olabilir
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("DELETE FROM predictions")
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def model_data():
+    return joblib.load(MODEL_PATH)
+
+
+def test_refresh_writes_all_active_containers(db_copy, model_data):
+    """Tek geçişte tüm aktif konteynerler yazılıyor mu?"""
+    refresher = PredictionRefresher(model_data, db_path=db_copy)
+    count = refresher.refresh()
+
+    conn = sqlite3.connect(db_copy)
+    active = conn.execute("SELECT COUNT(*) FROM containers WHERE status = 'active'").fetchone()[0]
+    stored = conn.execute("SELECT COUNT(*), COUNT(DISTINCT model_version) FROM predictions").fetchone()
+    conn.close()
+
+    assert count == active
+    assert stored == (active, 1)
+
+
+def test_latest_prediction_reports_staleness(db_copy, model_data):
+    """Son tahmin yaşı ve bayatlık bilgisi dönüyor mu?"""
+    refresher = PredictionRefresher(model_data, db_path=db_copy)
+    refresher.refresh()
+    refresher.refresh()
+
+    conn = sqlite3.connect(db_copy)
+    prediction = get_latest_prediction(conn, 1)
+    latest = get_latest_predictions(conn)
+    conn.close()
+
+    assert prediction['model_version'] == model_data['version']
+    assert prediction['age_seconds'] >= 0
+    assert prediction['is_stale'] is False
+    assert len(latest) == refresher.last_refresh_count
+
+
+def test_model_swap_wakes_waiting_loop(db_copy, model_data):
+    """Model yüklenmeden başlayan döngü, model gelince aralığı beklemeden yeniliyor mu?"""
+    refresher = PredictionRefresher(None, db_path=db_copy, interval_seconds=3600)
+    refresher.start()
+    try:
+        time.sleep(0.1)  # İlk geçiş modelsiz: boş
+        assert refresher.last_refresh_at is None
+
+        refresher.set_model_data(model_data)
+        deadline = time.time() + 30
+        while refresher.last_refresh_at is None and time.time() < deadline:
+            time.sleep(0.05)
+        assert refresher.last_refresh_count > 0
+    finally:
+        refresher.stop()
@@ -0,0 +1,127 @@
+"""
+Toplu Bildirim Doğrulama Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from ai_models import FillLevelPredictor, load_pending_reports, report_category
+
+DB_PATH = 'nilufer_waste.db'
+
+
+@pytest.fixture
+def db_with_backlog(tmp_path):
+    """Veritabanı kopyası + 300 bekleyen bildirim"""
+    path = tmp_path / 'nilufer_waste.db'
+    shutil.copy(DB_PATH, path)
+    rng = np.random.default_rng(0)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany("""
+            INSERT INTO citizen_reports
+            (user_id, container_id, fill_level_estimate, latitude, longitude, is_verified, submitted_at)
+            VALUES (1, ?, ?, 40.2, 28.9, 0, '2025-12-28T10:00:00')
+        """, [(int(cid), float(fill)) for cid, fill in zip(rng.integers(1, 2000, 300), rng.random(300))])
+    conn.close()
+    return str(path)
+
+
+def trained_predictor(reports):
+    """Bildirim kuyruğundaki konteyner verisiyle küçük bir model"""
+    predictor = FillLevelPredictor()
+    X = predictor.prepare_features(reports)
+    y = (reports['historical_fill_rate'].to_numpy() + reports['fill_level_estimate'].to_numpy() > 1).astype(int)
+    predictor.model = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    return predictor
+
+
+def test_batch_matches_single_report_validation(db_with_backlog):
+    """Toplu doğrulama tek tek doğrulamayla aynı kararları veriyor mu?"""
+    conn = sqlite3.connect(db_with_backlog)
+    reports = load_pending_reports(conn)
+    conn.close()
+    predictor = trained_predictor(reports)
+
+    assert list(report_category([0.1, 0.25, 0.8, 1.0])) == ['EMPTY', 'HALF_FULL', 'FULL', 'OVERFLOWING']
+
+    results = predictor.validate_reports_batch(reports)
+    assert len(results) == len(reports)
+    for i in range(0, len(reports), 15):
+        row = reports.iloc[i].to_dict()
+        single = predictor.validate_citizen_report(row['container_id'], row['user_report'], row)
+        assert single['validation_result'] == results['validation_result'].iloc[i]
+        assert single['confidence_score'] == pytest.approx(results['confidence_score'].iloc[i])
+        assert single['deviation'] == pytest.approx(results['deviation'].iloc[i])
+
+    invalid = predictor.validate_citizen_report(1, 'HALF', reports.iloc[0].to_dict())
+    assert invalid['validation_result'] == 'REJECTED' and invalid['confidence_score'] == 0.0
+
+
+def test_pending_queue_is_updated_in_one_pass(db_with_backlog):
+    """Kararlar yazılıyor, incelemeye kalanlar kuyrukta bekliyor mu?"""
+    decided_query = "SELECT SUM(is_verified = 1), SUM(is_verified = 0) FROM citizen_reports WHERE verified_at IS NOT NULL"
+    conn = sqlite3.connect(db_with_backlog)
+    predictor = trained_predictor(load_pending_reports(conn))
+    # Gönderimde karara bağlanmış bildirimler zaten damgalı olabilir
+    verified_before, rejected_before = (count or 0 for count in conn.execute(decided_query).fetchone())
+    conn.close()
+
+    results = predictor.validate_pending_reports(db_with_backlog)
+    counts = results['validation_result'].value_counts()
+
+    conn = sqlite3.connect(db_with_backlog)
+    verified, rejected = (count or 0 for count in conn.execute(decided_query).fetchone())
+    remaining = load_pending_reports(conn)
+    conn.close()
+
+    assert verified - verified_before == counts.get('ACCEPTED', 0)
+    assert rejected - rejected_before == counts.get('REJECTED', 0)
+    assert sorted(remaining['report_id']) == sorted(results.loc[results['validation_result'] == 'NEEDS_REVIEW', 'report_id'])
+
+
+def test_reports_decided_at_submit_leave_the_pending_queue(db_with_backlog, monkeypatch):
+    """Gönderimde reddedilen bildirim toplu doğrulamaya tekrar düşmüyor mu?"""
+    import app_sqlite
+
+    monkeypatch.setattr(app_sqlite, 'DB_PATH', db_with_backlog)
+    conn = sqlite3.connect(db_with_backlog)
+    user_id = conn.execute("SELECT user_id FROM users LIMIT 1").fetchone()[0]
+    empty, full = conn.execute("""
+        SELECT MIN(CASE WHEN current_fill_level < 0.2 THEN container_id END),
+               MIN(CASE WHEN current_fill_level BETWEEN 0.4 AND 0.6 THEN container_id END)
+        FROM containers
+    """).fetchone()
+    before = set(load_pending_reports(conn)['report_id'])
+    conn.close()
+
+    client = app_sqlite.app.test_client()
+    # Boş konteynere 'taşıyor' (red) ve yarı dolu konteynere 'dolu' (bekleyen) bildirimi
+    for container_id in (empty, full):
+        response = client.post('/api/reports/submit', json={
+            'user_id': user_id, 'container_id': int(container_id), 'fill_level': 100
+        })
+        assert response.status_code == 200
+
+    conn = sqlite3.connect(db_with_backlog)
+    rows = conn.execute("""
+        SELECT report_id, container_id, is_verified, verified_at FROM citizen_reports
+        ORDER BY report_id DESC LIMIT 2
+    """).fetchall()
+    pending = set(load_pending_reports(conn)['report_id'])
+    conn.close()
+
+    rejected, waiting = sorted(rows, key=lambda row: row[1] != empty)
+    assert rejected[2] == 0 and rejected[3] is not None
+    assert waiting[3] is None
+    assert pending - before == {waiting[0]}
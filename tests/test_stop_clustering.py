@@ -0,0 +1,126 @@
+"""
+Durak Kümeleme Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import DBSCAN
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import stop_clustering
+from stop_clustering import EARTH_RADIUS_M, IncrementalStopClusters, cluster_stops, label_points
+
+LAT = 40.2
+METERS_PER_DEG_LAT = np.pi * EARTH_RADIUS_M / 180
+METERS_PER_DEG_LON = METERS_PER_DEG_LAT * np.cos(np.radians(LAT))
+
+
+def test_eps_in_meters_is_isotropic():
+    """50 m kuzey-güney ve 50 m doğu-batı aynı şekilde kümeleniyor mu?"""
+    north = (np.array([LAT, LAT + 50 / METERS_PER_DEG_LAT]), np.array([28.9, 28.9]))
+    east = (np.array([LAT, LAT]), np.array([28.9, 28.9 + 50 / METERS_PER_DEG_LON]))
+
+    # Eski derece cinsinden eps (0.0005°) iki yönü farklı ele alıyordu
+    old = [DBSCAN(eps=0.0005, min_samples=2).fit(np.column_stack(pair)).labels_ for pair in (north, east)]
+    assert list(old[0]) == [0, 0] and list(old[1]) == [-1, -1]
+
+    for pair in (north, east):
+        assert list(label_points(*pair, eps_meters=55)) == [0, 0]
+        assert list(label_points(*pair, eps_meters=45)) == [-1, -1]
+    assert list(label_points(np.array([LAT]), np.array([28.9]))) == [0]
+
+
+def make_stops(n_sites=40, visits=30, seed=0):
+    """Mahallelere dağılmış konteyner noktaları etrafında ~10 m saçılmış ziyaretler"""
+    rng = np.random.default_rng(seed)
+    sites_lat = LAT + rng.random(n_sites) * 0.03
+    sites_lon = 28.9 + rng.random(n_sites) * 0.03
+    site = np.repeat(np.arange(n_sites), visits)
+    stops = pd.DataFrame({
+        'Mahalle': np.array(['A MH.', 'B MH.', 'C MH.', 'D MH.'])[site % 4],
+        'Enlem': sites_lat[site] + rng.normal(0, 10, len(site)) / METERS_PER_DEG_LAT,
+        'Boylam': sites_lon[site] + rng.normal(0, 10, len(site)) / METERS_PER_DEG_LON,
+        'site': site
+    }, index=rng.permutation(len(site)) + 1000)
+    stops.loc[stops.index[:3], 'Mahalle'] = None
+    stops.loc[stops.index[3], 'Enlem'] = np.nan
+    stops.loc[len(stops) + 5000] = ['E MH.', LAT, 28.95, -1]
+    return stops
+
+
+def test_parallel_matches_serial_and_recovers_sites(monkeypatch):
+    """Paralel ve seri etiketler aynı mı, her konteyner tek küme mi?"""
+    stops = make_stops()
+    serial = cluster_stops(stops, 'Mahalle', 'Enlem', 'Boylam', eps_meters=40, n_jobs=1)
+    monkeypatch.setattr(stop_clustering, 'INLINE_POINTS', 0)  # Küçük veride de havuzu kullan
+    parallel = cluster_stops(stops, 'Mahalle', 'Enlem', 'Boylam', eps_meters=40, n_jobs=2)
+
+    assert serial.index.equals(stops.index)
+    assert serial.equals(parallel)
+    assert (serial.iloc[:4] == -1).all()                  # Mahallesiz / koordinatsız
+    assert serial.iloc[-1] >= 0                            # Tek noktalı mahalle
+
+    clustered = stops[serial >= 0]
+    labels_per_site = clustered.groupby('site').apply(lambda g: serial[g.index].nunique())
+    assert (labels_per_site == 1).all()
+    assert serial[serial >= 0].nunique() == 41
+
+
+def test_incremental_days_match_batch_clustering(tmp_path):
+    """Gün gün eklenen kümeler tüm geçmişin toplu kümelemesiyle tutarlı mı?"""
+    stops = make_stops(n_sites=60, visits=20, seed=1).dropna()
+    stops['duraklama_dakika'] = 10.0
+    stops['container_score'] = 5.0 + (stops['site'] % 3)
+    shuffled = stops.sample(frac=1, random_state=0)
+    days = [shuffled.iloc[rows] for rows in np.array_split(np.arange(len(shuffled)), 10)]
+
+    state = IncrementalStopClusters(eps_meters=40)
+    path = str(tmp_path / 'clusters.json')
+    for i, day in enumerate(days):
+        result = state.update(day, n_jobs=1)
+        assert result['rows'] == len(day)
+        if i == 4:
+            # Kaydet / yükle ve kaldığı yerden devam et
+            state.save(path)
+            state = IncrementalStopClusters.load(path)
+
+    assert result['matched'] >= 0.9 * len(days[-1])     # Son günler çoğunlukla mevcut kümelere düşer
+    assert result['pending'] < 20                         # Bekleyen nokta havuzu geçmişle büyümez
+
+    batch = cluster_stops(stops, 'Mahalle', 'Enlem', 'Boylam', eps_meters=40, n_jobs=1)
+    clusters = state.to_frame()
+    assert abs(len(clusters) - batch[batch >= 0].nunique()) <= 2
+    assert clusters['visit_count'].sum() + len(state.pending) == len(stops)
+
+    # Her merkez gerçek bir konteyner noktasına 15 m'den yakın
+    sites = stops.groupby('site')[['Enlem', 'Boylam']].mean().to_numpy()
+    d_lat = (clusters['latitude'].to_numpy()[:, None] - sites[:, 0]) * METERS_PER_DEG_LAT
+    d_lon = (clusters['longitude'].to_numpy()[:, None] - sites[:, 1]) * METERS_PER_DEG_LON
+    assert (np.hypot(d_lat, d_lon).min(axis=1) < 15).all()
+
+
+def test_match_follows_moved_centroids():
+    """Eşleşmelerle kayan merkez, sonraki günün eşleştirmesinde kullanılıyor mu?"""
+    state = IncrementalStopClusters.from_frame(pd.DataFrame([{
+        'mahalle': 'A MH.', 'latitude': LAT, 'longitude': 28.9,
+        'visit_count': 1, 'avg_duration': 10.0, 'avg_score': 5.0
+    }]), eps_meters=40)
+
+    def day(meters_north, n):
+        return pd.DataFrame({
+            'Mahalle': ['A MH.'] * n,
+            'Enlem': [LAT + meters_north / METERS_PER_DEG_LAT] * n,
+            'Boylam': [28.9] * n,
+            'duraklama_dakika': 10.0,
+            'container_score': 5.0
+        })
+
+    assert state.update(day(35, 9), n_jobs=1)['matched'] == 9   # Merkez ~31,5 m kuzeye kayar
+    # 65 m: eski merkeze eps dışında, yeni merkeze eps içinde
+    result = state.update(day(65, 1), n_jobs=1)
+    assert result['matched'] == 1 and result['clusters'] == 1
@@ -0,0 +1,91 @@
+"""
+Araç Bazlı Durak Segmentasyonu Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stop_segmentation import segment_stops
+
+START = pd.Timestamp('2025-12-01 08:00')
+DEG_PER_100M = 100 / 111195
+
+
+def track(plate, stops, start=START, seed=0):
+    """Sürüş (dakikada 300 m) ve verilen duraklardan oluşan 1 dakikalık iz"""
+    rng = np.random.default_rng(seed)
+    rows, minute, lat = [], 0, 40.2
+    for stop_lat, n_points, reported in stops:
+        while lat < stop_lat:
+            rows.append((plate, start + pd.Timedelta(minutes=minute), 30.0, lat, 0.0, 0.0))
+            lat += 3 * DEG_PER_100M
+            minute += 1
+        for i in range(n_points):
+            jitter = rng.normal(0, 3) / 111195  # ~3 m GPS titremesi
+            rows.append((plate, start + pd.Timedelta(minutes=minute), 0.0, stop_lat + jitter,
+                         reported if i == 0 else 0.0, 5.0 + i))
+            minute += 1
+        lat = stop_lat + 3 * DEG_PER_100M
+    return pd.DataFrame(rows, columns=['Plaka', 'Tarih', 'Hız(km/sa)', 'Enlem', 'duraklama', 'skor']).assign(Boylam=28.9)
+
+
+def test_segments_follow_each_vehicle_track():
+    """Her aracın duraklarını başlangıç, bitiş ve merkezle tek kayda indiriyor mu?"""
+    a = track('16 A 01', [(40.205, 5, 0.0), (40.21, 1, 7.0), (40.215, 1, 0.0)])
+    b = track('16 B 02', [(40.207, 3, 0.0)], start=START + pd.Timedelta(seconds=30), seed=1)
+    untimed = b.iloc[[0]].assign(Tarih=pd.NaT, skor=99.0)  # Zamansız kayıt atılır
+    # İki aracın kayıtları zaman sırasıyla karışık gelir
+    gps = pd.concat([a, b, untimed]).sample(frac=1, random_state=0).reset_index(drop=True)
+
+    segments = segment_stops(gps, duration_column='duraklama', max_columns=['skor'])
+
+    assert list(segments['Plaka']) == ['16 A 01', '16 A 01', '16 B 02']
+    first = segments.iloc[0]
+    assert first['points'] == 5 and first['dwell_minutes'] == 4.0
+    assert first['end'] - first['start'] == pd.Timedelta(minutes=4)
+    assert abs(first['Enlem'] - 40.205) < 5 / 111195
+    assert first['skor'] == 9.0
+    # Tek kayıtlık durak: bekleme süresi cihazın raporladığı süre; 0 dakikalık olan atılır
+    assert segments.iloc[1]['points'] == 1 and segments.iloc[1]['dwell_minutes'] == 7.0
+    assert segments.iloc[2]['points'] == 3
+    assert segments.iloc[2]['start'] == b.loc[b['Hız(km/sa)'] == 0, 'Tarih'].min()
+
+
+def test_gaps_and_jumps_split_stops():
+    """Uzun kayıt boşluğu ve ani konum sıçraması durağı bölüyor mu?"""
+    times = START + pd.to_timedelta([0, 1, 2, 30, 31, 32, 33], unit='min')
+    gps = pd.DataFrame({
+        'Plaka': '16 A 01',
+        'Tarih': times,
+        'Hız(km/sa)': 0.0,
+        'Enlem': [40.2, 40.2, 40.2, 40.2, 40.2, 40.21, 40.21],
+        'Boylam': 28.9
+    })
+
+    segments = segment_stops(gps)
+    assert list(segments['points']) == [3, 2, 2]
+    assert list(segments['dwell_minutes']) == [2.0, 1.0, 1.0]
+
+
+def test_chunked_segmentation_matches_single_pass():
+    """Parça sınırına denk gelen duraklar taşınan koşularla bölünmeden bulunuyor mu?"""
+    from stop_segmentation import iter_segment_stops
+
+    a = track('16 A 01', [(40.205, 5, 0.0), (40.21, 1, 7.0), (40.22, 12, 0.0)])
+    b = track('16 B 02', [(40.207, 3, 0.0), (40.212, 8, 0.0)], start=START + pd.Timedelta(seconds=30), seed=1)
+    # Dosya zaman sıralı: araçların kayıtları iç içe
+    gps = pd.concat([a, b]).sort_values('Tarih', kind='stable').reset_index(drop=True)
+    kwargs = dict(duration_column='duraklama', max_columns=['skor'])
+    expected = segment_stops(gps, **kwargs)
+
+    for chunk_size in (1, 4, 7, len(gps)):
+        chunks = (gps.iloc[start:start + chunk_size] for start in range(0, len(gps), chunk_size))
+        streamed = pd.concat(list(iter_segment_stops(chunks, **kwargs)), ignore_index=True)
+        streamed = streamed.sort_values(['Plaka', 'start'], kind='stable').reset_index(drop=True)
+        pd.testing.assert_frame_equal(streamed, expected)
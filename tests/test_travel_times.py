@@ -0,0 +1,75 @@
+"""
+GPS'ten Öğrenilen Seyahat Süresi Tablosu Testleri
+Nilüfer Belediyesi - Akıllı Atık Yönetim Sistemi
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from route_optimizer import ROUTE_SPEED_KMH, RouteOptimizer
+from travel_times import build_travel_times, haversine_km, load_travel_times, save_travel_times
+
+DEG_PER_KM = 1 / 111.195
+
+
+def shuttle(plate, lat, hour, speed_kmh, n_legs=6, dwell=3):
+    """250 m arayla iki durak arasında gidip gelen aracın durakları"""
+    rows, time = [], pd.Timestamp('2025-12-01') + pd.Timedelta(hours=hour)
+    leg_minutes = 15 / speed_kmh
+    for i in range(n_legs + 1):
+        rows.append((plate, time, time + pd.Timedelta(minutes=dwell), float(dwell), lat + i % 2 * DEG_PER_KM / 4, 28.9))
+        time += pd.Timedelta(minutes=dwell + leg_minutes)
+    return pd.DataFrame(rows, columns=['Plaka', 'start', 'end', 'dwell_minutes', 'Enlem', 'Boylam'])
+
+
+def test_speeds_follow_hour_and_area_with_fallbacks(tmp_path):
+    """Saat × hücre ortancası, az gözlemde saat ve genel ortancaya düşüş, kayıt/yükleme"""
+    segments = pd.concat([
+        shuttle('16 A 01', 40.20, hour=8, speed_kmh=15),   # Sabah, güney: yoğun trafik
+        shuttle('16 A 02', 40.25, hour=8, speed_kmh=30),   # Sabah, kuzey
+        shuttle('16 A 03', 40.20, hour=14, speed_kmh=40),  # Öğleden sonra, güney
+        shuttle('16 A 04', 40.25, hour=20, speed_kmh=60, n_legs=2),  # Az gözlem
+    ])
+    table = build_travel_times(segments, min_legs=5)
+
+    south, north = 40.20 + DEG_PER_KM / 8, 40.25 + DEG_PER_KM / 8  # Hat orta noktaları
+    assert table.speed_kmh(south, 28.9, 8) == pytest.approx(15)
+    assert table.speed_kmh(north, 28.9, 8) == pytest.approx(30)
+    assert table.speed_kmh(south, 28.9, 14) == pytest.approx(40)
+    # 20:00 gözlemi eşiğin altında: genel ortancaya düşer; ızgara dışı nokta saat hızını alır
+    assert table.speed_kmh(north, 28.9, 20) == pytest.approx(table.meta['median_speed_kmh'])
+    assert table.speed_kmh(41.0, 30.0, 14) == pytest.approx(40)
+    assert table.service_minutes == 3.0
+
+    save_travel_times(table, str(tmp_path / 'tt'))
+    loaded = load_travel_times(str(tmp_path / 'tt'))
+    when = datetime(2025, 12, 1, 8, 30)
+    assert loaded.travel_minutes(40.2, 28.9, 40.2 + DEG_PER_KM, 28.9, when) == pytest.approx(4.0, rel=1e-3)
+    assert load_travel_times(str(tmp_path / 'yok')) is None
+
+
+def test_route_optimizer_uses_learned_table():
+    """Tablo verildiğinde varış zamanları saat bazlı hız ve öğrenilmiş servis süresiyle"""
+    table = build_travel_times(pd.concat([
+        shuttle('16 A 01', 40.20, hour=8, speed_kmh=15, dwell=4),
+        shuttle('16 A 02', 40.20, hour=9, speed_kmh=45, dwell=4),
+    ]))
+    containers = [{'container_id': i, 'latitude': 40.2 + i * DEG_PER_KM / 2, 'longitude': 28.9} for i in range(3)]
+    route = {'containers': containers}
+    start = datetime(2025, 12, 1, 8, 55)
+
+    arrivals = RouteOptimizer(travel_times=table).estimate_arrival_times([route], start)
+    # 0,5 km: ilk bacak 08:59'da (15 km/sa, 2 dk), ikincisi 09:05'te başlar (45 km/sa, 40 sn)
+    assert (arrivals[1] - start).total_seconds() / 60 == pytest.approx(6.0, rel=1e-3)
+    assert (arrivals[2] - start).total_seconds() / 60 == pytest.approx(10 + 2 / 3, rel=1e-3)
+
+    # Tablo yoksa eski davranış: sabit 30 km/sa
+    fallback = RouteOptimizer(travel_times=False)
+    km = float(haversine_km(40.2, 28.9, 40.2 + DEG_PER_KM, 28.9))
+    assert fallback.route_hours(containers, start) == pytest.approx(km / ROUTE_SPEED_KMH)
@@ -11,14 +11,21 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
 import json
+import sys
+import time
 from datetime import datetime
 
+import hyperparameter_search
+from feature_store import CAPACITY_CATEGORY_CODES, REGRESSOR_FEATURES
+from model_store import arrays_dir_for, export_for_serving
+
 class FillLevelPredictor:
     def __init__(self):
         self.model = None
         self.scaler = StandardScaler()
         self.feature_importance = {}
         self.metrics = {}
+        self.search = None
         
     def prepare_features(self, df):
         """Model için özellikleri hazırla"""
@@ -30,24 +37,13 @@ class FillLevelPredictor:
         # Hedef değişken
         y = df['expected_fill_level'].values
         
-        # Özellikler
-        feature_columns = [
-            'days_since_collection',
-            'day_of_week', 
-            'month',
-            'is_weekend',
-            'collection_days_per_week',
-            'type_encoded',
-            'capacity_category',
-            'population_density',
-            'current_fill_level'
-        ]
+        # Özellikler (servis tarafıyla aynı tanım: feature_store.py)
+        feature_columns = list(REGRESSOR_FEATURES)
         
         X = df[feature_columns].copy()
         
         # capacity_category'yi encode et
-        category_map = {'small': 1, 'medium': 2, 'large': 3, 'xlarge': 4}
-        X['capacity_category'] = X['capacity_category'].map(category_map)
+        X['capacity_category'] = X['capacity_category'].map(CAPACITY_CATEGORY_CODES)
         
         # Eksik değerleri doldur (sadece numerik kolonlar için)
         X = X.fillna(X.median())
@@ -57,7 +53,38 @@ class FillLevelPredictor:
         
         return X, y, feature_columns
     
-    def train_model(self, X, y, feature_columns):
+    def search_hyperparameters(self, X_train, y_train, budget_seconds):
+        """Eğitim setinde paralel, süre sınırlı CV araması; seçilen modeli döndür"""
+        print(f"\n🔎 Hiperparametre araması ({budget_seconds:.0f} sn bütçe)...")
+        started = time.time()
+        trials = hyperparameter_search.search(np.asarray(X_train), y_train, budget_seconds=budget_seconds)
+        selected = hyperparameter_search.select_trial(trials)
+        elapsed = time.time() - started
+        trials_path = hyperparameter_search.save_trials(trials, selected, budget_seconds, elapsed)
+
+        finished = sum(1 for trial in trials if trial['status'] == 'ok')
+        print(f"✓ {finished}/{len(trials)} aday tamamlandı ({elapsed:.1f} sn)")
+        print(f"✓ Denemeler kaydedildi: {trials_path}")
+        if not selected:
+            print("⚠️ Bütçe içinde biten aday yok, sabit yapılandırmalar kullanılacak")
+            return None, None
+
+        print(f"✅ Seçilen: {selected['model_name']} {selected['params']} "
+              f"(CV MAE {selected['cv_mae']:.6f}, {selected['serving_us_per_row']:.1f} µs/tek satır tahmin)")
+        self.search = {
+            'trials_path': trials_path,
+            'budget_seconds': budget_seconds,
+            'trials': len(trials),
+            'finished': finished,
+            'selected': selected
+        }
+        model = hyperparameter_search.build_estimator(selected['model_name'], selected['params'])
+        if hasattr(model, 'n_jobs'):
+            model.n_jobs = -1
+        model.fit(X_train, y_train)
+        return model, selected['model_name']
+    
+    def train_model(self, X, y, feature_columns, search_budget=None):
         """Modeli eğit ve optimize et"""
         print("\n🎓 Model eğitimi başlıyor...")
         
@@ -73,6 +100,43 @@ class FillLevelPredictor:
         print(f"✓ Eğitim seti: {len(X_train)} örnek")
         print(f"✓ Test seti: {len(X_test)} örnek")
         
+        best_model_name = None
+        if search_budget:
+            self.model, best_model_name = self.search_hyperparameters(X_train, y_train, search_budget)
+        
+        if best_model_name is None:
+            self.model, best_model_name = self.train_fixed_models(X_train, y_train, X_test, y_test)
+        
+        # Test seti üzerinde değerlendirme
+        y_pred = self.model.predict(X_test)
+        
+        # Tahminleri 0-0.95 arasına sınırla
+        y_pred = np.clip(y_pred, 0, 0.95)
+        
+        # Metrikleri hesapla
+        mae = mean_absolute_error(y_test, y_pred)
+        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        r2 = r2_score(y_test, y_pred)
+        
+        self.metrics = {
+            'model_name': best_model_name,
+            'mae': float(mae),
+            'rmse': float(rmse),
+            'r2_score': float(r2),
+            'train_size': len(X_train),
+            'test_size': len(X_test),
+            'timestamp': datetime.now().isoformat()
+        }
+        
+        # Özellik önemliliği
+        if hasattr(self.model, 'feature_importances_'):
+            importances = self.model.feature_importances_
+            self.feature_importance = dict(zip(feature_columns, importances))
+        
+        return X_test, y_test, y_pred
+    
+    def train_fixed_models(self, X_train, y_train, X_test, y_test):
+        """Sabit RandomForest ve GradientBoosting yapılandırmalarını karşılaştır"""
         # RandomForest ile başla
         print("\n🌲 RandomForest modeli eğitiliyor...")
         rf_model = RandomForestRegressor(
@@ -104,41 +168,11 @@ class FillLevelPredictor:
         print(f"   GradientBoosting R² Skoru: {gb_score:.4f}")
         
         if rf_score > gb_score:
-            self.model = rf_model
-            best_model_name = "RandomForest"
             print(f"\n✅ RandomForest seçildi (daha yüksek R² skoru)")
-        else:
-            self.model = gb_model
-            best_model_name = "GradientBoosting"
-            print(f"\n✅ GradientBoosting seçildi (daha yüksek R² skoru)")
-        
-        # Test seti üzerinde değerlendirme
-        y_pred = self.model.predict(X_test)
-        
-        # Tahminleri 0-0.95 arasına sınırla
-        y_pred = np.clip(y_pred, 0, 0.95)
-        
-        # Metrikleri hesapla
-        mae = mean_absolute_error(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-        r2 = r2_score(y_test, y_pred)
-        
-        self.metrics = {
-            'model_name': best_model_name,
-            'mae': float(mae),
-            'rmse': float(rmse),
-            'r2_score': float(r2),
-            'train_size': len(X_train),
-            'test_size': len(X_test),
-            'timestamp': datetime.now().isoformat()
-        }
+            return rf_model, "RandomForest"
         
-        # Özellik önemliliği
-        if hasattr(self.model, 'feature_importances_'):
-            importances = self.model.feature_importances_
-            self.feature_importance = dict(zip(feature_columns, importances))
-        
-        return X_test, y_test, y_pred
+        print(f"\n✅ GradientBoosting seçildi (daha yüksek R² skoru)")
+        return gb_model, "GradientBoosting"
     
     def evaluate_model(self, X_test, y_test, y_pred):
         """Model performansını detaylı değerlendir"""
@@ -172,8 +206,8 @@ class FillLevelPredictor:
         
         print("\n" + "="*80)
     
-    def save_model(self):
-        """Modeli ve metadata'yı kaydet"""
+    def save_model(self, X_check=None):
+        """Modeli, API dizilerini ve metadata'yı kaydet"""
         print("\n💾 Model kaydediliyor...")
         
         # Model dosyası
@@ -181,6 +215,10 @@ class FillLevelPredictor:
         joblib.dump(self.model, model_path)
         print(f"✓ Model kaydedildi: {model_path}")
         
+        # API'ler için sklearn'süz diziler (+ JSON şema), sklearn ile birebir doğrulanır
+        meta = export_for_serving(model_path, X_check=X_check)
+        print(f"✓ Diziler kaydedildi: {arrays_dir_for(model_path)} ({meta['verified_rows']} satır birebir doğrulandı)")
+        
         # Scaler dosyası
         scaler_path = 'models/fill_scaler.pkl'
         joblib.dump(self.scaler, scaler_path)
@@ -191,6 +229,8 @@ class FillLevelPredictor:
             'metrics': self.metrics,
             'feature_importance': self.feature_importance
         }
+        if self.search:
+            metadata['search'] = self.search
         metadata_path = 'models/fill_model_metadata.json'
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, indent=2, ensure_ascii=False)
@@ -199,6 +239,9 @@ class FillLevelPredictor:
         print("\n✅ Tüm dosyalar başarıyla kaydedildi!")
 
 def main():
+    # Kullanım: python train_fill_prediction.py [arama_bütçesi_sn]  (0 = sabit yapılandırmalar)
+    search_budget = float(sys.argv[1]) if len(sys.argv) > 1 else hyperparameter_search.SEARCH_BUDGET_SECONDS
+    
     print("="*80)
     print("🚀 NİLÜFER BELEDİYESİ - DOLULUK TAHMİN MODELİ EĞİTİMİ")
     print("="*80)
@@ -215,13 +258,13 @@ def main():
     X, y, feature_columns = predictor.prepare_features(df)
     
     # Modeli eğit
-    X_test, y_test, y_pred = predictor.train_model(X, y, feature_columns)
+    X_test, y_test, y_pred = predictor.train_model(X, y, feature_columns, search_budget=search_budget)
     
     # Değerlendir
     predictor.evaluate_model(X_test, y_test, y_pred)
     
     # Kaydet
-    predictor.save_model()
+    predictor.save_model(X_check=X)
     
     print("\n🎉 Model eğitimi tamamlandı!")
     print("📌 Modeli kullanmak için: joblib.load('models/fill_prediction_model.pkl')")
@@ -12,6 +12,9 @@ from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import os
 
+from feature_store import CLASSIFIER_FEATURES, classifier_features, load_static_features
+from model_store import arrays_dir_for, export_for_serving
+
 DB_PATH = 'nilufer_waste.db'
 
 def train_model():
@@ -23,29 +26,10 @@ def train_model():
     # Veriyi yükle
     conn = sqlite3.connect(DB_PATH)
     
-    query = """
-    SELECT 
-        c.container_id,
-        c.container_type,
-        c.capacity_liters,
-        c.last_collection_date,
-        c.current_fill_level,
-        n.population,
-        n.population_density,
-        n.area_km2,
-        COUNT(DISTINCT ce.event_id) as collection_count,
-        AVG(ce.tonnage_collected) as avg_tonnage,
-        AVG(ce.fill_level_before) as avg_fill_before
-    FROM containers c
-    LEFT JOIN neighborhoods n ON c.neighborhood_id = n.neighborhood_id
-    LEFT JOIN collection_events ce ON c.container_id = ce.container_id
-    WHERE c.status = 'active'
-    GROUP BY c.container_id
-    HAVING collection_count > 0
-    """
-    
-    df = pd.read_sql_query(query, conn)
+    # Servis tarafıyla aynı özellik tanımı (feature_store.py)
+    df = load_static_features(conn)
     conn.close()
+    df = df[df['collection_count'] > 0]
     
     print(f"\n📊 {len(df)} konteyner verisi yüklendi")
     
@@ -53,50 +37,9 @@ def train_model():
         print("\n⚠️ Yeterli veri yok!")
         return False
     
-    # Özellikler oluştur
-    features = []
-    
-    for _, row in df.iterrows():
-        # Zaman özellikleri
-        if row['last_collection_date']:
-            last_date = datetime.fromisoformat(row['last_collection_date'])
-            hours_since = (datetime.now() - last_date).total_seconds() / 3600
-        else:
-            hours_since = 168
-        
-        days_since = hours_since / 24
-        
-        now = datetime.now()
-        day_of_week = now.weekday()
-        is_weekend = int(now.weekday() >= 5)
-        month = now.month
-        season = (month % 12) // 3
-        
-        # Konteyner özellikleri
-        capacity = row['capacity_liters']
-        container_type_map = {'underground': 4, '770lt': 3, '400lt': 2, 'plastic': 1}
-        container_type_encoded = container_type_map.get(row['container_type'], 2)
-        
-        # Nüfus özellikleri
-        population = row['population'] if row['population'] else 10000
-        pop_density = row['population_density'] if row['population_density'] else 5000
-        area = row['area_km2'] if row['area_km2'] else 2.0
-        
-        # Tarihsel
-        avg_tonnage = row['avg_tonnage'] if row['avg_tonnage'] else 0.5
-        avg_fill = row['avg_fill_before'] if row['avg_fill_before'] else 0.5
-        collection_count = row['collection_count']
-        capacity_usage = (avg_tonnage / (capacity / 1000)) if capacity > 0 else 0.5
-        
-        feature_vector = [
-            hours_since, days_since, day_of_week, is_weekend, month, season,
-            capacity, container_type_encoded, population, pop_density, area,
-            avg_tonnage, avg_fill, collection_count, capacity_usage
-        ]
-        
-        features.append(feature_vector)
-    
-    X = np.array(features)
+    # Özellikler oluştur (tüm satırlar için tek referans zaman)
+    now = datetime.now()
+    X = classifier_features(df, now)
     y = (df['current_fill_level'] >= 0.75).astype(int).values
     
     print(f"✓ {X.shape[1]} özellik oluşturuldu")
@@ -138,12 +81,17 @@ def train_model():
     model_data = {
         'model': model,
         'version': 'v1.0.0',
-        'trained_at': datetime.now().isoformat()
+        'trained_at': now.isoformat()
     }
     
     joblib.dump(model_data, 'models/fill_predictor.pkl')
     print("\n💾 Model kaydedildi: models/fill_predictor.pkl")
     
+    # API'ler için sklearn'süz diziler (+ JSON şema), sklearn ile birebir doğrulanır
+    meta = export_for_serving('models/fill_predictor.pkl', X_check=X, feature_names=CLASSIFIER_FEATURES)
+    print(f"💾 Diziler kaydedildi: {arrays_dir_for('models/fill_predictor.pkl')} "
+          f"({meta['verified_rows']} satır birebir doğrulandı)")
+    
     return True
 
 if __name__ == "__main__":
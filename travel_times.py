@@ -0,0 +1,250 @@
+"""
+NİLÜFER BELEDİYESİ - GPS'TEN ÖĞRENİLEN SEYAHAT SÜRELERİ
+Araç izlerindeki ardışık duraklar arası gerçek sürüş sürelerinden, günün
+saati ve bölgeye (yaklaşık 1 km'lik ızgara hücresi) göre efektif hız
+tablosu çıkarır. Hız kuş uçuşu (haversine) mesafeye göredir; rota
+optimizasyonundaki mesafelerle doğrudan çarpılır.
+
+    - Tablo 24 × satır × sütun float32 dizi; sorgu tek indeks (O(1))
+    - Az gözlemli hücreler saat ortalamasına, saatler genel ortancaya düşer
+    - Durak başına servis süresi de izlerden (ortanca bekleme) öğrenilir
+
+Kullanım:
+    python travel_times.py [gps.csv]
+"""
+
+import json
+import math
+import os
+import sys
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from model_store import META_FILE, array_schema, save_model_arrays
+
+TRAVEL_TIMES_DIR = 'models/travel_time_arrays'
+TRAVEL_TIMES_FORMAT = 1
+TABLE_ARRAYS = ('speeds', 'hour_speeds')
+EARTH_RADIUS_KM = 6371.0        # Sunucu tarafı sklearn'süz yüklensin diye stop_clustering'den alınmaz
+
+DEFAULT_SPEED_KMH = 30.0        # route_optimizer.ROUTE_SPEED_KMH ile aynı varsayım
+DEFAULT_SERVICE_MINUTES = 2.0
+CELL_METERS = 1000.0
+MIN_LEGS = 5                    # Hücre/saat hızı için en az gözlem
+MAX_LEG_MINUTES = 60.0          # Daha uzun aralar (mola, depo) sürüş sayılmaz
+MIN_LEG_KM = 0.05
+SPEED_LIMITS_KMH = (3.0, 90.0)
+MAX_SERVICE_MINUTES = 30.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Kuş uçuşu mesafe (km); dizilerle de çalışır"""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _haversine_scalar_km(lat1, lon1, lat2, lon2):
+    """Tek nokta çifti için haversine (numpy çağrı yükü olmadan)"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def stop_legs(segments, vehicle_column='Plaka', lat_column='Enlem', lon_column='Boylam'):
+    """
+    Aynı aracın ardışık durakları arasındaki sürüşler
+
+    Döndürür:
+        DataFrame: hour, mid_lat, mid_lon, km, minutes, speed_kmh
+    """
+    segments = segments.sort_values([vehicle_column, 'start'], kind='stable')
+    vehicle = segments[vehicle_column].to_numpy()
+    same = vehicle[1:] == vehicle[:-1]
+    lat = segments[lat_column].to_numpy(dtype=np.float64)
+    lon = segments[lon_column].to_numpy(dtype=np.float64)
+    departed = segments['end'].to_numpy()[:-1]
+    minutes = (segments['start'].to_numpy()[1:] - departed) / np.timedelta64(1, 'm')
+    km = haversine_km(lat[:-1], lon[:-1], lat[1:], lon[1:])
+
+    legs = pd.DataFrame({
+        'hour': pd.DatetimeIndex(departed).hour,
+        'mid_lat': (lat[:-1] + lat[1:]) / 2,
+        'mid_lon': (lon[:-1] + lon[1:]) / 2,
+        'km': km,
+        'minutes': minutes
+    })[same & (minutes > 0) & (minutes <= MAX_LEG_MINUTES) & (km >= MIN_LEG_KM)]
+    legs['speed_kmh'] = (legs['km'] / (legs['minutes'] / 60)).clip(*SPEED_LIMITS_KMH)
+    return legs.reset_index(drop=True)
+
+
+class TravelTimeTable:
+    """Saat × bölge efektif hız tablosu; seyahat süresi sorgusu O(1)"""
+
+    def __init__(self, speeds, hour_speeds, meta):
+        self.speeds = np.asarray(speeds)
+        self.hour_speeds = np.asarray(hour_speeds)
+        self.meta = meta
+        self.origin_lat = meta['origin_lat']
+        self.origin_lon = meta['origin_lon']
+        self.cell_lat = meta['cell_lat']
+        self.cell_lon = meta['cell_lon']
+        self.service_minutes = meta['service_minutes']
+        self.n_rows, self.n_cols = self.speeds.shape[1:]
+        # Sorgular için Python listeleri: numpy skaler indeksleme yükü sorgu süresine baskın
+        self._speeds = self.speeds.tolist()
+        self._hour_speeds = self.hour_speeds.tolist()
+
+    def _cell(self, lat, lon):
+        row = math.floor((lat - self.origin_lat) / self.cell_lat)
+        col = math.floor((lon - self.origin_lon) / self.cell_lon)
+        if 0 <= row < self.n_rows and 0 <= col < self.n_cols:
+            return row, col
+        return None
+
+    def speed_kmh(self, lat, lon, hour):
+        """Noktadaki (ızgara dışıysa saatin genel) efektif hızı"""
+        cell = self._cell(lat, lon)
+        if cell is None:
+            return self._hour_speeds[hour]
+        return self._speeds[hour][cell[0]][cell[1]]
+
+    def travel_minutes(self, lat1, lon1, lat2, lon2, when):
+        """İki nokta arası sürüş süresi (dakika); hız orta noktanın hücresinden"""
+        km = _haversine_scalar_km(lat1, lon1, lat2, lon2)
+        return km / self.speed_kmh((lat1 + lat2) / 2, (lon1 + lon2) / 2, when.hour) * 60
+
+    def route_minutes(self, points, start_time):
+        """
+        Sıralı rota zaman çizelgesi; her bacakta hız, aracın o bacağa çıktığı saatten
+
+        Parametreler:
+            points: [(enlem, boylam), ...] ziyaret sırasıyla
+            start_time: İlk durağa varış zamanı
+
+        Döndürür:
+            (her durağa varış dakikası listesi, son servis dahil toplam dakika)
+        """
+        arrivals, elapsed = [], 0.0
+        for i, (lat, lon) in enumerate(points):
+            if i:
+                elapsed += self.service_minutes
+                previous = points[i - 1]
+                elapsed += self.travel_minutes(previous[0], previous[1], lat, lon,
+                                               start_time + timedelta(minutes=elapsed))
+            arrivals.append(elapsed)
+        return arrivals, (elapsed + self.service_minutes if arrivals else 0.0)
+
+    def summary(self):
+        return {key: self.meta[key] for key in ('legs', 'stops', 'median_speed_kmh', 'service_minutes',
+                                                'grid', 'learned_cells')}
+
+
+def build_travel_times(segments, vehicle_column='Plaka', lat_column='Enlem', lon_column='Boylam',
+                       cell_meters=CELL_METERS, min_legs=MIN_LEGS):
+    """
+    Durak segmentlerinden hız tablosu kur
+
+    Parametreler:
+        segments: stop_segmentation.segment_stops çıktısı (start, end, dwell_minutes)
+
+    Döndürür:
+        TravelTimeTable
+    """
+    legs = stop_legs(segments, vehicle_column, lat_column, lon_column)
+    median_speed = float(legs['speed_kmh'].median()) if len(legs) else DEFAULT_SPEED_KMH
+    dwell = segments['dwell_minutes']
+    dwell = dwell[dwell <= MAX_SERVICE_MINUTES]
+    service_minutes = float(dwell.median()) if len(dwell) else DEFAULT_SERVICE_MINUTES
+
+    # Izgara: orta noktaların kapsadığı alan + her yanda pay (veri hücre sınırına denk gelmez)
+    min_lat = float(legs['mid_lat'].min()) if len(legs) else 0.0
+    min_lon = float(legs['mid_lon'].min()) if len(legs) else 0.0
+    meters_per_deg = math.pi * EARTH_RADIUS_KM * 1000 / 180
+    cell_lat = cell_meters / meters_per_deg
+    cell_lon = cell_meters / (meters_per_deg * max(math.cos(math.radians(min_lat)), 0.1))
+    origin_lat, origin_lon = min_lat - 1.5 * cell_lat, min_lon - 1.5 * cell_lon
+    # Sorgudaki math.floor(fark / hücre) ile aynı hesap (// sınırda farklı hücre verebilir)
+    rows = np.floor((legs['mid_lat'].to_numpy() - origin_lat) / cell_lat).astype(int)
+    cols = np.floor((legs['mid_lon'].to_numpy() - origin_lon) / cell_lon).astype(int)
+    n_rows, n_cols = (int(rows.max()) + 2, int(cols.max()) + 2) if len(legs) else (1, 1)
+
+    # Saat ortancaları -> genel ortancaya düşer
+    by_hour = legs.groupby('hour')['speed_kmh'].agg(['median', 'size'])
+    by_hour = by_hour[by_hour['size'] >= min_legs]['median']
+    hour_speeds = np.full(24, median_speed, dtype=np.float32)
+    hour_speeds[by_hour.index.to_numpy()] = by_hour.to_numpy()
+
+    # Hücre ortancaları -> saat ortancasına düşer
+    speeds = np.repeat(hour_speeds[:, None, None], n_rows * n_cols, axis=1).reshape(24, n_rows, n_cols)
+    flat = legs['hour'].to_numpy() * (n_rows * n_cols) + rows * n_cols + cols
+    by_cell = legs.groupby(flat)['speed_kmh'].agg(['median', 'size'])
+    by_cell = by_cell[by_cell['size'] >= min_legs]['median']
+    speeds.reshape(-1)[by_cell.index.to_numpy()] = by_cell.to_numpy()
+
+    meta = {
+        'format': TRAVEL_TIMES_FORMAT,
+        'origin_lat': origin_lat,
+        'origin_lon': origin_lon,
+        'cell_lat': cell_lat,
+        'cell_lon': cell_lon,
+        'cell_meters': cell_meters,
+        'grid': [n_rows, n_cols],
+        'service_minutes': service_minutes,
+        'median_speed_kmh': median_speed,
+        'legs': len(legs),
+        'stops': len(segments),
+        'learned_cells': len(by_cell),
+        'built_at': pd.Timestamp.now().isoformat()
+    }
+    return TravelTimeTable(speeds, hour_speeds, meta)
+
+
+def save_travel_times(table, out_dir=TRAVEL_TIMES_DIR):
+    save_model_arrays({name: getattr(table, name) for name in TABLE_ARRAYS}, table.meta, out_dir)
+
+
+def load_travel_times(directory=TRAVEL_TIMES_DIR, mmap_mode='r'):
+    """Kaydedilmiş tabloyu yükle (yoksa None: çağıran sabit hıza düşer)"""
+    meta_path = os.path.join(directory, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != TRAVEL_TIMES_FORMAT:
+        return None
+    arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode) for name in TABLE_ARRAYS}
+    if array_schema(arrays) != meta.get('arrays'):
+        raise ValueError(f"{directory}: diziler meta.json şemasıyla uyuşmuyor")
+    return TravelTimeTable(arrays['speeds'], arrays['hour_speeds'], meta)
+
+
+def main():
+    from gps_cache import GPS_PATH, load_gps_frame
+    from stop_segmentation import segment_stops
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else GPS_PATH
+    if not os.path.exists(csv_path):
+        print(f"❌ GPS dosyası bulunamadı: {csv_path}")
+        return
+
+    print("🚛 Araç izlerinden duraklar çıkarılıyor...")
+    gps = load_gps_frame(csv_path, ['Plaka', 'Tarih', 'Hız(km/sa)', 'Enlem', 'Boylam', 'Duraklama Süresi'])
+    segments = segment_stops(gps, duration_column='Duraklama Süresi')
+    table = build_travel_times(segments)
+    save_travel_times(table)
+
+    summary = table.summary()
+    print(f"✓ {summary['stops']:,} durak, {summary['legs']:,} sürüş")
+    print(f"  - Ortanca efektif hız: {summary['median_speed_kmh']:.1f} km/sa (kuş uçuşu)")
+    print(f"  - Ortanca servis süresi: {summary['service_minutes']:.1f} dk")
+    print(f"  - Izgara {summary['grid'][0]}×{summary['grid'][1]}, öğrenilmiş hücre-saat: {summary['learned_cells']:,}")
+    for hour in (7, 9, 12, 17, 22):
+        print(f"  - {hour:02d}:00 hızı: {table.hour_speeds[hour]:.1f} km/sa")
+    print(f"✓ Tablo kaydedildi: {TRAVEL_TIMES_DIR}")
+
+
+if __name__ == '__main__':
+    main()